@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+
+from app.api.v1.caching import acached_quote_response, json_response
+from app.api.v1.rendering import rendered_gates
+from app.api.v1.serializers import GatesListQuerySerializer, RouteQuerySerializer
+from app.api.v1.views import GatesListView, GateDetailView, RouteView, add_next_link, add_search_headers, route_quote_data, route_quote_params
+from app.services.engine import SearchStats
+from app.services.executor import run_in_executor
+from app.services.graph import agraph_version, aget_graph
+from app.services.route_finder import find_cheapest_route
+
+
+class AsyncAPIView(View):
+    """
+    Base for natively async endpoints, served instead of their DRF
+    counterparts when ASYNC_API_VIEWS is on (see app/api/v1/urls.py).
+
+    DRF's APIView dispatches synchronously, so these are plain Django views
+    that take the same query parameters and render the same JSON.
+    ``documented_by`` is the DRF view with the same contract; drf-spectacular
+    documents the endpoint from it.
+    """
+
+    documented_by = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.cls = cls.documented_by
+        view.initkwargs = {}
+        return view
+
+
+class AsyncGatesListView(AsyncAPIView):
+    documented_by = GatesListView
+
+    async def get(self, request):
+        qs = GatesListQuerySerializer(data=request.GET)
+        if not qs.is_valid():
+            return json_response(qs.errors, status.HTTP_400_BAD_REQUEST)
+
+        rendered = rendered_gates(await agraph_version())
+        body, last = await rendered.agates_page(qs.validated_data.get("after"), qs.validated_data.get("limit"))
+        return add_next_link(HttpResponse(body, content_type="application/json"), request, last)
+
+
+class AsyncGateDetailView(AsyncAPIView):
+    documented_by = GateDetailView
+
+    async def get(self, request, gate_id: str):
+        body = await rendered_gates(await agraph_version()).agate_detail(gate_id)
+        if body is None:
+            return json_response({"detail": "Gate not found"}, status.HTTP_404_NOT_FOUND)
+        return HttpResponse(body, content_type="application/json")
+
+
+class AsyncRouteView(AsyncAPIView):
+    documented_by = RouteView
+
+    async def get(self, request, gate_id: str, target_gate_id: str):
+        qs = RouteQuerySerializer(data=request.GET)
+        if not qs.is_valid():
+            return json_response(qs.errors, status.HTTP_400_BAD_REQUEST)
+
+        strategy = qs.validated_data.get("strategy") or settings.ROUTE_SEARCH_STRATEGY
+        constraints = qs.validated_data["constraints"]
+        search = SearchStats()
+        # Reload a stale graph without blocking the event loop, so the search
+        # below finds it compiled
+        graph = await aget_graph()
+
+        async def quote():
+            try:
+                result = await run_in_executor(find_cheapest_route, gate_id, target_gate_id, strategy, search, constraints)
+            except ValueError as e:
+                return {"detail": str(e)}, status.HTTP_404_NOT_FOUND
+            return route_quote_data(gate_id, target_gate_id, result)
+
+        response = await acached_quote_response(
+            request, "route", route_quote_params(gate_id, target_gate_id, strategy, constraints), quote, version=graph.version
+        )
+        return add_search_headers(response, search)
@@ -0,0 +1,64 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from app.api.v1.rendering import PrerenderedResponse
+from app.services.quote_cache import quote_cache
+
+
+def cached_quote_response(request, kind: str, params: dict, compute, version: str | None = None):
+    """
+    Serve a quote through the quote cache.
+
+    ``compute()`` returns (data, status_code) and only runs on a cache miss.
+    Successful quotes carry an ETag and Cache-Control header, and a matching
+    If-None-Match gets a 304. Entries hold the rendered JSON, so a hit is
+    served without rendering anything.
+    """
+    def entry():
+        return _quote_entry(*compute())
+
+    cached, hit = quote_cache.get_or_compute(kind, params, entry, version)
+    return _quote_response(request, PrerenderedResponse(cached["body"], status=cached["status"]), cached, hit)
+
+
+async def acached_quote_response(request, kind: str, params: dict, compute, version: str | None = None):
+    """
+    ``cached_quote_response`` for async views; ``compute`` is a coroutine function.
+    """
+    async def entry():
+        return _quote_entry(*await compute())
+
+    cached, hit = await quote_cache.aget_or_compute(kind, params, entry, version)
+    response = HttpResponse(cached["body"], status=cached["status"], content_type="application/json")
+    return _quote_response(request, response, cached, hit)
+
+
+def json_response(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """
+    A response rendered the way DRF renders JSON, for views outside DRF's dispatch.
+    """
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type="application/json")
+
+
+def _quote_entry(data, status_code: int) -> dict:
+    etag = None
+    if status_code == status.HTTP_200_OK:
+        body = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    return {"body": JSONRenderer().render(data), "status": status_code, "etag": etag}
+
+
+def _quote_response(request, response, cached: dict, hit: bool):
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    if cached["etag"] is None:
+        return response
+
+    response["ETag"] = cached["etag"]
+    patch_cache_control(response, public=True, max_age=settings.QUOTE_CACHE_MAX_AGE)
+    return get_conditional_response(request, etag=cached["etag"], response=response)
@@ -0,0 +1,159 @@
+import json
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from app.models import GateConnection
+from app.services.gate_index import GateIndex, aget_gate_index, get_gate_index
+
+try:
+    import orjson
+except ImportError:  # optional, see API_ORJSON
+    orjson = None
+
+
+def render_json(data) -> bytes:
+    """
+    ``data`` as DRF's JSONRenderer renders it: compact, UTF-8, with U+2028
+    and U+2029 escaped.
+
+    Uses orjson when it is installed and API_ORJSON is on. orjson writes
+    very large and very small floats differently from the json module, so
+    only pass data without floats (gate payloads are strings and integers).
+    """
+    if orjson is not None and settings.API_ORJSON:
+        try:
+            return orjson.dumps(data).replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        except orjson.JSONEncodeError:
+            pass
+    return JSONRenderer().render(data)
+
+
+class PrerenderedResponse(Response):
+    """
+    A Response whose body is already rendered as compact JSON.
+
+    Clients that negotiate plain JSON get ``json_bytes`` as is; other
+    renderers (the browsable API, JSON with an indent) render ``data``,
+    which is decoded from the bytes on first access.
+    """
+
+    def __init__(self, json_bytes: bytes, status=None, headers=None):
+        self.json_bytes = json_bytes
+        super().__init__(status=status, headers=headers)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.json_bytes)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, "accepted_renderer", None)
+        if (
+            type(renderer) is JSONRenderer and renderer.compact and not renderer.ensure_ascii
+            and not renderer.get_indent(self.accepted_media_type, self.renderer_context)
+        ):
+            self["Content-Type"] = renderer.media_type
+            return self.json_bytes
+        return super().rendered_content
+
+
+class RenderedGates:
+    """
+    Gate list and gate detail JSON at one graph version.
+
+    Gate writes bump the graph version (see app/services/graph.py), so the
+    JSON is rendered once per version and process and then served as bytes.
+    Gate IDs and names come from the GateIndex of the version, so pages of
+    the list and unknown gate IDs need no query; only the first detail
+    request for a gate reads its connections.
+    """
+
+    def __init__(self, version: str):
+        self.version = version
+        self._body = None
+        self._details: dict[str, bytes] = {}
+
+    def gates_page(self, after: str | None = None, limit: int | None = None) -> tuple[bytes, str | None]:
+        """
+        (JSON list of the gates after gate ID ``after``, at most ``limit`` of
+        them; the last gate ID of the page if more gates follow, else None).
+        """
+        return self._page(get_gate_index(self.version), after, limit)
+
+    async def agates_page(self, after: str | None = None, limit: int | None = None) -> tuple[bytes, str | None]:
+        return self._page(await aget_gate_index(self.version), after, limit)
+
+    def gate_detail(self, gate_id: str) -> bytes | None:
+        """
+        Gate detail JSON, or None if there is no such gate. IDs are case-insensitive.
+        """
+        index = get_gate_index(self.version)
+        gate_id = index.lookup(gate_id)
+        if gate_id is None:
+            return None
+        body = self._details.get(gate_id)
+        if body is None:
+            body = self._details[gate_id] = _render_detail(gate_id, index.name(gate_id), _connection_rows(gate_id))
+        return body
+
+    async def agate_detail(self, gate_id: str) -> bytes | None:
+        index = await aget_gate_index(self.version)
+        gate_id = index.lookup(gate_id)
+        if gate_id is None:
+            return None
+        body = self._details.get(gate_id)
+        if body is None:
+            connections = [row async for row in _connection_rows(gate_id)]
+            body = self._details[gate_id] = _render_detail(gate_id, index.name(gate_id), connections)
+        return body
+
+    def _page(self, index: GateIndex, after, limit):
+        if after is None and limit is None:
+            if self._body is None:
+                self._body = _render_gates(index.ids, index.names)
+            return self._body, None
+
+        start = index.after(after) if after is not None else 0
+        end = len(index) if limit is None else min(start + limit, len(index))
+        body = _render_gates(index.ids[start:end], index.names[start:end])
+        return body, index.ids[end - 1] if end < len(index) else None
+
+
+_rendered_gates: RenderedGates | None = None
+
+
+def rendered_gates(version: str) -> RenderedGates:
+    """
+    The process-wide RenderedGates, started afresh when the version changes.
+    """
+    global _rendered_gates
+
+    rendered = _rendered_gates
+    if rendered is None or rendered.version != version:
+        rendered = _rendered_gates = RenderedGates(version)
+    return rendered
+
+
+def _connection_rows(gate_id: str):
+    return GateConnection.objects.filter(source_id=gate_id).order_by("id").values_list("target_id", "hu")
+
+
+def _render_gates(ids, names) -> bytes:
+    return render_json([{"id": gate_id, "name": name} for gate_id, name in zip(ids, names)])
+
+
+def _render_detail(gate_id: str, name: str | None, connections) -> bytes:
+    # ConnectionSerializer renders hu as a string
+    return render_json({
+        "id": gate_id,
+        "name": name,
+        "connections": [{"id": target_id, "hu": str(hu)} for target_id, hu in connections],
+    })
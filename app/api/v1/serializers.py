@@ -1,9 +1,22 @@
+from django.conf import settings
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from app.constants import HSTC_TRANSPORT_MAX_PASSENGERS
 from app.models import Gate
+from app.services.constrained import RouteConstraints
+from app.services.route_finder import SEARCH_STRATEGIES
 
 
 
 
+class GatesListQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=1, max_value=settings.GATES_PAGE_MAX_LIMIT, required=False)
+    after = serializers.CharField(max_length=Gate._meta.get_field("id").max_length, required=False)
+
+    def validate_after(self, value):
+        return value.upper()
+
+
 class GateListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Gate
@@ -14,11 +27,16 @@ class ConnectionSerializer(serializers.Serializer):
     hu = serializers.CharField()
 
 class GateDetailSerializer(serializers.ModelSerializer):
-    connections = ConnectionSerializer(many=True)
+    connections = serializers.SerializerMethodField()
     class Meta:
         model = Gate
         fields = ["id", "name", "connections"]
 
+    @extend_schema_field(ConnectionSerializer(many=True))
+    def get_connections(self, gate):
+        rows = gate.outgoing_connections.order_by("id").values_list("target_id", "hu")
+        return ConnectionSerializer([{"id": target_id, "hu": hu} for target_id, hu in rows], many=True).data
+
 
 class TransportQuerySerializer(serializers.Serializer):
     passengers = serializers.IntegerField(min_value=1)
@@ -34,9 +52,143 @@ class TransportSerializer(serializers.Serializer):
     breakdown = serializers.DictField()
 
 
+class TransportBulkRequestSerializer(serializers.Serializer):
+    distance_au = serializers.ListField(
+        child=serializers.FloatField(), allow_empty=False, max_length=settings.TRANSPORT_BULK_MAX_ROWS
+    )
+    passengers = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=settings.TRANSPORT_BULK_MAX_ROWS
+    )
+    parking_days = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=settings.TRANSPORT_BULK_MAX_ROWS
+    )
+
+    def validate(self, attrs):
+        rows = len(attrs["distance_au"])
+        attrs.setdefault("parking_days", [0] * rows)
+        if len(attrs["passengers"]) != rows or len(attrs["parking_days"]) != rows:
+            raise serializers.ValidationError("distance_au, passengers and parking_days must have the same length")
+        return attrs
+
+
+class TransportBulkBreakdownSerializer(serializers.Serializer):
+    fuel_cost = serializers.ListField(child=serializers.FloatField())
+    parking_cost = serializers.ListField(child=serializers.FloatField())
+
+
+class TransportBulkSerializer(serializers.Serializer):
+    transport_type = serializers.ListField(child=serializers.CharField())
+    total_cost_gbp = serializers.ListField(child=serializers.FloatField())
+    breakdown = TransportBulkBreakdownSerializer()
+
+
 class RouteSerializer(serializers.Serializer):
     origin = serializers.CharField()
     destination = serializers.CharField()
     path = serializers.ListField(child=serializers.CharField())
     total_hu = serializers.IntegerField()
-    cost_per_passenger_gbp = serializers.FloatField()
\ No newline at end of file
+    cost_per_passenger_gbp = serializers.FloatField()
+
+class RouteQuerySerializer(serializers.Serializer):
+    strategy = serializers.ChoiceField(choices=SEARCH_STRATEGIES, required=False)
+    max_hops = serializers.IntegerField(min_value=1, required=False)
+    max_leg_hu = serializers.IntegerField(min_value=0, required=False)
+    avoid = serializers.CharField(required=False, allow_blank=True)
+    avoid_connections = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_avoid(self, value):
+        return frozenset(gate_id.strip().upper() for gate_id in value.split(",") if gate_id.strip())
+
+    def validate_avoid_connections(self, value):
+        connections = set()
+        for connection in filter(None, (item.strip() for item in value.split(","))):
+            source_id, _, target_id = connection.upper().partition("-")
+            if not source_id or not target_id:
+                raise serializers.ValidationError(f"'{connection}' is not a SOURCE-TARGET gate pair")
+            connections.add((source_id, target_id))
+        return frozenset(connections)
+
+    def validate(self, attrs):
+        attrs["constraints"] = RouteConstraints(
+            max_hops=attrs.get("max_hops"),
+            max_leg_hu=attrs.get("max_leg_hu"),
+            avoid_gates=attrs.get("avoid", frozenset()),
+            avoid_connections=attrs.get("avoid_connections", frozenset()),
+        )
+        return attrs
+
+
+class RouteAlternativesQuerySerializer(serializers.Serializer):
+    k = serializers.IntegerField(min_value=1, max_value=settings.ROUTE_ALTERNATIVES_MAX_K, required=False, default=3)
+
+
+class RouteAlternativesSerializer(serializers.Serializer):
+    origin = serializers.CharField()
+    destination = serializers.CharField()
+    routes = RouteSerializer(many=True)
+
+
+class GateRoutesQuerySerializer(serializers.Serializer):
+    include_path = serializers.BooleanField(required=False, default=False)
+
+
+class GateRouteSerializer(serializers.Serializer):
+    destination = serializers.CharField()
+    path = serializers.ListField(child=serializers.CharField(), required=False)
+    total_hu = serializers.IntegerField()
+    cost_per_passenger_gbp = serializers.FloatField()
+
+
+class GateRoutesSerializer(serializers.Serializer):
+    origin = serializers.CharField()
+    routes = GateRouteSerializer(many=True)
+
+
+class GateReachableSerializer(serializers.Serializer):
+    origin = serializers.CharField()
+    count = serializers.IntegerField()
+    gates = serializers.ListField(child=serializers.CharField())
+
+
+class RoutePairSerializer(serializers.Serializer):
+    origin = serializers.CharField(max_length=3)
+    destination = serializers.CharField(max_length=3)
+
+
+class RouteBatchRequestSerializer(serializers.Serializer):
+    routes = serializers.ListField(
+        child=RoutePairSerializer(),
+        allow_empty=False,
+        max_length=settings.ROUTE_BATCH_MAX_PAIRS,
+    )
+
+
+class RouteBatchErrorSerializer(serializers.Serializer):
+    origin = serializers.CharField()
+    destination = serializers.CharField()
+    status = serializers.IntegerField()
+    detail = serializers.CharField()
+
+
+class QuoteCacheStatsSerializer(serializers.Serializer):
+    kind = serializers.CharField()
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+
+
+class JourneyQuerySerializer(serializers.Serializer):
+    origin = serializers.CharField(max_length=3)
+    destination = serializers.CharField(max_length=3)
+    distance_au = serializers.FloatField(min_value=0)
+    passengers = serializers.IntegerField(min_value=1, max_value=HSTC_TRANSPORT_MAX_PASSENGERS)
+    parking = serializers.IntegerField(min_value=0, required=False, default=0)
+
+
+class JourneySerializer(serializers.Serializer):
+    origin = serializers.CharField()
+    destination = serializers.CharField()
+    passengers = serializers.IntegerField()
+    transport = TransportSerializer()
+    route = RouteSerializer()
+    hyperspace_cost_gbp = serializers.FloatField()
+    total_cost_gbp = serializers.FloatField()
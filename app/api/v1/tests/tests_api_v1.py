@@ -1,12 +1,31 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework import status
-from app.models import Gate
+from app.api.v1.async_views import AsyncGatesListView, AsyncGateDetailView, AsyncRouteView
+from app.api.v1.serializers import GateDetailSerializer, GateListSerializer
+from app.db_router import ReadReplicaRouter
+from app.middleware import ReadReplicaMiddleware
+from app.models import Gate, GateConnection
+from app.services.profiling import metrics
+from app.services.quote_cache import quote_cache
 
 
 class GatesListAPITest(APITestCase):
     def setUp(self):
-        Gate.objects.create(id="SOL", name="Sol", connections=[])
-        Gate.objects.create(id="PRX", name="Proxima", connections=[])
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            Gate.objects.create(id="PRX", name="Proxima")
 
     def test_list_gates(self):
         response = self.client.get("/api/v1/gates/")
@@ -18,14 +37,99 @@ class GatesListAPITest(APITestCase):
         self.assertEqual(response.data[0]["id"], "PRX")
         self.assertEqual(response.data[1]["id"], "SOL")
 
+    def test_list_gates_paginated(self):
+        Gate.objects.create(id="SIR", name="Sirius")
+        response = self.client.get("/api/v1/gates/?limit=2")
+        self.assertEqual([gate["id"] for gate in response.data], ["PRX", "SIR"])
+        self.assertEqual(response["Link"], '<http://testserver/api/v1/gates/?after=SIR&limit=2>; rel="next"')
+
+        response = self.client.get("/api/v1/gates/?limit=2&after=sir")
+        self.assertEqual([gate["id"] for gate in response.data], ["SOL"])
+        self.assertNotIn("Link", response)
+
+    def test_list_gates_invalid_limit(self):
+        response = self.client.get("/api/v1/gates/?limit=0")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_gates_sees_gate_changes(self):
+        self.client.get("/api/v1/gates/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.filter(id="SOL").first().delete()
+        self.assertEqual(len(self.client.get("/api/v1/gates/").data), 1)
+
+    def test_browsable_api(self):
+        response = self.client.get("/api/v1/gates/", HTTP_ACCEPT="text/html")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b"Proxima", response.content)
+
+
+class GateRenderingAPITest(APITestCase):
+    """
+    The gate endpoints serve pre-rendered JSON; it must match what the
+    serializers render byte for byte.
+    """
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol \u2028 \"Terra\" \u00e9\U0001f680 \x01")
+            Gate.objects.create(id="PRX")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="RAN", hu=100)
+
+    def assert_rendered_like_serializers(self):
+        expected = JSONRenderer().render(GateListSerializer(Gate.objects.order_by("id"), many=True).data)
+        self.assertEqual(self.client.get("/api/v1/gates/").content, expected)
+        for gate in Gate.objects.all():
+            expected = JSONRenderer().render(GateDetailSerializer(gate).data)
+            self.assertEqual(self.client.get(f"/api/v1/gates/{gate.id}/").content, expected)
+
+    def test_rendered_like_serializers(self):
+        self.assert_rendered_like_serializers()
+
+    def test_rendered_like_serializers_without_orjson(self):
+        with self.settings(API_ORJSON=False):
+            self.assert_rendered_like_serializers()
+
+    def test_indent_rendered_by_drf(self):
+        response = self.client.get("/api/v1/gates/PRX/", HTTP_ACCEPT="application/json; indent=2")
+        self.assertEqual(response.content, b'{\n  "id": "PRX",\n  "name": null,\n  "connections": []\n}')
+
+    def test_detail_sees_hu_edit(self):
+        self.client.get("/api/v1/gates/SOL/")
+        connection = GateConnection.objects.get(source_id="SOL", target_id="PRX")
+        connection.hu = 5
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.save()
+        self.assertEqual(self.client.get("/api/v1/gates/SOL/").data["connections"][0], {"id": "PRX", "hu": "5"})
+
+    def test_detail_sees_name_edit(self):
+        self.client.get("/api/v1/gates/PRX/")
+        Gate.objects.filter(id="PRX").update(name="Proxima")
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.get(id="PRX").save()
+        self.assertEqual(self.client.get("/api/v1/gates/prx/").data["name"], "Proxima")
+
+    def test_no_queries_once_warm(self):
+        urls = [
+            "/api/v1/gates/", "/api/v1/gates/?limit=1", "/api/v1/gates/SOL/", "/api/v1/gates/sol/",
+            "/api/v1/gates/XYZ/", "/api/v1/gates/SOL/to/PRX/", "/api/v1/gates/SOL/to/XYZ/",
+        ]
+        for url in urls:
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            for url in urls:
+                self.client.get(url)
+        # Unknown gates never reach the database
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/v1/gates/ABC/").status_code, status.HTTP_404_NOT_FOUND)
+
 
 class GateDetailAPITest(APITestCase):
     def setUp(self):
-        Gate.objects.create(
-            id="SOL",
-            name="Sol",
-            connections=[{"id": "PRX", "hu": "90"}, {"id": "RAN", "hu": "100"}]
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="RAN", hu=100)
 
     def test_get_gate_detail(self):
         response = self.client.get("/api/v1/gates/SOL/")
@@ -34,6 +138,10 @@ class GateDetailAPITest(APITestCase):
         self.assertEqual(response.data["name"], "Sol")
         self.assertEqual(len(response.data["connections"]), 2)
 
+    def test_get_gate_detail_connections(self):
+        response = self.client.get("/api/v1/gates/SOL/")
+        self.assertEqual(response.data["connections"], [{"id": "PRX", "hu": "90"}, {"id": "RAN", "hu": "100"}])
+
     def test_get_gate_detail_case_insensitive(self):
         response = self.client.get("/api/v1/gates/sol/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -69,20 +177,49 @@ class TransportAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class TransportBulkAPITest(APITestCase):
+    def test_transport_bulk(self):
+        response = self.client.post("/api/v1/transport/bulk/", {
+            "distance_au": [100, 10, 100],
+            "passengers": [2, 2, 5],
+            "parking_days": [0, 10, 0],
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["transport_type"], ["Personal", "HSTC", "HSTC"])
+        self.assertEqual(response.data["total_cost_gbp"], [30.0, 4.5, 45.0])
+        self.assertEqual(response.data["breakdown"]["fuel_cost"], [30.0, 4.5, 45.0])
+        self.assertEqual(response.data["breakdown"]["parking_cost"], [0.0, 0.0, 0.0])
+
+    def test_transport_bulk_parking_optional(self):
+        response = self.client.post("/api/v1/transport/bulk/", {
+            "distance_au": [100], "passengers": [2],
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_cost_gbp"], [30.0])
+
+    def test_transport_bulk_length_mismatch(self):
+        response = self.client.post("/api/v1/transport/bulk/", {
+            "distance_au": [100, 10], "passengers": [2],
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_transport_bulk_invalid_row(self):
+        response = self.client.post("/api/v1/transport/bulk/", {
+            "distance_au": [100, 100], "passengers": [2, 6],
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["detail"], "row 1: Too many passengers: max is 5")
+
+
 class RouteAPITest(APITestCase):
     def setUp(self):
-        Gate.objects.create(
-            id="SOL", name="Sol",
-            connections=[{"id": "PRX", "hu": "90"}, {"id": "SIR", "hu": "100"}]
-        )
-        Gate.objects.create(
-            id="PRX", name="Proxima",
-            connections=[{"id": "SIR", "hu": "10"}]
-        )
-        Gate.objects.create(
-            id="SIR", name="Sirius",
-            connections=[]
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            Gate.objects.create(id="SIR", name="Sirius")
 
     def test_direct_route(self):
         response = self.client.get("/api/v1/gates/SOL/to/PRX/")
@@ -122,3 +259,380 @@ class RouteAPITest(APITestCase):
         # SIR has no outgoing connections
         response = self.client.get("/api/v1/gates/SIR/to/SOL/")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response["X-Route-Strategy"], "reachability")
+
+    def test_constrained_route(self):
+        response = self.client.get("/api/v1/gates/SOL/to/SIR/?avoid=sir")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get("/api/v1/gates/SOL/to/SIR/?max_leg_hu=95&max_hops=2")
+        self.assertEqual(response.data["path"], ["SOL", "PRX", "SIR"])
+        self.assertEqual(response["X-Route-Strategy"], "constrained")
+
+        response = self.client.get("/api/v1/gates/SOL/to/SIR/?avoid_connections=prx-sir,SOL-PRX")
+        self.assertEqual(response.data["path"], ["SOL", "SIR"])
+
+    def test_constrained_route_invalid(self):
+        for query in ("max_hops=0", "max_leg_hu=-1", "avoid_connections=SOL"):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/v1/gates/SOL/to/SIR/?{query}")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RouteBatchAPITest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            Gate.objects.create(id="SIR", name="Sirius")
+
+    def test_batch_routes(self):
+        response = self.client.post("/api/v1/routes/batch/", {"routes": [
+            {"origin": "SOL", "destination": "PRX"},
+            {"origin": "sol", "destination": "sir"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results[0], self.client.get("/api/v1/gates/SOL/to/PRX/").data)
+        self.assertEqual(results[1]["origin"], "SOL")
+        self.assertEqual(results[1]["total_hu"], 100)
+
+    def test_batch_per_item_errors(self):
+        response = self.client.post("/api/v1/routes/batch/", {"routes": [
+            {"origin": "SIR", "destination": "SOL"},
+            {"origin": "XYZ", "destination": "SOL"},
+            {"origin": "SOL", "destination": "PRX"},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results[0]["status"], status.HTTP_404_NOT_FOUND)
+        self.assertEqual(results[0]["detail"], "No route found from SIR to SOL")
+        self.assertEqual(results[1]["status"], status.HTTP_404_NOT_FOUND)
+        self.assertEqual(results[2]["path"], ["SOL", "PRX"])
+
+    def test_batch_empty(self):
+        response = self.client.post("/api/v1/routes/batch/", {"routes": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_invalid_pair(self):
+        response = self.client.post("/api/v1/routes/batch/", {"routes": [{"origin": "SOL"}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GateRoutesAPITest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            Gate.objects.create(id="SIR", name="Sirius")
+
+    def get_json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_routes_from_gate(self):
+        data = self.get_json("/api/v1/gates/sol/routes/")
+        self.assertEqual(data, {"origin": "SOL", "routes": [
+            {"destination": "PRX", "total_hu": 90, "cost_per_passenger_gbp": 18.0},
+            {"destination": "SIR", "total_hu": 100, "cost_per_passenger_gbp": 20.0},
+        ]})
+
+    def test_routes_from_gate_with_path(self):
+        data = self.get_json("/api/v1/gates/SOL/routes/?include_path=true")
+        self.assertEqual(data["routes"][1]["path"], ["SOL", "SIR"])
+
+    def test_routes_from_gate_without_reachable_gates(self):
+        data = self.get_json("/api/v1/gates/SIR/routes/")
+        self.assertEqual(data, {"origin": "SIR", "routes": []})
+
+    def test_routes_from_unknown_gate(self):
+        response = self.client.get("/api/v1/gates/XYZ/routes/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reachable_gates(self):
+        response = self.client.get("/api/v1/gates/sol/reachable/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"origin": "SOL", "count": 2, "gates": ["PRX", "SIR"]})
+
+        response = self.client.get("/api/v1/gates/SIR/reachable/")
+        self.assertEqual(response.data, {"origin": "SIR", "count": 0, "gates": []})
+
+        response = self.client.get("/api/v1/gates/XYZ/reachable/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RouteAlternativesAPITest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+            Gate.objects.create(id="SIR", name="Sirius")
+
+    def test_alternatives(self):
+        response = self.client.get("/api/v1/gates/sol/to/sir/alternatives/?k=5")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["origin"], "SOL")
+        self.assertEqual(response.data["destination"], "SIR")
+        routes = response.data["routes"]
+        self.assertEqual([route["total_hu"] for route in routes], [100, 100])
+        self.assertEqual(routes[0], self.client.get("/api/v1/gates/SOL/to/SIR/").data)
+
+    def test_k_limits_routes(self):
+        response = self.client.get("/api/v1/gates/SOL/to/SIR/alternatives/?k=1")
+        self.assertEqual(len(response.data["routes"]), 1)
+
+    def test_invalid_k(self):
+        for k in ("0", "abc", "1000"):
+            response = self.client.get(f"/api/v1/gates/SOL/to/SIR/alternatives/?k={k}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_not_found(self):
+        self.assertEqual(self.client.get("/api/v1/gates/SOL/to/XYZ/alternatives/").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get("/api/v1/gates/SIR/to/SOL/alternatives/").status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QuoteCacheAPITest(APITestCase):
+    def setUp(self):
+        quote_cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            Gate.objects.create(id="PRX", name="Proxima")
+
+    def test_route_cache_hit(self):
+        first = self.client.get("/api/v1/gates/SOL/to/PRX/")
+        second = self.client.get("/api/v1/gates/sol/to/prx/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+
+    def test_route_cache_invalidated_by_gate_change(self):
+        self.client.get("/api/v1/gates/SOL/to/PRX/")
+        connection = GateConnection.objects.get(source_id="SOL")
+        connection.hu = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.save()
+        response = self.client.get("/api/v1/gates/SOL/to/PRX/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["total_hu"], 10)
+
+    def test_not_found_cached(self):
+        self.client.get("/api/v1/gates/PRX/to/SOL/")
+        response = self.client.get("/api/v1/gates/PRX/to/SOL/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertNotIn("ETag", response)
+
+    def test_etag_and_cache_control(self):
+        response = self.client.get("/api/v1/gates/SOL/to/PRX/")
+        self.assertIn("ETag", response)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=", response["Cache-Control"])
+
+        not_modified = self.client.get("/api/v1/gates/SOL/to/PRX/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_transport_cache_hit(self):
+        self.client.get("/api/v1/transport/100/?passengers=2")
+        response = self.client.get("/api/v1/transport/100.0/?passengers=2&parking=0")
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["total_cost_gbp"], 30.0)
+
+    def test_cache_stats(self):
+        self.client.get("/api/v1/gates/SOL/to/PRX/")
+        self.client.get("/api/v1/gates/SOL/to/PRX/")
+        response = self.client.get("/api/v1/cache/quotes/")
+        self.assertEqual(response.data, [{"kind": "route", "hits": 1, "misses": 1}])
+
+
+class JourneyAPITest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            Gate.objects.create(id="PRX", name="Proxima")
+
+    def test_journey(self):
+        response = self.client.get("/api/v1/journeys/?origin=sol&destination=PRX&distance_au=100&passengers=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["origin"], "SOL")
+        self.assertEqual(response.data["transport"]["parking_days"], 0)
+        self.assertEqual(response.data["route"]["total_hu"], 90)
+        self.assertEqual(response.data["hyperspace_cost_gbp"], 36.0)
+        self.assertEqual(response.data["total_cost_gbp"], 66.0)
+
+    def test_journey_missing_parameters(self):
+        response = self.client.get("/api/v1/journeys/?origin=SOL&destination=PRX")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_journey_too_many_passengers(self):
+        response = self.client.get("/api/v1/journeys/?origin=SOL&destination=PRX&distance_au=100&passengers=6")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_journey_no_route(self):
+        response = self.client.get("/api/v1/journeys/?origin=PRX&destination=SOL&distance_au=100&passengers=2")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_journey_unknown_gate(self):
+        response = self.client.get("/api/v1/journeys/?origin=XYZ&destination=SOL&distance_au=100&passengers=2")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncViewsAPITest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            Gate.objects.create(id="SIR", name="Sirius")
+        self.factory = AsyncRequestFactory()
+
+    async def assert_same_as_sync(self, view, path, **kwargs):
+        response = await view.as_view()(self.factory.get(path), **kwargs)
+        expected = await sync_to_async(self.client.get)(path)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    async def test_gates(self):
+        await self.assert_same_as_sync(AsyncGatesListView, "/api/v1/gates/")
+        response = await self.assert_same_as_sync(AsyncGatesListView, "/api/v1/gates/?limit=1&after=PRX")
+        self.assertEqual(response["Link"], '<http://testserver/api/v1/gates/?after=SIR&limit=1>; rel="next"')
+        await self.assert_same_as_sync(AsyncGateDetailView, "/api/v1/gates/sol/", gate_id="sol")
+        response = await self.assert_same_as_sync(AsyncGateDetailView, "/api/v1/gates/XYZ/", gate_id="XYZ")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_route(self):
+        path = "/api/v1/gates/SOL/to/SIR/?strategy=bidirectional"
+        response = await self.assert_same_as_sync(AsyncRouteView, path, gate_id="SOL", target_gate_id="SIR")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["total_hu"], 100)
+        self.assertEqual((response["X-Cache"], response["X-Route-Strategy"]), ("MISS", "bidirectional"))
+
+        response = await AsyncRouteView.as_view()(self.factory.get(path), gate_id="SOL", target_gate_id="SIR")
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertNotIn("X-Route-Strategy", response)
+
+    async def test_route_errors(self):
+        for path, kwargs in (
+            ("/api/v1/gates/XYZ/to/SOL/", {"gate_id": "XYZ", "target_gate_id": "SOL"}),
+            ("/api/v1/gates/SIR/to/SOL/", {"gate_id": "SIR", "target_gate_id": "SOL"}),
+            ("/api/v1/gates/SOL/to/SIR/?strategy=teleport", {"gate_id": "SOL", "target_gate_id": "SIR"}),
+        ):
+            with self.subTest(path=path):
+                await self.assert_same_as_sync(AsyncRouteView, path, **kwargs)
+
+    def add_connection(self, source_id, target_id, hu):
+        with self.captureOnCommitCallbacks(execute=True):
+            GateConnection.objects.create(source_id=source_id, target_id=target_id, hu=hu)
+
+    async def test_route_sees_gate_changes(self):
+        path = "/api/v1/gates/SOL/to/SIR/"
+        await AsyncRouteView.as_view()(self.factory.get(path), gate_id="SOL", target_gate_id="SIR")
+        await sync_to_async(self.add_connection)("SOL", "SIR", 1)
+        response = await self.assert_same_as_sync(AsyncRouteView, path, gate_id="SOL", target_gate_id="SIR")
+        self.assertEqual(json.loads(response.content)["total_hu"], 1)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0)
+class ProfilingAPITest(APITestCase):
+    def setUp(self):
+        quote_cache.clear()
+        metrics.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            Gate.objects.create(id="PRX", name="Proxima")
+
+    def test_server_timing(self):
+        response = self.client.get("/api/v1/gates/SOL/to/PRX/")
+        timings = {metric.split(";")[0]: metric for metric in response["Server-Timing"].split(", ")}
+        for phase in ("db", "graph", "search", "quote_cache", "render", "total"):
+            self.assertIn(phase, timings)
+        self.assertIn('desc="settled=2 relaxed=1"', timings["search-work"])
+
+        response = self.client.get("/api/v1/transport/100/?passengers=2")
+        self.assertIn("pricing;dur=", response["Server-Timing"])
+
+    def test_metrics(self):
+        self.client.get("/api/v1/gates/SOL/to/PRX/")
+        self.client.get("/api/v1/gates/SOL/to/PRX/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn('interstellar_http_requests_total{view="gate-route",method="GET",status="200"} 2', body)
+        self.assertIn('interstellar_http_request_duration_seconds_count{view="gate-route"} 2', body)
+        self.assertIn('interstellar_route_searches_total{strategy="dijkstra"} 1', body)
+        self.assertIn('interstellar_quote_cache_requests_total{kind="route",outcome="hit"} 1', body)
+
+    def test_slow_request_profiled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(PROFILING_SAMPLE_RATE=1, PROFILING_SLOW_REQUEST_MS=0, PROFILING_DUMP_DIR=directory):
+                self.client.get("/api/v1/gates/SOL/to/PRX/")
+            self.assertEqual(len(list(Path(directory).glob("*-gate-route-*.pstats"))), 1)
+        self.assertIn("interstellar_profiles_dumped_total 1", self.client.get("/metrics").content.decode())
+
+    def test_disabled(self):
+        with self.settings(PROFILING_ENABLED=False):
+            response = self.client.get("/api/v1/gates/SOL/to/PRX/")
+        self.assertNotIn("Server-Timing", response)
+
+
+class ReadReplicaAPITest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+        self.router = ReadReplicaRouter()
+        # Pretend the gates last changed long ago
+        self.changed_at = mock.patch("app.services.graph.graph_changed_at", return_value=time.time() - 3600)
+        self.changed_at.start()
+        self.addCleanup(self.changed_at.stop)
+
+    def read_database(self, path):
+        """The database the router picks for a read made while serving ``path``."""
+        databases = []
+
+        def view(request):
+            databases.append(self.router.db_for_read(Gate))
+            return HttpResponse()
+
+        with mock.patch.dict(settings.DATABASES, {"replica": settings.DATABASES["default"]}):
+            ReadReplicaMiddleware(view)(RequestFactory().get(path))
+        return databases[0]
+
+    def test_read_only_endpoints(self):
+        for path in ("/api/v1/gates/", "/api/v1/gates/SOL/", "/api/v1/gates/SOL/to/PRX/", "/api/v1/gates/SOL/reachable/"):
+            with self.subTest(path=path):
+                self.assertEqual(self.read_database(path), "replica")
+        for path in ("/metrics", "/admin/", "/nowhere/"):
+            with self.subTest(path=path):
+                self.assertIsNone(self.read_database(path))
+        self.assertIsNone(self.router.db_for_read(Gate))
+
+    def test_primary_right_after_gate_change(self):
+        self.changed_at.stop()
+        Gate.objects.create(id="PRX", name="Proxima")
+        self.assertIsNone(self.read_database("/api/v1/gates/"))
+        with self.settings(DB_REPLICA_LAG_SECONDS=0):
+            self.assertEqual(self.read_database("/api/v1/gates/"), "replica")
+
+    def test_without_replica(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReadReplicaMiddleware(lambda request: HttpResponse())
+        self.assertFalse(self.router.allow_migrate("replica", "app"))
+        self.assertTrue(self.router.allow_migrate("default", "app"))
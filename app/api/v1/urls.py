@@ -1,11 +1,32 @@
+from django.conf import settings
 from django.urls import path
-from app.api.v1.views import GatesListView, GateDetailView, TransportView, RouteView
+from app.api.v1.async_views import AsyncGatesListView, AsyncGateDetailView, AsyncRouteView
+from app.api.v1.views import GatesListView, GateDetailView, TransportView, RouteView, RouteAlternativesView, RouteBatchView, GateRoutesView, GateReachableView, QuoteCacheStatsView, TransportBulkView, JourneyView
 
 
-urlpatterns = [
-    path("gates/", GatesListView.as_view(), name="gates-list"),
-    path("gates/<str:gate_id>/", GateDetailView.as_view(), name="gate-detail"),
-    path("gates/<str:gate_id>/to/<str:target_gate_id>/", RouteView.as_view(), name="gate-route"),
-    path("transport/<str:distance>/", TransportView.as_view(), name="transport"),
+def api_urlpatterns(async_views: bool) -> list:
+    """
+    API routes; with ``async_views`` the gate list, gate detail and route
+    endpoints are served by natively async views (for ASGI deployments).
+    """
+    if async_views:
+        gates_list_view, gate_detail_view, route_view = AsyncGatesListView, AsyncGateDetailView, AsyncRouteView
+    else:
+        gates_list_view, gate_detail_view, route_view = GatesListView, GateDetailView, RouteView
 
-]
\ No newline at end of file
+    return [
+        path("gates/", gates_list_view.as_view(), name="gates-list"),
+        path("gates/<str:gate_id>/", gate_detail_view.as_view(), name="gate-detail"),
+        path("gates/<str:gate_id>/routes/", GateRoutesView.as_view(), name="gate-routes"),
+        path("gates/<str:gate_id>/reachable/", GateReachableView.as_view(), name="gate-reachable"),
+        path("gates/<str:gate_id>/to/<str:target_gate_id>/", route_view.as_view(), name="gate-route"),
+        path("gates/<str:gate_id>/to/<str:target_gate_id>/alternatives/", RouteAlternativesView.as_view(), name="gate-route-alternatives"),
+        path("transport/bulk/", TransportBulkView.as_view(), name="transport-bulk"),
+        path("transport/<str:distance>/", TransportView.as_view(), name="transport"),
+        path("journeys/", JourneyView.as_view(), name="journeys"),
+        path("routes/batch/", RouteBatchView.as_view(), name="routes-batch"),
+        path("cache/quotes/", QuoteCacheStatsView.as_view(), name="quote-cache-stats"),
+    ]
+
+
+urlpatterns = api_urlpatterns(settings.ASYNC_API_VIEWS)
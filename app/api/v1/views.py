@@ -1,25 +1,59 @@
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework.utils.urls import replace_query_param
+from drf_spectacular.utils import extend_schema, OpenApiParameter, PolymorphicProxySerializer, inline_serializer
 
-from app.models import Gate
-from app.api.v1.serializers import GateListSerializer, GateDetailSerializer, TransportQuerySerializer, TransportSerializer, RouteSerializer
-from app.services.transport_cost import cheapest_transport
-from app.services.route_finder import find_cheapest_route
+from app.api.v1.caching import cached_quote_response
+from app.api.v1.rendering import PrerenderedResponse, rendered_gates
+from app.api.v1.serializers import GatesListQuerySerializer, GateListSerializer, GateDetailSerializer, TransportQuerySerializer, TransportSerializer, RouteSerializer, RouteQuerySerializer, RouteAlternativesQuerySerializer, RouteAlternativesSerializer, RouteBatchRequestSerializer, RouteBatchErrorSerializer, GateRoutesQuerySerializer, GateRoutesSerializer, GateReachableSerializer, QuoteCacheStatsSerializer, TransportBulkRequestSerializer, TransportBulkSerializer, JourneyQuerySerializer, JourneySerializer
+from app.services.constrained import RouteConstraints
+from app.services.transport_cost import cheapest_transport, cheapest_transport_bulk
+from app.services.engine import SearchStats
+from app.services.graph import graph_version
+from app.services.journey_planner import plan_journey
+from app.services.profiling import span
+from app.services.quote_cache import quote_cache
+from app.services.route_finder import SEARCH_STRATEGIES, find_alternative_routes, find_cheapest_route, find_cheapest_routes, find_reachable_gates, iter_routes_from
 
 
 class GatesListView(APIView):
     @extend_schema(
         summary="List all gates",
-        description="Returns a list of all hyperspace gates in the network",
-        responses={200: GateListSerializer(many=True)},
+        description=(
+            "Returns a list of all hyperspace gates in the network, in gate ID order. "
+            "With limit, returns one page of gates; a Link header with rel=\"next\" points at the next page."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="limit", type=int, required=False,
+                description=f"Gates per page, 1-{settings.GATES_PAGE_MAX_LIMIT} (default: all gates)"
+            ),
+            OpenApiParameter(name="after", type=str, required=False, description="Return the gates after this gate ID"),
+        ],
+        responses={200: GateListSerializer(many=True), 400: None},
         tags=["Gates"]
     )
     def get(self, request):
-        gates = Gate.objects.all().order_by("id")
-        serializer = GateListSerializer(gates, many=True)
-        return Response(serializer.data)
+        qs = GatesListQuerySerializer(data=request.query_params)
+        if not qs.is_valid():
+            return Response(qs.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        body, last = rendered_gates(graph_version()).gates_page(qs.validated_data.get("after"), qs.validated_data.get("limit"))
+        return add_next_link(PrerenderedResponse(body), request, last)
+
+
+def add_next_link(response, request, last: str | None):
+    """
+    Point a gate list page at the page after gate ID ``last``, if any.
+    """
+    if last is not None:
+        response["Link"] = f'<{replace_query_param(request.build_absolute_uri(), "after", last)}>; rel="next"'
+    return response
 
 
 class GateDetailView(APIView):
@@ -30,14 +64,10 @@ class GateDetailView(APIView):
         tags=["Gates"]
     )
     def get(self, request, gate_id: str):
-        gate = Gate.objects.filter(id=gate_id.upper()).first()
-        if not gate:
+        body = rendered_gates(graph_version()).gate_detail(gate_id)
+        if body is None:
             return Response({"detail": "Gate not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        serializer = GateDetailSerializer(gate)
-        return Response(serializer.data)
-
-
+        return PrerenderedResponse(body)
 
 
 class TransportView(APIView):
@@ -63,40 +93,351 @@ class TransportView(APIView):
         passengers = qs.validated_data["passengers"]
         parking = qs.validated_data.get("parking", 0)
 
+        def quote():
+            try:
+                result = cheapest_transport(distance, passengers, parking)
+            except ValueError as e:
+                return {"detail": str(e)}, status.HTTP_400_BAD_REQUEST
+
+            payload = {
+                "distance_in_au": distance,
+                "passengers": passengers,
+                "parking_days": parking,
+                **result,
+            }
+            with span("serialize"):
+                return TransportSerializer(payload).data, status.HTTP_200_OK
+
+        params = {"distance": distance, "passengers": passengers, "parking": parking}
+        return cached_quote_response(request, "transport", params, quote)
+
+
+class TransportBulkView(APIView):
+    @extend_schema(
+        summary="Calculate transport costs in bulk",
+        description=(
+            "Returns the cheapest vehicle option and cost for each (distance_au, passengers, parking_days) row. "
+            "Inputs and outputs are parallel arrays; parking_days defaults to 0 for every row."
+        ),
+        request=TransportBulkRequestSerializer,
+        responses={200: TransportBulkSerializer, 400: None},
+        tags=["Transport"]
+    )
+    def post(self, request):
+        qs = TransportBulkRequestSerializer(data=request.data)
+        if not qs.is_valid():
+            return Response(qs.errors, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            result = cheapest_transport(distance, passengers, parking)
+            result = cheapest_transport_bulk(
+                qs.validated_data["distance_au"],
+                qs.validated_data["passengers"],
+                qs.validated_data["parking_days"],
+            )
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         payload = {
-            "distance_in_au": distance,
-            "passengers": passengers,
-            "parking_days": parking,
-            **result,
+            "transport_type": result["transport_type"].tolist(),
+            "total_cost_gbp": result["total_cost_gbp"].tolist(),
+            "breakdown": {key: values.tolist() for key, values in result["breakdown"].items()},
         }
-        serialize_data = TransportSerializer(payload)
-
-        return Response(serialize_data.data, status=status.HTTP_200_OK)
+        return Response(payload, status=status.HTTP_200_OK)
 
 
 class RouteView(APIView):
     @extend_schema(
         summary="Find cheapest route",
-        description="Calculates the cheapest hyperspace route between two gates",
-        responses={200: RouteSerializer, 404: None},
+        description=(
+            "Calculates the cheapest hyperspace route between two gates. "
+            "With max_hops, max_leg_hu, avoid or avoid_connections, returns the cheapest route "
+            "that respects those limits (constrained search). "
+            "Freshly computed routes report the search used and the number of gates it settled "
+            "in the X-Route-Strategy and X-Route-Settled-Nodes headers."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="strategy", type=str, required=False, enum=SEARCH_STRATEGIES,
+                description=(
+                    "Search strategy (default: ROUTE_SEARCH_STRATEGY setting). All strategies return a cheapest route; "
+                    "'ch' may choose a different one when several routes tie. Ignored with constraints."
+                )
+            ),
+            OpenApiParameter(name="max_hops", type=int, required=False, description="Most connections the route may take"),
+            OpenApiParameter(name="max_leg_hu", type=int, required=False, description="Most HU of any one connection"),
+            OpenApiParameter(
+                name="avoid", type=str, required=False,
+                description="Comma-separated gate IDs the route must not pass through, e.g. PRX,SIR"
+            ),
+            OpenApiParameter(
+                name="avoid_connections", type=str, required=False,
+                description="Comma-separated SOURCE-TARGET connections the route must not use, e.g. SOL-PRX"
+            ),
+        ],
+        responses={200: RouteSerializer, 400: None, 404: None},
         tags=["Gates"]
     )
     def get(self, request, gate_id: str, target_gate_id: str):
+        qs = RouteQuerySerializer(data=request.query_params)
+        if not qs.is_valid():
+            return Response(qs.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        strategy = qs.validated_data.get("strategy") or settings.ROUTE_SEARCH_STRATEGY
+        constraints = qs.validated_data["constraints"]
+        search = SearchStats()
+
+        def quote():
+            try:
+                result = find_cheapest_route(gate_id, target_gate_id, strategy, search, constraints)
+            except ValueError as e:
+                return {"detail": str(e)}, status.HTTP_404_NOT_FOUND
+            return route_quote_data(gate_id, target_gate_id, result)
+
+        params = route_quote_params(gate_id, target_gate_id, strategy, constraints)
+        response = cached_quote_response(request, "route", params, quote, version=graph_version())
+        return add_search_headers(response, search)
+
+
+def route_quote_params(gate_id: str, target_gate_id: str, strategy: str, constraints: RouteConstraints) -> dict:
+    # Keyed on the strategy too, as "ch" may pick a different route among equal-cost ties
+    params = {"origin": gate_id.upper(), "destination": target_gate_id.upper(), "strategy": strategy}
+    if constraints:
+        params["constraints"] = constraints.params()
+    return params
+
+
+def route_quote_data(gate_id: str, target_gate_id: str, result):
+    """
+    (data, status) of a route quote for a ``find_cheapest_route`` result.
+    """
+    if result is None:
+        return (
+            {"detail": f"No route found from {gate_id.upper()} to {target_gate_id.upper()}"},
+            status.HTTP_404_NOT_FOUND
+        )
+    with span("serialize"):
+        return RouteSerializer(result).data, status.HTTP_200_OK
+
+
+def add_search_headers(response, search: SearchStats):
+    """
+    Report the search behind a freshly computed route; cached quotes ran no search.
+    """
+    if search.strategy:
+        response["X-Route-Strategy"] = search.strategy
+        response["X-Route-Settled-Nodes"] = str(search.settled_nodes)
+    return response
+
+
+class RouteAlternativesView(APIView):
+    @extend_schema(
+        summary="Find alternative routes",
+        description=(
+            "Returns the cheapest hyperspace route between two gates followed by up to k - 1 "
+            "loopless alternatives, cheapest first"
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="k", type=int, required=False,
+                description=f"Number of routes to return, 1-{settings.ROUTE_ALTERNATIVES_MAX_K} (default: 3)"
+            )
+        ],
+        responses={200: RouteAlternativesSerializer, 400: None, 404: None},
+        tags=["Gates"]
+    )
+    def get(self, request, gate_id: str, target_gate_id: str):
+        qs = RouteAlternativesQuerySerializer(data=request.query_params)
+        if not qs.is_valid():
+            return Response(qs.errors, status=status.HTTP_400_BAD_REQUEST)
+        k = qs.validated_data["k"]
+
+        def quote():
+            try:
+                routes = find_alternative_routes(gate_id, target_gate_id, k)
+            except ValueError as e:
+                return {"detail": str(e)}, status.HTTP_404_NOT_FOUND
+
+            if not routes:
+                return (
+                    {"detail": f"No route found from {gate_id.upper()} to {target_gate_id.upper()}"},
+                    status.HTTP_404_NOT_FOUND
+                )
+
+            data = {"origin": gate_id.upper(), "destination": target_gate_id.upper(), "routes": routes}
+            return RouteAlternativesSerializer(data).data, status.HTTP_200_OK
+
+        params = {"origin": gate_id.upper(), "destination": target_gate_id.upper(), "k": k}
+        return cached_quote_response(request, "alternatives", params, quote, version=graph_version())
+
+
+class QuoteCacheStatsView(APIView):
+    @extend_schema(
+        summary="Quote cache statistics",
+        description="Returns quote cache hit and miss counts per quote kind for the serving worker process",
+        responses={200: QuoteCacheStatsSerializer(many=True)},
+        tags=["Monitoring"]
+    )
+    def get(self, request):
+        stats = [{"kind": kind, **counts} for kind, counts in quote_cache.stats().items()]
+        return Response(QuoteCacheStatsSerializer(stats, many=True).data)
+
+
+class RouteBatchView(APIView):
+    @extend_schema(
+        summary="Find cheapest routes in bulk",
+        description=(
+            "Calculates the cheapest hyperspace route for each origin/destination pair. "
+            "Results are returned in request order; pairs without a route are reported per item."
+        ),
+        request=RouteBatchRequestSerializer,
+        responses={200: inline_serializer(
+            name="RouteBatchResponse",
+            fields={"results": PolymorphicProxySerializer(
+                component_name="RouteBatchItem",
+                serializers=[RouteSerializer, RouteBatchErrorSerializer],
+                resource_type_field_name=None,
+                many=True,
+            )},
+        ), 400: None},
+        tags=["Gates"]
+    )
+    def post(self, request):
+        qs = RouteBatchRequestSerializer(data=request.data)
+        if not qs.is_valid():
+            return Response(qs.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        pairs = [(pair["origin"], pair["destination"]) for pair in qs.validated_data["routes"]]
+        results = []
+        for (origin_id, destination_id), result in zip(pairs, find_cheapest_routes(pairs)):
+            if isinstance(result, dict):
+                results.append(RouteSerializer(result).data)
+                continue
+
+            if result is None:
+                detail = f"No route found from {origin_id.upper()} to {destination_id.upper()}"
+            else:
+                detail = str(result)
+            results.append(RouteBatchErrorSerializer({
+                "origin": origin_id.upper(),
+                "destination": destination_id.upper(),
+                "status": status.HTTP_404_NOT_FOUND,
+                "detail": detail,
+            }).data)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class GateRoutesView(APIView):
+    @extend_schema(
+        summary="Find cheapest routes to every gate",
+        description=(
+            "Calculates the cheapest hyperspace route from a gate to every gate reachable from it, "
+            "in gate ID order. The response is streamed."
+        ),
+        parameters=[
+            OpenApiParameter(name="include_path", type=bool, required=False, description="Include the gate path of each route (default: false)")
+        ],
+        responses={200: GateRoutesSerializer, 400: None, 404: None},
+        tags=["Gates"]
+    )
+    def get(self, request, gate_id: str):
+        qs = GateRoutesQuerySerializer(data=request.query_params)
+        if not qs.is_valid():
+            return Response(qs.errors, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            result = find_cheapest_route(gate_id, target_gate_id)
+            routes = iter_routes_from(gate_id, include_path=qs.validated_data["include_path"])
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
 
-        if result is None:
-            return Response(
-                {"detail": f"No route found from {gate_id.upper()} to {target_gate_id.upper()}"},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        return StreamingHttpResponse(
+            _stream_gate_routes(gate_id.upper(), routes),
+            content_type="application/json",
+        )
+
+
+class GateReachableView(APIView):
+    @extend_schema(
+        summary="List gates reachable from a gate",
+        description=(
+            "Returns the gates a hyperspace route from this gate leads to, in gate ID order, "
+            "without calculating the routes"
+        ),
+        responses={200: GateReachableSerializer, 404: None},
+        tags=["Gates"]
+    )
+    def get(self, request, gate_id: str):
+        try:
+            gates = find_reachable_gates(gate_id)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        data = {"origin": gate_id.upper(), "count": len(gates), "gates": gates}
+        return Response(GateReachableSerializer(data).data)
+
+
+def _stream_gate_routes(origin_id: str, routes, chunk_size: int = 256):
+    """
+    Encode {"origin": ..., "routes": [...]} a chunk of routes at a time.
+    """
+    yield f'{{"origin":{json.dumps(origin_id)},"routes":['.encode()
+
+    chunk = []
+    separator = ""
+    for route in routes:
+        del route["origin"]
+        chunk.append(json.dumps(route, separators=(",", ":")))
+        if len(chunk) == chunk_size:
+            yield (separator + ",".join(chunk)).encode()
+            separator = ","
+            chunk = []
+    if chunk:
+        yield (separator + ",".join(chunk)).encode()
+
+    yield b"]}"
+
+
+class JourneyView(APIView):
+    @extend_schema(
+        summary="Plan a door-to-door journey",
+        description=(
+            "Returns the cheapest journey for a group of passengers: transport to the origin gate "
+            "(distance in AUs) plus the cheapest hyperspace route to the destination gate for every passenger."
+        ),
+        parameters=[
+            OpenApiParameter(name="origin", type=str, required=True, description="Gate the passengers depart from"),
+            OpenApiParameter(name="destination", type=str, required=True, description="Destination gate"),
+            OpenApiParameter(name="distance_au", type=float, required=True, description="Distance to the origin gate in AUs"),
+            OpenApiParameter(name="passengers", type=int, required=True, description="Number of passengers (1-5)"),
+            OpenApiParameter(name="parking", type=int, required=False, description="Days of parking at the origin gate (default: 0)")
+        ],
+        responses={200: JourneySerializer, 400: None, 404: None},
+        tags=["Journeys"]
+    )
+    def get(self, request):
+        qs = JourneyQuerySerializer(data=request.query_params)
+        if not qs.is_valid():
+            return Response(qs.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = dict(qs.validated_data)
+        params["origin"] = params["origin"].upper()
+        params["destination"] = params["destination"].upper()
+
+        def quote():
+            try:
+                result = plan_journey(
+                    params["origin"], params["destination"],
+                    params["distance_au"], params["passengers"], params["parking"],
+                )
+            except ValueError as e:
+                return {"detail": str(e)}, status.HTTP_404_NOT_FOUND
+
+            if result is None:
+                return (
+                    {"detail": f"No route found from {params['origin']} to {params['destination']}"},
+                    status.HTTP_404_NOT_FOUND
+                )
+
+            return JourneySerializer(result).data, status.HTTP_200_OK
 
-        serializer = RouteSerializer(result)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return cached_quote_response(request, "journey", params, quote, version=graph_version())
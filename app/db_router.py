@@ -0,0 +1,59 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+REPLICA_ALIAS = "replica"
+
+# Set for the duration of a request to a read-only endpoint
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+class ReadReplicaRouter:
+    """
+    Sends the reads of read-only requests to the "replica" database.
+
+    Only reads made inside ``replica_reads()`` (the gate and route endpoints,
+    see ReadReplicaMiddleware) are routed, and only when a replica is
+    configured. Gates, the compiled graph and rendered responses are cached
+    per graph version, so a replica that is behind could pin stale gates
+    under a new version: for DB_REPLICA_LAG_SECONDS after the gates change,
+    reads stay on the primary. Everything else uses "default".
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and REPLICA_ALIAS in settings.DATABASES and _replica_caught_up():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+@contextmanager
+def replica_reads():
+    """
+    Route the reads made in this block (and threads started from its context) to the replica.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def _replica_caught_up() -> bool:
+    # Imported here: app.services.graph imports the models
+    from app.services.graph import graph_changed_at
+
+    changed_at = graph_changed_at()
+    return changed_at is None or time.time() - changed_at >= settings.DB_REPLICA_LAG_SECONDS
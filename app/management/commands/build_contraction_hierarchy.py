@@ -0,0 +1,44 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.services.contraction import ContractionHierarchy, ids_digest
+from app.services.graph import get_graph
+
+
+class Command(BaseCommand):
+    help = "Build the contraction hierarchy from the Gate table and write it to disk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", type=Path, default=None, help="Defaults to ROUTE_CH_PATH")
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Recompute the node order even if the existing hierarchy has the same gates",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"] or Path(settings.ROUTE_CH_PATH)
+        graph = get_graph()
+
+        previous = None
+        if output.exists() and not options["full"]:
+            previous = ContractionHierarchy.load(output)
+
+        start = time.perf_counter()
+        if previous is not None and previous.fingerprint == graph.fingerprint:
+            self.stdout.write(f"{output} is up to date")
+            return
+        if previous is not None and previous.ids_digest == ids_digest(graph):
+            mode = "re-contracted in the existing order"
+            hierarchy = previous.rebuild(graph)
+        else:
+            mode = "built"
+            hierarchy = ContractionHierarchy.build(graph)
+        hierarchy.save(output)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Contraction hierarchy for {len(graph)} gates ({hierarchy.shortcut_count} shortcuts) "
+            f"{mode} and written to {output} in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,35 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.graph import get_graph
+from app.services.route_table import RouteTable, table_size_bytes
+
+
+class Command(BaseCommand):
+    help = "Precompute the all-pairs route table from the Gate table and write it to disk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", type=Path, default=None, help="Defaults to ROUTE_TABLE_PATH")
+        parser.add_argument("--force", action="store_true", help="Build even if the table exceeds ROUTE_TABLE_MAX_BYTES")
+
+    def handle(self, *args, **options):
+        output = options["output"] or Path(settings.ROUTE_TABLE_PATH)
+        graph = get_graph()
+
+        size = table_size_bytes(len(graph))
+        if size > settings.ROUTE_TABLE_MAX_BYTES and not options["force"]:
+            raise CommandError(
+                f"Route table for {len(graph)} gates needs {size} bytes, "
+                f"over ROUTE_TABLE_MAX_BYTES={settings.ROUTE_TABLE_MAX_BYTES}; use --force to build anyway"
+            )
+
+        start = time.perf_counter()
+        table = RouteTable.build(graph)
+        table.save(output)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote route table for {len(graph)} gates to {output} in {time.perf_counter() - start:.2f}s"
+        ))
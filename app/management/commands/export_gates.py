@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.services.gate_io import FORMATS, export_gates, format_for_path, write_gates
+
+
+class Command(BaseCommand):
+    help = "Export gates and connections as NDJSON or CSV, streaming them from the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="-", help="File to write; defaults to stdout")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to csv for .csv files and ndjson otherwise")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows fetched per query round trip")
+
+    def handle(self, *args, **options):
+        format = options["format"] or format_for_path(options["output"])
+        to_stdout = options["output"] == "-"
+        target = self.stdout if to_stdout else open(options["output"], "w", newline="", encoding="utf-8")
+        # With gates on stdout, report on stderr
+        report = self.stderr if to_stdout else self.stdout
+
+        start = time.perf_counter()
+        gates = connections = 0
+
+        def counted(records):
+            nonlocal gates, connections
+            for record in records:
+                gates += 1
+                connections += len(record.connections)
+                yield record
+
+        try:
+            write_gates(counted(export_gates(options["chunk_size"])), target, format)
+        finally:
+            if not to_stdout:
+                target.close()
+
+        elapsed = time.perf_counter() - start
+        rate = (gates + connections) / elapsed if elapsed else 0
+        report.write(self.style.SUCCESS(
+            f"Exported {gates} gates and {connections} connections in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        ))
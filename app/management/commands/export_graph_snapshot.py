@@ -0,0 +1,35 @@
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.graph import GateGraph, graph_version, publish_snapshot
+
+
+class Command(BaseCommand):
+    help = "Export the gate graph to a binary snapshot and publish it to running workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", type=Path, default=None, help="Defaults to GRAPH_SNAPSHOT_PATH")
+
+    def handle(self, *args, **options):
+        output = options["output"] or settings.GRAPH_SNAPSHOT_PATH
+        if output is None:
+            raise CommandError("Set GRAPH_SNAPSHOT_PATH or pass --output")
+
+        start = time.perf_counter()
+        before = graph_version()
+        graph = GateGraph.from_db(uuid.uuid4().hex)
+        if graph_version() != before:
+            raise CommandError("Gates changed during the export; run it again")
+        if settings.GRAPH_SNAPSHOT_PATH and Path(output) == Path(settings.GRAPH_SNAPSHOT_PATH):
+            publish_snapshot(graph, Path(output))
+        else:
+            graph.write_snapshot(Path(output))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote snapshot of {len(graph)} gates and {graph.edge_count} connections "
+            f"to {output} in {time.perf_counter() - start:.2f}s"
+        ))
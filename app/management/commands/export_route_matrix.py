@@ -0,0 +1,84 @@
+import os
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.graph import get_graph
+from app.services.route_matrix import FORMATS, format_for_path, route_matrix_rows, write_csv, write_npy
+
+
+class Command(BaseCommand):
+    help = "Export total HU and cost per passenger for every origin/destination pair, using all cores"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output",
+            help="Directory for the .npy matrices, or a CSV file ('-' writes CSV to stdout)",
+        )
+        parser.add_argument(
+            "--format", choices=FORMATS, default=None,
+            help="Defaults to csv for '-' and .csv paths, npy otherwise",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count(),
+            help="Route search processes (default: one per core; 1 searches in this process)",
+        )
+        parser.add_argument("--block-size", type=int, default=64, help="Origins searched per batch")
+        parser.add_argument(
+            "--include-unreachable", action="store_true",
+            help="CSV only: also write pairs without a route, with empty total_hu and cost",
+        )
+        parser.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress lines")
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        output_format = options["format"] or format_for_path(output)
+        if output_format == "npy" and output == "-":
+            raise CommandError("The npy format needs an output directory")
+        if options["block_size"] < 1:
+            raise CommandError("--block-size must be at least 1")
+
+        graph = get_graph()
+        # With the matrix on stdout, report on stderr
+        report = self.stderr if output == "-" else self.stdout
+        progress = _Progress(report, len(graph), options["progress_every"])
+        rows = route_matrix_rows(graph, options["workers"], options["block_size"])
+
+        if output_format == "npy":
+            write_npy(graph, rows, Path(output), progress)
+        else:
+            target = self.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+            try:
+                write_csv(graph, rows, target, progress, options["include_unreachable"])
+            finally:
+                if output != "-":
+                    target.close()
+
+        report.write(self.style.SUCCESS(
+            f"Exported the {len(graph)}x{len(graph)} route matrix to {output} ({output_format}) "
+            f"in {time.perf_counter() - progress.start:.2f}s with {options['workers']} worker(s)"
+        ))
+
+
+class _Progress:
+    """
+    Writes origins done, percentage, elapsed time and ETA every ``every`` seconds.
+    """
+
+    def __init__(self, out, total: int, every: float):
+        self.out = out
+        self.total = total
+        self.every = every
+        self.start = self.last = time.perf_counter()
+
+    def __call__(self, done: int) -> None:
+        now = time.perf_counter()
+        if now - self.last < self.every or done == self.total:
+            return
+        self.last = now
+        elapsed = now - self.start
+        eta = elapsed / done * (self.total - done)
+        self.out.write(
+            f"{done}/{self.total} origins ({done / self.total:.0%}), {elapsed:.1f}s elapsed, ~{eta:.1f}s left"
+        )
@@ -0,0 +1,79 @@
+import csv
+import os
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.route_finder import find_cheapest_routes
+
+
+class Command(BaseCommand):
+    help = "Find the cheapest route for every origin,destination row of a CSV file, using all cores"
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="CSV of origin,destination rows (header optional); '-' reads stdin")
+        parser.add_argument("--output", default="-", help="CSV to write; defaults to stdout")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count(),
+            help="Route search processes (default: one per core; 1 searches in this process)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=100_000, help="Pairs searched per batch")
+
+    def handle(self, *args, **options):
+        source = sys.stdin if options["input"] == "-" else open(options["input"], newline="")
+        target = sys.stdout if options["output"] == "-" else open(options["output"], "w", newline="")
+        # With routes on stdout, report on stderr
+        report = self.stderr if target is sys.stdout else self.stdout
+
+        start = time.perf_counter()
+        found = no_route = invalid = 0
+        try:
+            writer = csv.writer(target)
+            writer.writerow(["origin", "destination", "total_hu", "cost_per_passenger_gbp", "path", "error"])
+            for chunk in _chunks(_pairs(csv.reader(source)), options["chunk_size"]):
+                for (origin_id, destination_id), result in zip(chunk, find_cheapest_routes(chunk, options["workers"])):
+                    if isinstance(result, dict):
+                        found += 1
+                        writer.writerow([
+                            result["origin"], result["destination"], result["total_hu"],
+                            result["cost_per_passenger_gbp"], " ".join(result["path"]), "",
+                        ])
+                        continue
+
+                    if result is None:
+                        no_route += 1
+                        error = f"No route found from {origin_id.upper()} to {destination_id.upper()}"
+                    else:
+                        invalid += 1
+                        error = str(result)
+                    writer.writerow([origin_id.upper(), destination_id.upper(), "", "", "", error])
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if target is not sys.stdout:
+                target.close()
+
+        elapsed = time.perf_counter() - start
+        report.write(self.style.SUCCESS(
+            f"Found {found} routes ({no_route} without a route, {invalid} with an unknown gate) in {elapsed:.2f}s "
+            f"with {options['workers']} worker(s)"
+        ))
+
+
+def _pairs(rows):
+    for line, row in enumerate(rows):
+        if not row:
+            continue
+        if line == 0 and [cell.strip().lower() for cell in row[:2]] == ["origin", "destination"]:
+            continue
+        if len(row) < 2:
+            raise CommandError(f"Line {line + 1}: expected origin,destination")
+        yield row[0].strip(), row[1].strip()
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,170 @@
+import cProfile
+import logging
+import random
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.urls import Resolver404, resolve
+
+from app.db_router import REPLICA_ALIAS, replica_reads
+from app.services.profiling import current_profile, metrics, profile_request
+
+
+logger = logging.getLogger(__name__)
+
+
+# Endpoints that only read gates, whose reads may go to a read replica
+READ_ONLY_URL_NAMES = frozenset({
+    "gates-list", "gate-detail", "gate-routes", "gate-reachable", "gate-route",
+    "gate-route-alternatives", "journeys", "routes-batch",
+})
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in request instrumentation, enabled with PROFILING_ENABLED.
+
+    Every request gets a Server-Timing header with the time spent per phase
+    (SQL queries, loading the graph, the route search, pricing, the quote
+    cache, serializing and rendering) plus the gates settled and
+    connections relaxed by route searches, and is counted in the metrics
+    served at /metrics.
+
+    With PROFILING_SAMPLE_RATE above 0, that fraction of (sync) requests
+    also runs under cProfile, and those slower than PROFILING_SLOW_REQUEST_MS
+    are dumped as .pstats files to PROFILING_DUMP_DIR.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_timer)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(connection=connection)
+
+        profiler = _sampled_profiler()
+        with profile_request() as profile:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            return self._finish(request, response, profile, profiler)
+
+    async def __acall__(self, request):
+        with profile_request() as profile:
+            response = await self.get_response(request)
+            return self._finish(request, response, profile, None)
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that too
+        profile = current_profile()
+        if profile is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: profile.add("render", time.perf_counter() - start))
+        return response
+
+    def _finish(self, request, response, profile, profiler):
+        total = time.perf_counter() - profile.start
+        response["Server-Timing"] = profile.server_timing(total)
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        metrics.observe(view, request.method, response.status_code, total, profile)
+        if profiler is not None and total * 1000 >= settings.PROFILING_SLOW_REQUEST_MS:
+            _dump_profile(profiler, view, total)
+        return response
+
+
+class ReadReplicaMiddleware:
+    """
+    Lets the read-only gate and route endpoints (READ_ONLY_URL_NAMES) read
+    from the "replica" database, see app/db_router.py. Not used unless a
+    replica is configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if REPLICA_ALIAS not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not _read_only(request):
+            return self.get_response(request)
+        with replica_reads():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not _read_only(request):
+            return await self.get_response(request)
+        with replica_reads():
+            return await self.get_response(request)
+
+
+def _read_only(request) -> bool:
+    try:
+        match = resolve(request.path_info, getattr(request, "urlconf", None))
+    except Resolver404:
+        return False
+    return match.url_name in READ_ONLY_URL_NAMES
+
+
+def _sampled_profiler() -> cProfile.Profile | None:
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate <= 0 or random.random() >= rate:
+        return None
+    return cProfile.Profile()
+
+
+def _dump_profile(profiler: cProfile.Profile, view: str, seconds: float) -> None:
+    directory = Path(settings.PROFILING_DUMP_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{time.strftime('%Y%m%dT%H%M%S')}-{view}-{seconds * 1000:.0f}ms-{uuid.uuid4().hex[:8]}.pstats"
+    profiler.dump_stats(path)
+    metrics.profile_dumped()
+    logger.info("Slow request to %s (%.0f ms) profiled to %s", view, seconds * 1000, path)
+
+
+def _install_query_timer(sender=None, connection=None, **kwargs) -> None:
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def _time_query(execute, sql, params, many, context):
+    profile = current_profile()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    profile.counters["db_queries"] += 1
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add("db", time.perf_counter() - start)
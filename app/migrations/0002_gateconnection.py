@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GateConnection',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hu', models.PositiveIntegerField(help_text='Distance in hyperspace units')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outgoing_connections', to='app.gate')),
+                ('target', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='incoming_connections', to='app.gate')),
+            ],
+            options={
+                'verbose_name': 'Gate connection',
+                'verbose_name_plural': 'Gate connections',
+                'db_table': 'gate_connection',
+                'indexes': [models.Index(fields=['source', 'target'], name='gate_conn_source_target_idx'), models.Index(fields=['target', 'source'], name='gate_conn_target_source_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+def copy_connections_to_table(apps, schema_editor):
+    Gate = apps.get_model("app", "Gate")
+    GateConnection = apps.get_model("app", "GateConnection")
+
+    batch = []
+    for gate_id, connections in Gate.objects.order_by("id").values_list("id", "connections").iterator():
+        for conn in connections or []:
+            if not conn.get("id"):
+                continue
+            batch.append(GateConnection(source_id=gate_id, target_id=conn["id"], hu=int(conn.get("hu", 0))))
+        if len(batch) >= 1000:
+            GateConnection.objects.bulk_create(batch)
+            batch = []
+    GateConnection.objects.bulk_create(batch)
+
+
+def copy_connections_to_json(apps, schema_editor):
+    Gate = apps.get_model("app", "Gate")
+    GateConnection = apps.get_model("app", "GateConnection")
+
+    connections = {}
+    for source_id, target_id, hu in GateConnection.objects.order_by("id").values_list("source_id", "target_id", "hu").iterator():
+        connections.setdefault(source_id, []).append({"id": target_id, "hu": str(hu)})
+
+    for gate in Gate.objects.all():
+        gate.connections = connections.get(gate.id, [])
+        gate.save(update_fields=["connections"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_gateconnection'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_connections_to_table, copy_connections_to_json),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:33
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_copy_gate_connections'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='gate',
+            name='connections',
+        ),
+    ]
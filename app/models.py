@@ -5,11 +5,8 @@ class Gate(models.Model):
     """
     Represents a hyperspace gate.
 
-    connections format (stored as JSON):
-    [
-      {"id": "RAN", "hu": "100"},
-      {"id": "PRX", "hu": "90"}
-    ]
+    Outgoing connections are stored as GateConnection rows
+    (``gate.outgoing_connections``).
     """
 
     id = models.CharField(
@@ -24,11 +21,6 @@ class Gate(models.Model):
         blank=True
     )
 
-    connections = models.JSONField(
-        default=list,
-        help_text="List of outgoing connections with HU distance"
-    )
-
     class Meta:
         db_table = "gate"
         verbose_name = "Gate"
@@ -36,3 +28,44 @@ class Gate(models.Model):
 
     def __str__(self):
         return f"{self.id} - {self.name}"
+
+
+class GateConnection(models.Model):
+    """
+    Outgoing hyperspace connection from one gate to another.
+
+    The target is not enforced by a database constraint, so a gate can keep
+    connections to gates that are not (yet) part of the network. Route
+    searches ignore such connections.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+
+    source = models.ForeignKey(
+        Gate,
+        on_delete=models.CASCADE,
+        related_name="outgoing_connections"
+    )
+
+    target = models.ForeignKey(
+        Gate,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="incoming_connections"
+    )
+
+    hu = models.PositiveIntegerField(
+        help_text="Distance in hyperspace units"
+    )
+
+    class Meta:
+        db_table = "gate_connection"
+        verbose_name = "Gate connection"
+        verbose_name_plural = "Gate connections"
+        indexes = [
+            models.Index(fields=["source", "target"], name="gate_conn_source_target_idx"),
+            models.Index(fields=["target", "source"], name="gate_conn_target_source_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id} ({self.hu} HU)"
@@ -0,0 +1,170 @@
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+
+from app.services.engine import INF, SearchStats
+from app.services.graph import GateGraph
+
+
+@dataclass(frozen=True)
+class RouteConstraints:
+    """
+    Limits a route must respect, on top of being cheapest.
+
+    ``max_hops`` caps the connections taken, ``max_leg_hu`` the HU of any
+    single connection. Avoided gates (IDs) and connections ((source ID,
+    target ID) pairs, e.g. during an outage) are not used at all.
+    """
+    max_hops: int | None = None
+    max_leg_hu: int | None = None
+    avoid_gates: frozenset[str] = field(default_factory=frozenset)
+    avoid_connections: frozenset[tuple[str, str]] = field(default_factory=frozenset)
+
+    def __bool__(self) -> bool:
+        return (
+            self.max_hops is not None or self.max_leg_hu is not None
+            or bool(self.avoid_gates) or bool(self.avoid_connections)
+        )
+
+    def params(self) -> dict:
+        """
+        The constraints in a normalized, JSON-serializable form (for cache keys).
+        """
+        return {
+            "max_hops": self.max_hops,
+            "max_leg_hu": self.max_leg_hu,
+            "avoid": sorted(self.avoid_gates),
+            "avoid_connections": sorted(f"{source}-{target}" for source, target in self.avoid_connections),
+        }
+
+
+def constrained_route(
+    graph: GateGraph,
+    source: int,
+    target: int,
+    max_hops: int | None = None,
+    max_leg_hu: int | None = None,
+    blocked_nodes: frozenset | set = frozenset(),
+    blocked_edges: frozenset | set = frozenset(),
+    stats: SearchStats | None = None,
+) -> tuple[tuple[list[int], int] | None, int]:
+    """
+    Cheapest route from ``source`` to ``target`` under the constraints of
+    RouteConstraints, given as gate indices. Returns (route, labels settled).
+
+    Blocked gates, blocked (source, target) connections and connections
+    over ``max_leg_hu`` are skipped while relaxing, so the compiled graph is
+    used as is. Without a hop limit this is Dijkstra on what remains.
+
+    With ``max_hops`` it is a resource-constrained search: labels are (HU,
+    hops) pairs, settled cheapest first (fewest hops first among equal HU).
+    A label is pruned when it cannot reach the target within the hop limit,
+    by the hop counts of a reverse breadth-first search of depth
+    ``max_hops``, and when a label settled earlier at the same gate took no
+    more hops (it is no more expensive either). A gate therefore keeps at
+    most ``max_hops + 1`` labels, and the first label to settle the target
+    is the cheapest feasible route.
+    """
+    if source in blocked_nodes or target in blocked_nodes:
+        return None, 0
+
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    max_leg = INF if max_leg_hu is None else max_leg_hu
+
+    hops_left = None
+    if max_hops is not None:
+        hops_left = _hops_to_target(graph, target, max_hops, lambda node, neighbor, weight: (
+            weight <= max_leg and neighbor not in blocked_nodes
+            and not (blocked_edges and (node, neighbor) in blocked_edges)
+        ))
+        if source not in hops_left:
+            return None, 0
+    # Without a hop limit every label has 0 hops, so any label settled at a
+    # gate dominates the later ones: plain Dijkstra
+    hop = 0 if max_hops is None else 1
+    max_hops = INF if max_hops is None else max_hops
+
+    # Labels: gate, HU and the label they extend
+    label_nodes = [source]
+    label_costs = [0]
+    label_previous = [-1]
+    # Fewest hops among the labels settled at each gate
+    settled_hops = {}
+    # Cheapest label queued per gate, to skip dearer ones (no hop limit only)
+    queued_costs = {}
+    settled = 0
+    relaxed = 0
+    heap = [(0, 0, 0)]
+    found = -1
+    while heap:
+        _, hops, label = heappop(heap)
+        node = label_nodes[label]
+        if settled_hops.get(node, INF) <= hops:
+            continue
+        settled_hops[node] = hops
+        settled += 1
+        if node == target:
+            found = label
+            break
+        if hops == max_hops:
+            continue
+
+        cost = label_costs[label]
+        next_hops = hops + hop
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            weight = weights[edge]
+            if weight > max_leg or neighbor in blocked_nodes or (blocked_edges and (node, neighbor) in blocked_edges):
+                continue
+            if settled_hops.get(neighbor, INF) <= next_hops:
+                continue
+            new_cost = cost + weight
+            if hops_left is None:
+                if new_cost >= queued_costs.get(neighbor, INF):
+                    continue
+                queued_costs[neighbor] = new_cost
+            elif next_hops + hops_left.get(neighbor, INF) > max_hops:
+                continue
+            label_nodes.append(neighbor)
+            label_costs.append(new_cost)
+            label_previous.append(label)
+            heappush(heap, (new_cost, next_hops, len(label_nodes) - 1))
+            relaxed += 1
+
+    if stats is not None:
+        stats.relaxed_edges += relaxed
+    if found == -1:
+        return None, settled
+
+    path = []
+    label = found
+    while label != -1:
+        path.append(label_nodes[label])
+        label = label_previous[label]
+    path.reverse()
+    return (path, label_costs[found]), settled
+
+
+def _hops_to_target(graph: GateGraph, target: int, max_hops: int, usable) -> dict[int, int]:
+    """
+    Fewest usable connections from each gate to ``target``, for the gates
+    within ``max_hops`` of it: the only gates a feasible route can visit.
+    """
+    reverse = graph.reversed()
+    offsets = reverse.offsets
+    sources = reverse.targets
+    weights = reverse.weights
+
+    hops = {target: 0}
+    frontier = [target]
+    for depth in range(1, max_hops + 1):
+        next_frontier = []
+        for node in frontier:
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbor = sources[edge]
+                if neighbor not in hops and usable(neighbor, node, weights[edge]):
+                    hops[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return hops
@@ -0,0 +1,386 @@
+import hashlib
+import logging
+import os
+from array import array
+from heapq import heapify, heappop, heappush
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from app.services.engine import INF, SearchStats
+from app.services.graph import GateGraph
+
+
+logger = logging.getLogger(__name__)
+
+# Original connection (not a shortcut) in the ``*_middle`` arrays
+NO_MIDDLE = -1
+
+# Witness searches give up after settling this many gates and keep the
+# shortcut. A missed witness only costs an unneeded shortcut, never a wrong route.
+WITNESS_SETTLE_LIMIT = 500
+SIMULATION_SETTLE_LIMIT = 50
+
+PRIORITY_EDGE_WEIGHT = 2
+PRIORITY_LEVEL_WEIGHT = 1
+
+# Contraction stops once the next gate has more in x out neighbour pairs than
+# this; the remaining gates form the core and are searched without ranks.
+MAX_CONTRACTION_PAIRS = 400
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over a compiled graph.
+
+    Gates are contracted one at a time in ``order``; contracting a gate adds
+    a shortcut u -> x for every cheapest route u -> gate -> x that has no
+    equally cheap detour (witness). Afterwards every cheapest route can be
+    found by searching only towards higher-ranked gates from both ends.
+
+    ``up_*`` is a CSR over each gate's edges to higher-ranked gates and
+    ``down_*`` a CSR over each gate's edges *from* higher-ranked gates.
+    ``*_middle`` holds the contracted gate a shortcut bypasses, or
+    ``NO_MIDDLE`` for an original connection, which is how paths are unpacked.
+    The last ``core_size`` gates of ``order`` were left uncontracted and are
+    searched like a plain graph.
+
+    Works best on networks with a hierarchy (hubs, geometric layouts); on
+    random expander-like networks the core stays large and A* is faster.
+    """
+
+    def __init__(self, order, up, down, core_size: int, fingerprint: str, ids_digest: str):
+        self.order = order
+        self.core_size = core_size
+        self.rank = array("i", [0]) * len(order)
+        for rank, node in enumerate(order):
+            self.rank[node] = rank
+        self.up_offsets, self.up_targets, self.up_weights, self.up_middle = up
+        self.down_offsets, self.down_sources, self.down_weights, self.down_middle = down
+        self.fingerprint = fingerprint
+        self.ids_digest = ids_digest
+
+    @property
+    def shortcut_count(self) -> int:
+        return sum(1 for m in self.up_middle if m != NO_MIDDLE) + sum(1 for m in self.down_middle if m != NO_MIDDLE)
+
+    @classmethod
+    def build(cls, graph: GateGraph, order=None, core_size: int = 0) -> "ContractionHierarchy":
+        """
+        Contract every gate of ``graph``.
+
+        Without ``order`` gates are ordered on the fly by edge difference
+        (shortcuts added minus edges removed), already contracted neighbours
+        and hierarchy level, with lazy priority updates. Contraction stops at
+        the first gate with more than MAX_CONTRACTION_PAIRS neighbour pairs;
+        the ``core_size`` gates left over keep their edges in both
+        directions. Passing the order and core size of an earlier hierarchy
+        of the same gates skips the ordering, which is how ``rebuild``
+        handles changed HU values.
+        """
+        n = len(graph)
+        outgoing = [{} for _ in range(n)]
+        incoming = [{} for _ in range(n)]
+        for source in range(n):
+            for edge in range(graph.offsets[source], graph.offsets[source + 1]):
+                target, hu = graph.targets[edge], graph.weights[edge]
+                if target != source and hu < outgoing[source].get(target, (INF,))[0]:
+                    outgoing[source][target] = incoming[target][source] = (hu, NO_MIDDLE)
+
+        contracted = bytearray(n)
+        deleted_neighbors = [0] * n
+        level = [0] * n
+        up = [None] * n
+        down = [None] * n
+
+        def shortcuts(node, settle_limit=WITNESS_SETTLE_LIMIT):
+            found = []
+            outs = list(outgoing[node].items())
+            for source, (w1, _) in incoming[node].items():
+                targets = {target: w1 + w2 for target, (w2, _) in outs if target != source}
+                if not targets:
+                    continue
+                witnesses = _witness_search(outgoing, source, node, targets, settle_limit)
+                found.extend(
+                    (source, target, hu) for target, hu in targets.items() if witnesses.get(target, INF) > hu
+                )
+            return found
+
+        def priority(node, node_shortcuts):
+            edge_difference = len(node_shortcuts) - len(incoming[node]) - len(outgoing[node])
+            return PRIORITY_EDGE_WEIGHT * edge_difference + deleted_neighbors[node] + PRIORITY_LEVEL_WEIGHT * level[node]
+
+        def contract(node, node_shortcuts):
+            contracted[node] = 1
+            up[node] = [(target, hu, middle) for target, (hu, middle) in outgoing[node].items()]
+            down[node] = [(source, hu, middle) for source, (hu, middle) in incoming[node].items()]
+            for target in outgoing[node]:
+                del incoming[target][node]
+                deleted_neighbors[target] += 1
+                level[target] = max(level[target], level[node] + 1)
+            for source in incoming[node]:
+                del outgoing[source][node]
+                deleted_neighbors[source] += 1
+                level[source] = max(level[source], level[node] + 1)
+            for source, target, hu in node_shortcuts:
+                if hu < outgoing[source].get(target, (INF,))[0]:
+                    outgoing[source][target] = incoming[target][source] = (hu, node)
+
+        def too_dense(node):
+            return len(incoming[node]) * len(outgoing[node]) > MAX_CONTRACTION_PAIRS
+
+        if order is not None:
+            order = list(order)
+            for node in order[:len(order) - core_size]:
+                contract(node, shortcuts(node))
+        else:
+            order = []
+            heap = [(priority(node, shortcuts(node, SIMULATION_SETTLE_LIMIT)), node) for node in range(n)]
+            heapify(heap)
+            while heap:
+                _, node = heappop(heap)
+                current = priority(node, shortcuts(node, SIMULATION_SETTLE_LIMIT))
+                if heap and current > heap[0][0]:
+                    heappush(heap, (current, node))
+                    continue
+                if too_dense(node):
+                    heappush(heap, (current, node))
+                    break
+                contract(node, shortcuts(node))
+                order.append(node)
+            core_size = len(heap)
+            order.extend(sorted(node for _, node in heap))
+
+        # Core gates keep every edge between them in both directions
+        for node in order[len(order) - core_size:]:
+            up[node] = [(target, hu, middle) for target, (hu, middle) in outgoing[node].items()]
+            down[node] = [(source, hu, middle) for source, (hu, middle) in incoming[node].items()]
+
+        return cls(order, _csr(up), _csr(down), core_size, graph.fingerprint, ids_digest(graph))
+
+    def rebuild(self, graph: GateGraph) -> "ContractionHierarchy":
+        """
+        Hierarchy for a changed graph, reusing this node order when the gates are the same.
+
+        Changed HU values (and added or removed connections between existing
+        gates) keep the order valid, so only the contraction is redone.
+        """
+        if self.ids_digest == ids_digest(graph):
+            return ContractionHierarchy.build(graph, self.order, self.core_size)
+        return ContractionHierarchy.build(graph)
+
+    def route(self, source: int, target: int, stats: SearchStats | None = None) -> tuple[tuple[list[int], int] | None, int]:
+        """
+        Bidirectional upward search. Returns (route, settled) like
+        ``bidirectional_dijkstra``; the path is unpacked to original gates.
+        """
+        if source == target:
+            return ([source], 0), 0
+
+        forward = {source: 0}
+        backward = {target: 0}
+        forward_previous = {source: None}
+        backward_next = {target: None}
+        sides = [
+            (self.up_offsets, self.up_targets, self.up_weights, self.up_middle, forward, forward_previous, [(0, source)], set()),
+            (self.down_offsets, self.down_sources, self.down_weights, self.down_middle, backward, backward_next, [(0, target)], set()),
+        ]
+
+        best, meeting = INF, -1
+        relaxed = 0
+        while True:
+            tops = [side[6][0][0] if side[6] else INF for side in sides]
+            # Each side stops once it cannot improve on the best meeting
+            active = [side for side, top in zip(sides, tops) if top < best]
+            if not active:
+                break
+            offsets, targets, weights, middles, distances, previous, heap, settled = min(
+                active, key=lambda side: side[6][0][0]
+            )
+            other = backward if distances is forward else forward
+
+            distance, node = heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            if node in other and distance + other[node] < best:
+                best, meeting = distance + other[node], node
+
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[edge]
+                new_distance = distance + weights[edge]
+                if new_distance < distances.get(neighbor, INF):
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = (node, middles[edge])
+                    heappush(heap, (new_distance, neighbor))
+                    relaxed += 1
+
+        if stats is not None:
+            stats.relaxed_edges += relaxed
+        settled_count = len(sides[0][7]) + len(sides[1][7])
+        if best == INF:
+            return None, settled_count
+
+        path = [source]
+        edges = []
+        node = meeting
+        while forward_previous[node] is not None:
+            before, middle = forward_previous[node]
+            edges.append((before, node, middle))
+            node = before
+        edges.reverse()
+        node = meeting
+        while backward_next[node] is not None:
+            after, middle = backward_next[node]
+            edges.append((node, after, middle))
+            node = after
+        for before, after, middle in edges:
+            self._unpack(before, after, middle, path)
+
+        return (path, best), settled_count
+
+    def _unpack(self, source: int, target: int, middle: int, path: list[int]) -> None:
+        """
+        Append the original gates of edge source -> target (excluding source) to ``path``.
+        """
+        stack = [(source, target, middle)]
+        while stack:
+            source, target, middle = stack.pop()
+            if middle == NO_MIDDLE:
+                path.append(target)
+                continue
+            # Both halves run from / to the lower-ranked middle gate
+            stack.append((middle, target, self._middle_of(self.up_offsets, self.up_targets, self.up_middle, middle, target)))
+            stack.append((source, middle, self._middle_of(self.down_offsets, self.down_sources, self.down_middle, middle, source)))
+
+    @staticmethod
+    def _middle_of(offsets, ends, middles, node: int, end: int) -> int:
+        for edge in range(offsets[node], offsets[node + 1]):
+            if ends[edge] == end:
+                return middles[edge]
+        raise ValueError(f"Contraction hierarchy has no edge between {node} and {end}")
+
+    def save(self, path: Path) -> None:
+        """
+        Write the hierarchy atomically, so readers never see a partial file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        arrays = {
+            name: np.frombuffer(getattr(self, name), dtype=np.int64 if getattr(self, name).typecode == "q" else np.int32)
+            for name in _ARRAYS
+        }
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                order=np.array(self.order, dtype=np.int32),
+                core_size=np.array(self.core_size),
+                fingerprint=np.array(self.fingerprint),
+                ids_digest=np.array(self.ids_digest),
+                **arrays,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ContractionHierarchy":
+        with np.load(path) as data:
+            loaded = {
+                name: array("q" if data[name].dtype == np.int64 else "i", data[name].tobytes())
+                for name in _ARRAYS
+            }
+            return cls(
+                data["order"].tolist(),
+                tuple(loaded[name] for name in _ARRAYS[:4]),
+                tuple(loaded[name] for name in _ARRAYS[4:]),
+                int(data["core_size"]),
+                str(data["fingerprint"]),
+                str(data["ids_digest"]),
+            )
+
+
+_ARRAYS = (
+    "up_offsets", "up_targets", "up_weights", "up_middle",
+    "down_offsets", "down_sources", "down_weights", "down_middle",
+)
+
+
+def ids_digest(graph: GateGraph) -> str:
+    """
+    Hash of the gate IDs alone, which decides whether a node order can be reused.
+    """
+    return hashlib.sha256("\n".join(graph.ids).encode()).hexdigest()
+
+
+def get_contraction_hierarchy(graph: GateGraph) -> ContractionHierarchy | None:
+    """
+    The hierarchy written by ``manage.py build_contraction_hierarchy`` for
+    the given graph, or None if there is none.
+
+    Contraction takes seconds to minutes on large networks, so it is never
+    done while serving a request: after a gate or HU change the hierarchy
+    is stale until the command is rerun. A file written since the last call
+    is picked up without waiting for the next gate change.
+    """
+    path = Path(settings.ROUTE_CH_PATH)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return graph.memo(("contraction_hierarchy", stat.st_mtime_ns, stat.st_size), lambda: _load(graph, path))
+
+
+def _load(graph: GateGraph, path: Path) -> ContractionHierarchy | None:
+    try:
+        hierarchy = ContractionHierarchy.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Could not read contraction hierarchy %s: %s", path, e)
+        return None
+    if hierarchy.fingerprint != graph.fingerprint:
+        logger.info("Contraction hierarchy %s is stale, run build_contraction_hierarchy", path)
+        return None
+    return hierarchy
+
+
+def _witness_search(outgoing, source: int, avoid: int, targets: dict, settle_limit: int) -> dict:
+    """
+    Cheapest distances from ``source`` to ``targets`` that avoid ``avoid``,
+    bounded by the most expensive target and ``settle_limit`` settled gates.
+    """
+    limit = max(targets.values())
+    remaining = len(targets)
+    distances = {source: 0}
+    settled = set()
+    heap = [(0, source)]
+    while heap and remaining and len(settled) < settle_limit:
+        distance, node = heappop(heap)
+        if distance > limit:
+            break
+        if node in settled:
+            continue
+        settled.add(node)
+        if node in targets:
+            remaining -= 1
+        for neighbor, (hu, _) in outgoing[node].items():
+            if neighbor == avoid:
+                continue
+            new_distance = distance + hu
+            if new_distance <= limit and new_distance < distances.get(neighbor, INF):
+                distances[neighbor] = new_distance
+                heappush(heap, (new_distance, neighbor))
+    return distances
+
+
+def _csr(edge_lists) -> tuple[array, array, array, array]:
+    offsets = array("q", [0])
+    ends = array("i")
+    weights = array("q")
+    middles = array("i")
+    for edges in edge_lists:
+        for end, hu, middle in edges:
+            ends.append(end)
+            weights.append(hu)
+            middles.append(middle)
+        offsets.append(len(ends))
+    return offsets, ends, weights, middles
@@ -0,0 +1,280 @@
+from dataclasses import dataclass
+from heapq import heappop, heappush
+
+from app.services.graph import GateGraph
+
+
+INF = float("inf")
+
+
+@dataclass
+class SearchStats:
+    """
+    How a point-to-point route was found, for reporting to callers.
+    """
+    strategy: str = ""
+    settled_nodes: int = 0
+    relaxed_edges: int = 0
+
+
+class ShortestPathTree:
+    """
+    Result of a single-source search over a GateGraph.
+
+    ``distances`` and ``previous`` are indexed by gate index. Unreached gates
+    have an infinite distance and no predecessor. After an early exit only the
+    target and the gates settled before it are final. ``settled`` counts the
+    gates the search settled.
+    """
+
+    def __init__(self, source: int, distances: list, previous: list, settled: int = 0):
+        self.source = source
+        self.distances = distances
+        self.previous = previous
+        self.settled = settled
+
+    def distance_to(self, target: int):
+        return self.distances[target]
+
+    def route(self, target: int) -> tuple[list[int], int] | None:
+        """
+        Path (as gate indices) and total HU, or None if unreachable.
+        """
+        path = self.path_to(target)
+        if path is None:
+            return None
+        return path, self.distances[target]
+
+    def path_to(self, target: int) -> list[int] | None:
+        if self.distances[target] == INF:
+            return None
+
+        path = []
+        node = target
+        while node != -1:
+            path.append(node)
+            node = self.previous[node]
+        path.reverse()
+        return path
+
+
+def dijkstra(graph: GateGraph, source: int, target: int = -1, stats: SearchStats | None = None) -> ShortestPathTree:
+    """
+    Binary-heap Dijkstra from ``source`` over the CSR arrays of ``graph``.
+
+    Stops as soon as ``target`` is settled; pass no target for a full tree.
+    Ties are settled in gate index (gate ID) order, and a gate keeps the first
+    predecessor that reached its final distance. Pass ``stats`` to count the
+    connections relaxed (the searches below take it too).
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    n = len(graph)
+    distances = [INF] * n
+    previous = [-1] * n
+    settled = bytearray(n)
+    settled_count = 0
+    relaxed = 0
+
+    distances[source] = 0
+    heap = [(0, source)]
+    while heap:
+        distance, node = heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        settled_count += 1
+        if node == target:
+            break
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            if settled[neighbor]:
+                continue
+            new_distance = distance + weights[edge]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous[neighbor] = node
+                heappush(heap, (new_distance, neighbor))
+                relaxed += 1
+
+    if stats is not None:
+        stats.relaxed_edges += relaxed
+    return ShortestPathTree(source, distances, previous, settled_count)
+
+
+def bidirectional_dijkstra(
+    graph: GateGraph, source: int, target: int, stats: SearchStats | None = None
+) -> tuple[tuple[list[int], int] | None, int]:
+    """
+    Dijkstra from both ends at once, meeting in the middle.
+
+    Returns (route, settled) where route is (path, total_hu) or None. The
+    search stops once the two frontiers together exceed the best meeting
+    distance, which guarantees every gate on a cheapest route has a final
+    distance from one side or the other. The path is then rebuilt with
+    ``dijkstra``'s tie-breaking, so it is the one ``dijkstra`` returns.
+    Requires positive weights.
+    """
+    reverse = graph.reversed()
+    n = len(graph)
+    sides = []
+    for side_graph, start in ((graph, source), (reverse, target)):
+        distances = [INF] * n
+        distances[start] = 0
+        sides.append((side_graph.offsets, side_graph.targets, side_graph.weights, distances, bytearray(n), [(0, start)]))
+
+    forward, backward = sides[0][3], sides[1][3]
+    best = INF
+    settled_count = 0
+    relaxed = 0
+    while True:
+        top_forward = sides[0][5][0][0] if sides[0][5] else INF
+        top_backward = sides[1][5][0][0] if sides[1][5] else INF
+        # An exhausted side has settled everything it can reach
+        if top_forward == INF or top_backward == INF or top_forward + top_backward > best:
+            break
+
+        offsets, targets, weights, distances, settled, heap = sides[0] if top_forward <= top_backward else sides[1]
+        other = backward if distances is forward else forward
+        distance, node = heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        settled_count += 1
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            if settled[neighbor]:
+                continue
+            new_distance = distance + weights[edge]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                heappush(heap, (new_distance, neighbor))
+                relaxed += 1
+                if new_distance + other[neighbor] < best:
+                    best = new_distance + other[neighbor]
+
+    if stats is not None:
+        stats.relaxed_edges += relaxed
+    if best == INF:
+        return None, settled_count
+
+    # Forward-settled gates have exact distances. Gates on a cheapest route
+    # beyond the forward frontier were settled backwards; walk them forwards
+    # along edges that stay on a cheapest route to recover their distances.
+    forward_settled, backward_settled = sides[0][4], sides[1][4]
+    known = {}
+    stack = [
+        node for node in range(n)
+        if backward_settled[node] and not forward_settled[node] and forward[node] + backward[node] == best
+    ]
+    for node in stack:
+        known[node] = forward[node]
+    while stack:
+        node = stack.pop()
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            neighbor = graph.targets[edge]
+            if neighbor in known or forward_settled[neighbor] or not backward_settled[neighbor]:
+                continue
+            distance = known[node] + graph.weights[edge]
+            if distance + backward[neighbor] == best:
+                known[neighbor] = distance
+                stack.append(neighbor)
+
+    def exact_distance(node):
+        return forward[node] if forward_settled[node] else known.get(node)
+
+    return (_rebuild_path(reverse, source, target, best, exact_distance), best), settled_count
+
+
+def astar(
+    graph: GateGraph, source: int, target: int, heuristic, stats: SearchStats | None = None
+) -> tuple[tuple[list[int], int] | None, int]:
+    """
+    A* from ``source`` to ``target``.
+
+    ``heuristic(node)`` must be a consistent lower bound on the HU from node
+    to target, or INF if the target cannot be reached from node. Returns
+    (route, settled) like ``bidirectional_dijkstra``. After the target is
+    settled the search finishes the gates whose estimate equals the route
+    cost, so the path can be rebuilt with ``dijkstra``'s tie-breaking.
+    Requires positive weights.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    n = len(graph)
+    distances = [INF] * n
+    estimates = {}
+    settled = bytearray(n)
+    settled_count = 0
+    relaxed = 0
+    best = INF
+
+    distances[source] = 0
+    heap = [(heuristic(source), source)]
+    while heap and heap[0][0] <= best:
+        _, node = heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        settled_count += 1
+        distance = distances[node]
+        if node == target:
+            best = distance
+
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            if settled[neighbor]:
+                continue
+            new_distance = distance + weights[edge]
+            if new_distance < distances[neighbor]:
+                estimate = estimates.get(neighbor)
+                if estimate is None:
+                    estimate = estimates[neighbor] = heuristic(neighbor)
+                if estimate == INF:
+                    continue
+                distances[neighbor] = new_distance
+                heappush(heap, (new_distance + estimate, neighbor))
+                relaxed += 1
+
+    if stats is not None:
+        stats.relaxed_edges += relaxed
+    if best == INF:
+        return None, settled_count
+
+    def exact_distance(node):
+        return distances[node] if settled[node] else None
+
+    return (_rebuild_path(graph.reversed(), source, target, best, exact_distance), best), settled_count
+
+
+def _rebuild_path(reverse: GateGraph, source: int, target: int, total: int, exact_distance) -> list[int]:
+    """
+    Walk back from ``target`` choosing the predecessor ``dijkstra`` would keep.
+
+    With positive weights ``dijkstra`` keeps, for each gate, the incoming
+    neighbour on a cheapest route that it settled first: the one with the
+    lowest (distance, index). ``exact_distance(node)`` must be exact for every
+    gate on a cheapest route to ``target`` and None or an upper bound
+    elsewhere.
+    """
+    path = [target]
+    node, distance = target, total
+    while node != source:
+        best = None
+        for edge in range(reverse.offsets[node], reverse.offsets[node + 1]):
+            candidate = reverse.targets[edge]
+            candidate_distance = exact_distance(candidate)
+            if candidate_distance is None or candidate_distance + reverse.weights[edge] != distance:
+                continue
+            if best is None or (candidate_distance, candidate) < best:
+                best = (candidate_distance, candidate)
+        distance, node = best
+        path.append(node)
+    path.reverse()
+    return path
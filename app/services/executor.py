@@ -0,0 +1,48 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def search_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide pool for CPU-heavy work started from async views.
+
+    Bounded by ROUTE_SEARCH_THREADS, so a burst of cache misses queues up
+    instead of starting a thread (and possibly a database connection) per
+    request while the event loop keeps serving cache hits.
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(settings.ROUTE_SEARCH_THREADS, thread_name_prefix="route-search")
+    return _executor
+
+
+async def run_in_executor(fn, *args):
+    """
+    Await ``fn(*args)`` run on the search pool, in the caller's context
+    (so a profiled request keeps collecting spans).
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(search_executor(), context.run, functools.partial(_call, fn, args))
+
+
+def _call(fn, args):
+    try:
+        return fn(*args)
+    finally:
+        # A search only queries the database if the gates changed mid-request;
+        # don't keep that connection open in a pool thread past CONN_MAX_AGE.
+        close_old_connections()
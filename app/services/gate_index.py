@@ -0,0 +1,80 @@
+from bisect import bisect_right
+
+from app.models import Gate
+
+
+class GateIndex:
+    """
+    Gate IDs and names at one graph version, for lookups without a query.
+
+    Gate writes bump the graph version (see app/services/graph.py), so the
+    Gate table is read once per version and process. IDs are kept in gate
+    ID order, names in the same order.
+    """
+
+    def __init__(self, version: str, rows):
+        self.version = version
+        self.ids = []
+        self.names = []
+        for gate_id, name in rows:
+            self.ids.append(gate_id)
+            self.names.append(name)
+        self._positions = {gate_id: i for i, gate_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, gate_id: str) -> bool:
+        return self.lookup(gate_id) is not None
+
+    def lookup(self, gate_id: str) -> str | None:
+        """
+        The ID of the gate ``gate_id`` refers to (IDs are case-insensitive), or None if there is no such gate.
+        """
+        if gate_id in self._positions:
+            return gate_id
+        gate_id = gate_id.upper()
+        return gate_id if gate_id in self._positions else None
+
+    def name(self, gate_id: str) -> str | None:
+        """
+        Name of an existing gate, by its exact ID.
+        """
+        return self.names[self._positions[gate_id]]
+
+    def after(self, gate_id: str) -> int:
+        """
+        Position of the first gate whose ID sorts after ``gate_id``.
+        """
+        return bisect_right(self.ids, gate_id)
+
+
+_gate_index: GateIndex | None = None
+
+
+def get_gate_index(version: str) -> GateIndex:
+    """
+    The process-wide GateIndex, reloaded when the version changes.
+    """
+    global _gate_index
+
+    index = _gate_index
+    if index is None or index.version != version:
+        index = _gate_index = GateIndex(version, _gate_rows())
+    return index
+
+
+async def aget_gate_index(version: str) -> GateIndex:
+    """
+    ``get_gate_index`` for async callers.
+    """
+    global _gate_index
+
+    index = _gate_index
+    if index is None or index.version != version:
+        index = _gate_index = GateIndex(version, [row async for row in _gate_rows()])
+    return index
+
+
+def _gate_rows():
+    return Gate.objects.order_by("id").values_list("id", "name")
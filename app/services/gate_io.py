@@ -0,0 +1,336 @@
+import csv
+import json
+from dataclasses import dataclass
+from itertools import groupby, islice
+from typing import Iterable, Iterator, NamedTuple
+
+from django.db import IntegrityError, connection, transaction
+
+from app.models import Gate, GateConnection
+from app.services.graph import invalidate_graph
+
+
+FORMATS = ("ndjson", "csv")
+CSV_HEADER = ["id", "name", "target", "hu"]
+
+GATE_ID_MAX_LENGTH = Gate._meta.get_field("id").max_length
+NAME_MAX_LENGTH = Gate._meta.get_field("name").max_length
+# Largest value of the PositiveIntegerField on every supported database
+HU_MAX = 2**31 - 1
+# Temporary tables an import is staged in before it touches the live ones
+STAGED_GATES = "gate_import_gate"
+STAGED_CONNECTIONS = "gate_import_connection"
+
+
+class GateRecord(NamedTuple):
+    """
+    One gate and its outgoing (target_id, hu) connections, in connection order,
+    with the line it starts on when it was read from a file.
+    """
+    id: str
+    name: str | None
+    connections: list[tuple[str, int]]
+    line: int | None = None
+
+
+class GateFileError(ValueError):
+    """
+    A malformed record in a gate file, with the line it starts on.
+    """
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+@dataclass
+class ImportStats:
+    gates: int = 0
+    connections: int = 0
+    # Connections whose target is neither in the file nor in the database;
+    # kept, but route searches ignore them
+    unknown_targets: int = 0
+
+
+def format_for_path(path: str) -> str:
+    """
+    File format by extension: csv for .csv files, ndjson otherwise.
+    """
+    return "csv" if str(path).lower().endswith(".csv") else "ndjson"
+
+
+def read_gates(lines: Iterable[str], format: str) -> Iterator[GateRecord]:
+    """
+    Parse and validate gate records from an NDJSON or CSV file, one at a time.
+
+    NDJSON has one gate per line, shaped like the gate detail endpoint:
+    ``{"id": "SOL", "name": "Sol", "connections": [{"id": "PRX", "hu": 90}]}``.
+    CSV has one row per connection with the columns of CSV_HEADER (header
+    optional); a gate's rows are consecutive, and a gate without connections
+    has one row with empty target and hu. Gate IDs are upper-cased.
+
+    Raises GateFileError on the first malformed record. Records are checked
+    one at a time, so a gate that appears twice is only caught on import.
+    """
+    records = _read_ndjson(lines) if format == "ndjson" else _read_csv(lines)
+    for line, gate_id, name, connections in records:
+        yield _validated(line, gate_id, name, connections)
+
+
+def import_gates(records: Iterable[GateRecord], chunk_size: int = 1000, clear: bool = False, dry_run: bool = False) -> ImportStats:
+    """
+    Write gate records to the database in chunks of ``chunk_size`` gates.
+
+    Gates are inserted or renamed, and the connections of every gate in the
+    file replace its existing ones. With ``clear`` the existing network is
+    deleted first.
+
+    The chunks are loaded into temporary staging tables, with COPY on
+    PostgreSQL, whose primary key rejects a gate that appears twice (raised
+    as GateFileError). Only once the whole file is staged is it merged into
+    the live tables, in the same transaction, so a malformed record leaves
+    the database untouched and the live tables are locked for the merge
+    alone. ``dry_run`` stages and validates the file without the merge.
+
+    Rows are written with plain SQL, bypassing model signals, and the
+    compiled graph is invalidated once at the end.
+    """
+    stats = ImportStats()
+    with transaction.atomic():
+        _create_staging_tables()
+        seq = 0
+        for chunk in _chunks(records, chunk_size):
+            rows = []
+            for record in chunk:
+                for target_id, hu in record.connections:
+                    seq += 1
+                    rows.append((seq, record.id, target_id, hu))
+            _stage_chunk(chunk, rows)
+            stats.gates += len(chunk)
+            stats.connections += len(rows)
+
+        stats.unknown_targets = _count_unknown_targets(include_live=not clear)
+        if not dry_run:
+            _merge_staged(clear)
+        _drop_staging_tables()
+
+    if not dry_run:
+        invalidate_graph()
+    return stats
+
+
+def export_gates(chunk_size: int = 1000) -> Iterator[GateRecord]:
+    """
+    Stream every gate with its connections, in gate ID and connection order.
+    """
+    gates = Gate.objects.order_by("id").values_list("id", "name").iterator(chunk_size=chunk_size)
+    connections = (
+        GateConnection.objects.order_by("source_id", "id")
+        .values_list("source_id", "target_id", "hu")
+        .iterator(chunk_size=chunk_size)
+    )
+    pending = next(connections, None)
+    for gate_id, name in gates:
+        gate_connections = []
+        while pending is not None and pending[0] == gate_id:
+            gate_connections.append((pending[1], pending[2]))
+            pending = next(connections, None)
+        yield GateRecord(gate_id, name, gate_connections)
+
+
+def write_gates(records: Iterable[GateRecord], out, format: str) -> None:
+    """
+    Write records in the format ``read_gates`` reads.
+    """
+    if format == "ndjson":
+        for record in records:
+            out.write(json.dumps({
+                "id": record.id,
+                "name": record.name,
+                "connections": [{"id": target_id, "hu": hu} for target_id, hu in record.connections],
+            }) + "\n")
+        return
+
+    writer = csv.writer(out)
+    writer.writerow(CSV_HEADER)
+    for record in records:
+        name = record.name or ""
+        if not record.connections:
+            writer.writerow([record.id, name, "", ""])
+        for target_id, hu in record.connections:
+            writer.writerow([record.id, name, target_id, hu])
+
+
+def _read_ndjson(lines):
+    for line, text in enumerate(lines, 1):
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise GateFileError(line, f"invalid JSON ({e})")
+        if not isinstance(data, dict):
+            raise GateFileError(line, "expected a JSON object")
+        connections = data.get("connections") or []
+        if not isinstance(connections, list) or not all(isinstance(c, dict) for c in connections):
+            raise GateFileError(line, "connections must be a list of {\"id\", \"hu\"} objects")
+        yield line, data.get("id"), data.get("name"), [(c.get("id"), c.get("hu")) for c in connections]
+
+
+def _read_csv(lines):
+    rows = ((line, row) for line, row in enumerate(csv.reader(lines), 1) if row)
+    first = next(rows, None)
+    if first is None:
+        return
+    if [cell.strip().lower() for cell in first[1]] != CSV_HEADER:
+        rows = _prepend(first, rows)
+
+    for gate_id, group in groupby(rows, key=lambda numbered: numbered[1][0].strip().upper()):
+        group = list(group)
+        line = group[0][0]
+        for row_line, row in group:
+            if len(row) != len(CSV_HEADER):
+                raise GateFileError(row_line, f"expected {len(CSV_HEADER)} columns ({','.join(CSV_HEADER)})")
+        connections = [(row[2], row[3]) for _, row in group if row[2].strip() or row[3].strip()]
+        yield line, gate_id, group[0][1][1] or None, connections
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+
+def _validated(line: int, gate_id, name, connections) -> GateRecord:
+    gate_id = _gate_id(line, gate_id, "gate")
+    if name is not None and (not isinstance(name, str) or len(name) > NAME_MAX_LENGTH):
+        raise GateFileError(line, f"gate {gate_id}: name must be a string of at most {NAME_MAX_LENGTH} characters")
+
+    validated = []
+    for target_id, hu in connections:
+        target_id = _gate_id(line, target_id, f"gate {gate_id}: connection target")
+        try:
+            hu = int(hu.strip() if isinstance(hu, str) else hu)
+        except (TypeError, ValueError):
+            hu = -1
+        if not 0 <= hu <= HU_MAX:
+            raise GateFileError(line, f"gate {gate_id}: connection to {target_id} needs an HU between 0 and {HU_MAX}")
+        validated.append((target_id, hu))
+    return GateRecord(gate_id, name, validated, line)
+
+
+def _gate_id(line: int, gate_id, what: str) -> str:
+    if not isinstance(gate_id, str) or not 0 < len(gate_id.strip()) <= GATE_ID_MAX_LENGTH:
+        raise GateFileError(line, f"{what} ID must be 1 to {GATE_ID_MAX_LENGTH} characters")
+    return gate_id.strip().upper()
+
+
+def _create_staging_tables() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGED_GATES} "
+            f"(id varchar({GATE_ID_MAX_LENGTH}) PRIMARY KEY, name varchar({NAME_MAX_LENGTH}))"
+        )
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGED_CONNECTIONS} "
+            f"(seq bigint PRIMARY KEY, source_id varchar({GATE_ID_MAX_LENGTH}), "
+            f"target_id varchar({GATE_ID_MAX_LENGTH}), hu integer)"
+        )
+
+
+def _drop_staging_tables() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {STAGED_CONNECTIONS}")
+        cursor.execute(f"DROP TABLE {STAGED_GATES}")
+
+
+def _stage_chunk(chunk: list[GateRecord], rows: list[tuple[int, str, str, int]]) -> None:
+    try:
+        # A savepoint, so that a rejected chunk can still be inspected
+        with transaction.atomic(), connection.wrap_database_errors:
+            _insert_rows(STAGED_GATES, ["id", "name"], [(record.id, record.name) for record in chunk])
+            _insert_rows(STAGED_CONNECTIONS, ["seq", "source_id", "target_id", "hu"], rows)
+    except IntegrityError:
+        duplicate = _first_duplicate(chunk)
+        if duplicate is None:
+            raise
+        raise GateFileError(duplicate.line, f"gate {duplicate.id} appears more than once")
+
+
+def _insert_rows(table: str, columns: list[str], rows: list[tuple]) -> None:
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            placeholders = ", ".join(["%s"] * len(columns))
+            cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+
+def _first_duplicate(chunk: list[GateRecord]) -> GateRecord | None:
+    """
+    The first record of a rejected chunk whose gate is already staged, by an
+    earlier chunk or earlier in this one.
+    """
+    staged = set()
+    with connection.cursor() as cursor:
+        for batch in _chunks([record.id for record in chunk], 500):
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"SELECT id FROM {STAGED_GATES} WHERE id IN ({placeholders})", batch)
+            staged.update(gate_id for gate_id, in cursor.fetchall())
+    for record in chunk:
+        if record.id in staged:
+            return record
+        staged.add(record.id)
+    return None
+
+
+def _count_unknown_targets(include_live: bool) -> int:
+    """
+    Staged connections whose target is neither staged nor, unless the import
+    clears them, one of the live gates.
+    """
+    gates = connection.ops.quote_name(Gate._meta.db_table)
+    live = f" AND NOT EXISTS (SELECT 1 FROM {gates} g WHERE g.id = c.target_id)" if include_live else ""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {STAGED_CONNECTIONS} c "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {STAGED_GATES} s WHERE s.id = c.target_id){live}"
+        )
+        return cursor.fetchone()[0]
+
+
+def _merge_staged(clear: bool) -> None:
+    gates = connection.ops.quote_name(Gate._meta.db_table)
+    connections = connection.ops.quote_name(GateConnection._meta.db_table)
+    if clear:
+        _delete_rows(GateConnection)
+        _delete_rows(Gate)
+    with connection.cursor() as cursor:
+        # WHERE true keeps SQLite from parsing ON CONFLICT as a join constraint
+        cursor.execute(
+            f"INSERT INTO {gates} (id, name) SELECT id, name FROM {STAGED_GATES} WHERE true "
+            f"ON CONFLICT (id) DO UPDATE SET name = excluded.name"
+        )
+        if not clear:
+            cursor.execute(f"DELETE FROM {connections} WHERE source_id IN (SELECT id FROM {STAGED_GATES})")
+        # Connection IDs keep the file order, which is the connection order
+        cursor.execute(
+            f"INSERT INTO {connections} (source_id, target_id, hu) "
+            f"SELECT source_id, target_id, hu FROM {STAGED_CONNECTIONS} ORDER BY seq"
+        )
+
+
+def _delete_rows(model) -> None:
+    """
+    Delete every row with plain SQL: QuerySet.delete() would load every row
+    to send its delete signals, and invalidate the graph once per row.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
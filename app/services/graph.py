@@ -0,0 +1,531 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from functools import cached_property
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from app.models import Gate, GateConnection
+from app.services.executor import run_in_executor
+from app.services.snapshot import Snapshot, write_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+
+GRAPH_VERSION_CACHE_KEY = "gate-graph-version"
+# Wall-clock time of the last published gate change
+GRAPH_CHANGED_AT_CACHE_KEY = "gate-graph-changed-at"
+GRAPH_DELTA_CACHE_KEY = "gate-graph-delta:{}"
+# PostgreSQL advisory lock held while a graph version is published
+GRAPH_PUBLISH_LOCK_ID = 0x6761746567726170
+# Longest run of published HU changes a worker replays before it reloads
+MAX_GRAPH_DELTAS = 32
+
+
+class GateGraph:
+    """
+    Compiled, read-only view of the gate network.
+
+    Gates are mapped to dense integer indices in gate ID order and outgoing
+    connections are stored CSR-style: the edges of gate ``i`` are
+    ``targets[offsets[i]:offsets[i + 1]]`` with matching ``weights``.
+    Connections pointing at unknown gates are dropped at compile time, so
+    searches never have to check for them.
+
+    Built once from the Gate table (or mapped from a snapshot file, see
+    app/services/snapshot.py) and shared by every request in the process
+    until the graph version changes. The CSR buffers are arrays or, for
+    snapshots, read-only memoryviews with the same typecodes.
+    """
+
+    def __init__(self, ids, offsets, targets, weights, version: str | None = None, snapshot: Snapshot | None = None):
+        self.ids = ids
+        self.index = {gate_id: i for i, gate_id in enumerate(ids)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.version = version
+        self.snapshot = snapshot
+        self._memo = {}
+
+    def __contains__(self, gate_id: str) -> bool:
+        return gate_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """
+        Content hash of the gate IDs and edges, stable across processes.
+
+        Unlike ``version`` it identifies the network itself, so artifacts
+        written to disk can be matched against the live graph.
+        """
+        digest = hashlib.sha256()
+        digest.update("\n".join(self.ids).encode())
+        for buffer in (self.offsets, self.targets, self.weights):
+            digest.update(memoryview(buffer).cast("B"))
+        return digest.hexdigest()
+
+    def memo(self, key, build):
+        """
+        Return a structure derived from this graph, building it on first use.
+
+        Derived structures live and die with the compiled graph, so they are
+        invalidated together with it.
+        """
+        try:
+            return self._memo[key]
+        except KeyError:
+            return self._memo.setdefault(key, build())
+
+    @cached_property
+    def positive_weights(self) -> bool:
+        """
+        True if every connection costs at least 1 HU.
+        """
+        return min(self.weights, default=1) > 0
+
+    def reversed(self) -> "GateGraph":
+        """
+        The graph with every connection flipped, for searches towards a gate.
+
+        Built once per compiled graph. Incoming edges of each gate are kept in
+        source gate order.
+        """
+        return self.memo("reversed", self._build_reversed)
+
+    def _build_reversed(self) -> "GateGraph":
+        n = len(self.ids)
+        offsets = array("q", [0]) * (n + 1)
+        for target in self.targets:
+            offsets[target + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        position = offsets[:-1]
+        targets = array("i", [0]) * len(self.targets)
+        weights = array("q", [0]) * len(self.weights)
+        for source in range(n):
+            for edge in range(self.offsets[source], self.offsets[source + 1]):
+                target = self.targets[edge]
+                targets[position[target]] = source
+                weights[position[target]] = self.weights[edge]
+                position[target] += 1
+
+        return GateGraph(self.ids, offsets, targets, weights, self.version)
+
+    def edge_source(self, edge: int) -> int:
+        """
+        Index of the gate an edge leaves from.
+        """
+        return bisect_right(self.offsets, edge) - 1
+
+    def reverse_edge(self, edge: int) -> int:
+        """
+        Position of an edge in ``reversed()``.
+
+        Parallel edges keep their relative order, so the n-th edge from
+        source to target is the n-th incoming edge of target from source.
+        """
+        source = self.edge_source(edge)
+        target = self.targets[edge]
+        nth = sum(1 for e in range(self.offsets[source], edge) if self.targets[e] == target)
+        reverse = self.reversed()
+        for r in range(reverse.offsets[target], reverse.offsets[target + 1]):
+            if reverse.targets[r] == source:
+                if nth == 0:
+                    return r
+                nth -= 1
+        raise ValueError(f"edge {edge} is missing from the reversed graph")
+
+    def with_weight(self, edge: int, hu: int, version: str | None = None) -> "GateGraph":
+        """
+        Copy of the graph with a new HU on one edge.
+
+        Used when a connection's HU is edited: the gate and edge arrays are
+        shared and only the weights are copied. Derived structures in the memo
+        that implement ``reweighted(graph, edge, old_hu)`` are updated for the
+        new weight rather than rebuilt from scratch; the others are dropped and
+        rebuilt on first use.
+        """
+        old_hu = self.weights[edge]
+        weights = array("q", self.weights)
+        weights[edge] = hu
+        graph = GateGraph(self.ids, self.offsets, self.targets, weights, version)
+
+        reverse = self._memo.get("reversed")
+        if reverse is not None:
+            reverse_weights = array("q", reverse.weights)
+            reverse_weights[self.reverse_edge(edge)] = hu
+            graph._memo["reversed"] = GateGraph(reverse.ids, reverse.offsets, reverse.targets, reverse_weights, version)
+
+        for key, value in self._memo.items():
+            if key != "reversed" and hasattr(value, "reweighted"):
+                updated = value.reweighted(graph, edge, old_hu)
+                if updated is not None:
+                    graph._memo[key] = updated
+        return graph
+
+    def neighbors(self, gate_id: str) -> list[tuple[str, int]]:
+        """
+        Outgoing (gate_id, hu) pairs of a gate, in connection order.
+        """
+        i = self.index[gate_id]
+        return [
+            (self.ids[self.targets[e]], self.weights[e])
+            for e in range(self.offsets[i], self.offsets[i + 1])
+        ]
+
+    @classmethod
+    def from_adjacency(cls, ids, adjacency, version: str | None = None) -> "GateGraph":
+        """
+        Build the CSR arrays from per-gate edge lists.
+
+        ``adjacency`` yields one iterable of (target_index, hu) pairs per gate,
+        in the same order as ``ids``, so large networks can be streamed in.
+        """
+        offsets = array("q", [0])
+        targets = array("i")
+        weights = array("q")
+        for edges in adjacency:
+            for target, hu in edges:
+                targets.append(target)
+                weights.append(hu)
+            offsets.append(len(targets))
+
+        if len(offsets) != len(ids) + 1:
+            raise ValueError("adjacency must have one entry per gate")
+        return cls(ids, offsets, targets, weights, version)
+
+    @classmethod
+    def from_edges(cls, gate_ids, edges, version: str | None = None) -> "GateGraph":
+        """
+        Compile gate IDs and (source_id, target_id, hu) edge rows.
+        """
+        ids = sorted(gate_ids)
+        index = {gate_id: i for i, gate_id in enumerate(ids)}
+
+        adjacency = [[] for _ in ids]
+        for source_id, target_id, hu in edges:
+            source = index.get(source_id)
+            target = index.get(target_id)
+            if source is not None and target is not None:
+                adjacency[source].append((target, int(hu)))
+
+        return cls.from_adjacency(ids, adjacency, version)
+
+    @classmethod
+    def from_rows(cls, rows, version: str | None = None) -> "GateGraph":
+        """
+        Compile (gate_id, connections) rows, where connections is a list of
+        {"id": ..., "hu": ...} dicts as used by the API and fixtures.
+        """
+        rows = list(rows)
+        edges = (
+            (gate_id, conn.get("id"), conn.get("hu", 0))
+            for gate_id, connections in rows
+            for conn in connections or []
+        )
+        return cls.from_edges([gate_id for gate_id, _ in rows], edges, version)
+
+    @classmethod
+    def from_db(cls, version: str | None = None) -> "GateGraph":
+        return cls.from_edges(
+            Gate.objects.values_list("id", flat=True),
+            GateConnection.objects.order_by("id").values_list("source_id", "target_id", "hu"),
+            version,
+        )
+
+    @classmethod
+    def from_snapshot(cls, path: Path) -> "GateGraph":
+        """
+        Map a snapshot written by ``write_snapshot``; the graph takes the snapshot's version.
+        """
+        snapshot = Snapshot(path)
+        return cls(snapshot.ids, snapshot.offsets, snapshot.targets, snapshot.weights, snapshot.version, snapshot)
+
+    def write_snapshot(self, path: Path) -> None:
+        write_snapshot(path, self.ids, self.offsets, self.targets, self.weights, self.version)
+
+
+_graph: GateGraph | None = None
+_graph_lock = threading.Lock()
+# (device, inode, mtime, size) of the last snapshot file this process mapped
+_snapshot_identity = None
+# version -> in-flight aget_graph() load, shared by concurrent requests
+_graph_loads: dict[str, asyncio.Task] = {}
+_publish_thread_lock = threading.Lock()
+
+
+def graph_version() -> str:
+    """
+    Current graph version stamp.
+
+    The stamp lives in the default cache so that, with a shared cache backend,
+    a write in one worker invalidates the compiled graph in every worker.
+    """
+    return cache.get_or_set(GRAPH_VERSION_CACHE_KEY, lambda: uuid.uuid4().hex, timeout=None)
+
+
+def get_graph() -> GateGraph:
+    """
+    Return the process-wide compiled graph, rebuilding it if the version changed
+    or a new snapshot was published.
+    """
+    global _graph
+
+    version = graph_version()
+    graph = _graph
+    if graph is not None and graph.version == version and not _snapshot_published(graph):
+        return graph
+
+    with _graph_lock:
+        version = graph_version()
+        if _graph is None or _graph.version != version or _snapshot_published(_graph):
+            _graph = _updated_graph(_graph, version) or _load_graph(version)
+        return _graph
+
+
+def graph_changed_at() -> float | None:
+    """
+    When the gates last changed (a time.time() timestamp), or None if no
+    change was published since the cache was cleared.
+    """
+    return cache.get(GRAPH_CHANGED_AT_CACHE_KEY)
+
+
+async def agraph_version() -> str:
+    """
+    ``graph_version`` for async callers.
+    """
+    return await cache.aget_or_set(GRAPH_VERSION_CACHE_KEY, lambda: uuid.uuid4().hex, timeout=None)
+
+
+async def aget_graph() -> GateGraph:
+    """
+    ``get_graph`` for async views.
+
+    A reload reads the database with the async ORM and compiles on the search
+    pool, so the event loop keeps serving other requests meanwhile. Requests
+    that need the same version while it loads wait for that one load.
+    """
+    version = await agraph_version()
+    graph = _graph
+    if graph is not None and graph.version == version and not _snapshot_published(graph):
+        return graph
+
+    load = _graph_loads.get(version)
+    if load is None or load.get_loop() is not asyncio.get_running_loop():
+        load = asyncio.ensure_future(_aload_graph(version))
+        _graph_loads[version] = load
+        load.add_done_callback(lambda done: _graph_loads.get(version) is done and _graph_loads.pop(version))
+    # One caller giving up must not cancel the load for the others
+    return await asyncio.shield(load)
+
+
+def invalidate_graph(version: str | None = None) -> None:
+    """
+    Drop the compiled graph and publish a new version stamp.
+
+    Called from Gate and GateConnection save/delete signals. Code that writes gates without
+    signals (bulk_create, queryset.update, raw SQL) must call it explicitly.
+    The snapshot file, if any, no longer matches the gates and is removed.
+
+    Inside a transaction this happens when it commits, and not at all if it
+    rolls back: a worker reloading before the commit would otherwise cache
+    the old rows under the new version.
+    """
+    def publish():
+        global _graph
+
+        with _publish_lock(), _graph_lock:
+            cache.set_many({GRAPH_VERSION_CACHE_KEY: version or uuid.uuid4().hex, GRAPH_CHANGED_AT_CACHE_KEY: time.time()}, timeout=None)
+            _graph = None
+            if version is None:
+                _remove_snapshot()
+
+    transaction.on_commit(publish)
+
+
+def publish_connection_hu(connection_id: int) -> bool:
+    """
+    Publish a new graph version for an edit to one connection's HU.
+
+    Instead of dropping their compiled graph, workers replay the change on
+    the graph they hold (see ``GateGraph.with_weight``), which keeps the
+    route table and landmarks warm. Returns False if the change has to be
+    published with ``invalidate_graph`` instead, e.g. because the
+    connection no longer exists.
+    """
+    with _publish_lock():
+        row = GateConnection.objects.filter(pk=connection_id).values_list("source_id", "target_id", "hu").first()
+        if row is None:
+            return False
+        source_id, target_id, hu = row
+        siblings = list(GateConnection.objects.filter(source_id=source_id).order_by("id").values_list("id", "target_id"))
+        known = set(Gate.objects.filter(id__in={source_id} | {t for _, t in siblings}).values_list("id", flat=True))
+        if source_id not in known or target_id not in known:
+            # Not compiled into the graph, nothing changes
+            return True
+
+        base = graph_version()
+        version = uuid.uuid4().hex
+        change = {
+            "base": base,
+            "source": source_id,
+            "position": sum(1 for pk, t in siblings if pk < connection_id and t in known),
+            "target": target_id,
+            "hu": int(hu),
+        }
+        cache.set(GRAPH_DELTA_CACHE_KEY.format(version), change, timeout=settings.GRAPH_DELTA_TIMEOUT)
+        cache.set_many({GRAPH_VERSION_CACHE_KEY: version, GRAPH_CHANGED_AT_CACHE_KEY: time.time()}, timeout=None)
+        _remove_snapshot()
+    return True
+
+
+def publish_snapshot(graph: GateGraph, path: Path) -> None:
+    """
+    Write ``graph`` as the snapshot at ``path`` and make it the current version.
+
+    Workers pick the new file up on their next request without a restart.
+    """
+    graph.write_snapshot(path)
+    invalidate_graph(graph.version)
+
+
+@contextmanager
+def _publish_lock():
+    """
+    Serialize version publishing across workers, so HU changes form a chain
+    of versions each worker can replay in order.
+
+    Not a cache lock: no cache backend has an atomic ``add`` across
+    processes. On PostgreSQL a transaction-level advisory lock serializes
+    every process, and is released if its holder dies. Other databases are
+    only used by a single process (the test suite), where a thread lock does.
+    """
+    with _publish_thread_lock, transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [GRAPH_PUBLISH_LOCK_ID])
+        yield
+
+
+def _remove_snapshot() -> None:
+    if settings.GRAPH_SNAPSHOT_PATH:
+        try:
+            os.unlink(settings.GRAPH_SNAPSHOT_PATH)
+        except FileNotFoundError:
+            pass
+
+
+def _updated_graph(graph: GateGraph | None, version: str) -> GateGraph | None:
+    """
+    ``graph`` with the HU changes published since its version replayed, or
+    None if ``version`` cannot be reached that way and the graph must be
+    reloaded.
+    """
+    if graph is None or graph.version is None or graph.version == version:
+        return None
+
+    changes = []
+    while version != graph.version:
+        change = cache.get(GRAPH_DELTA_CACHE_KEY.format(version))
+        if change is None or len(changes) == MAX_GRAPH_DELTAS:
+            return None
+        changes.append((version, change))
+        version = change["base"]
+
+    for version, change in reversed(changes):
+        source = graph.index.get(change["source"])
+        target = graph.index.get(change["target"])
+        if source is None or target is None:
+            return None
+        edge = graph.offsets[source] + change["position"]
+        if edge >= graph.offsets[source + 1] or graph.targets[edge] != target:
+            return None
+        graph = graph.with_weight(edge, change["hu"], version)
+    return graph
+
+
+def _snapshot_published(graph: GateGraph) -> bool:
+    """
+    True if the snapshot file was replaced since this process last mapped it.
+    """
+    path = settings.GRAPH_SNAPSHOT_PATH
+    if not path:
+        return False
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return graph.snapshot is not None
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size) != _snapshot_identity
+
+
+def _load_graph(version: str) -> GateGraph:
+    """
+    Map the snapshot if it is current or newly published, otherwise read the database.
+    """
+    return _load_snapshot(version) or GateGraph.from_db(version)
+
+
+async def _aload_graph(version: str) -> GateGraph:
+    global _graph
+
+    graph = await run_in_executor(_updated_graph, _graph, version) or await run_in_executor(_load_snapshot, version)
+    if graph is None:
+        ids = [gate_id async for gate_id in Gate.objects.values_list("id", flat=True)]
+        edges = [
+            row async for row in GateConnection.objects.order_by("id").values_list("source_id", "target_id", "hu")
+        ]
+        graph = await run_in_executor(GateGraph.from_edges, ids, edges, version)
+
+    with _graph_lock:
+        _graph = graph
+    return graph
+
+
+def _load_snapshot(version: str) -> GateGraph | None:
+    """
+    Map the snapshot file if it should be served for ``version``.
+
+    A snapshot this process has not seen before wins, and its version becomes
+    the current one. Writes through the ORM remove the snapshot, so an older
+    snapshot never shadows newer gates.
+    """
+    global _snapshot_identity
+
+    path = settings.GRAPH_SNAPSHOT_PATH
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        graph = GateGraph.from_snapshot(path)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not map graph snapshot %s: %s", path, e)
+        return None
+
+    is_new = graph.snapshot.identity != _snapshot_identity
+    _snapshot_identity = graph.snapshot.identity
+    if graph.version == version:
+        return graph
+    if is_new:
+        cache.set(GRAPH_VERSION_CACHE_KEY, graph.version, timeout=None)
+        return graph
+    return None
@@ -0,0 +1,71 @@
+from app.services.route_finder import find_cheapest_routes
+from app.services.transport_cost import cheapest_transport
+
+
+def plan_journey(origin_id: str, destination_id: str, distance_au: float, passengers: int, parking_days: int) -> dict | None:
+    """
+    Cheapest door-to-door journey: transport to the origin gate, then the
+    cheapest hyperspace route to the destination gate for every passenger.
+
+    Returns None when no route exists. Raises ValueError for unknown gates or
+    invalid transport parameters.
+    """
+    result = plan_journeys([{
+        "origin": origin_id,
+        "destination": destination_id,
+        "distance_au": distance_au,
+        "passengers": passengers,
+        "parking_days": parking_days,
+    }])[0]
+    if isinstance(result, ValueError):
+        raise result
+    return result
+
+
+def plan_journeys(journeys: list[dict]) -> list[dict | None | ValueError]:
+    """
+    Batch version of plan_journey over dicts with origin, destination,
+    distance_au, passengers and parking_days.
+
+    Hyperspace legs are priced with find_cheapest_routes, so journeys sharing
+    an origin gate share one shortest-path tree of the cached graph. Each item
+    is the journey, None when no route exists, or the ValueError raised for it.
+    """
+    routes = find_cheapest_routes([(j["origin"], j["destination"]) for j in journeys])
+
+    results = []
+    for journey, route in zip(journeys, routes):
+        if not isinstance(route, dict):
+            results.append(route)
+            continue
+        try:
+            transport = cheapest_transport(journey["distance_au"], journey["passengers"], journey["parking_days"])
+        except ValueError as e:
+            results.append(e)
+            continue
+        results.append(journey_result(journey, transport, route))
+
+    return results
+
+
+def journey_result(journey: dict, transport: dict, route: dict) -> dict:
+    """
+    Journey payload in the shape of JourneySerializer.
+    """
+    passengers = journey["passengers"]
+    hyperspace_cost = round(route["cost_per_passenger_gbp"] * passengers, 2)
+
+    return {
+        "origin": route["origin"],
+        "destination": route["destination"],
+        "passengers": passengers,
+        "transport": {
+            "distance_in_au": journey["distance_au"],
+            "passengers": passengers,
+            "parking_days": journey["parking_days"],
+            **transport,
+        },
+        "route": route,
+        "hyperspace_cost_gbp": hyperspace_cost,
+        "total_cost_gbp": round(transport["total_cost_gbp"] + hyperspace_cost, 2),
+    }
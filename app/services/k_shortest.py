@@ -0,0 +1,197 @@
+from heapq import heappop, heappush
+
+from app.services.engine import INF, dijkstra
+from app.services.graph import GateGraph
+
+
+def k_shortest_paths(graph: GateGraph, source: int, target: int, k: int) -> list[tuple[list[int], int]]:
+    """
+    Up to ``k`` cheapest loopless routes from ``source`` to ``target`` (Yen's algorithm).
+
+    Returns (path, total_hu) pairs in increasing cost order; the first is the
+    route ``dijkstra`` finds. Paths are gate sequences, so parallel
+    connections count once at their cheapest HU.
+
+    All spur searches share one reverse shortest-path tree towards the
+    target (see ``DistancesToTarget``), grown only as far as the routes
+    found so far reach. Its distances are an A* potential for the spur
+    searches, and when a spur gate's tree path avoids every removed gate and
+    edge it is used without searching at all.
+    """
+    first = dijkstra(graph, source, target).route(target)
+    if first is None or k <= 0:
+        return []
+    if k == 1:
+        return [first]
+
+    to_target = DistancesToTarget(graph, target)
+    found = [first]
+    found_paths = {tuple(first[0])}
+    candidates = []
+    seen = set(found_paths)
+
+    while len(found) < k:
+        path, total_hu = found[-1]
+        # Every gate on the path is at most total_hu from the target
+        to_target.grow(2 * total_hu)
+        estimate = to_target.estimator()
+        prefix_costs = _prefix_costs(graph, path)
+        for i in range(len(path) - 1):
+            spur, root = path[i], path[:i + 1]
+            blocked_edges = {
+                (other[i], other[i + 1])
+                for other, _ in found
+                if len(other) > i + 1 and other[:i + 1] == root
+            }
+            blocked_nodes = set(root[:-1])
+
+            spur_route = _tree_path(to_target, spur, target, blocked_nodes, blocked_edges)
+            if spur_route is None:
+                spur_route = _spur_search(graph, estimate, spur, target, blocked_nodes, blocked_edges)
+            if spur_route is None:
+                continue
+
+            spur_path, spur_hu = spur_route
+            candidate = root[:-1] + spur_path
+            key = tuple(candidate)
+            if key not in seen:
+                seen.add(key)
+                heappush(candidates, (prefix_costs[i] + spur_hu, key))
+
+        if not candidates:
+            break
+        total_hu, key = heappop(candidates)
+        found.append((list(key), total_hu))
+
+    return found
+
+
+class DistancesToTarget:
+    """
+    Reverse Dijkstra from a target gate, resumed on demand.
+
+    After ``grow(radius)`` every gate within ``radius`` HU of the target is
+    settled with its exact distance and its next hop towards the target.
+    Unsettled gates are at least the frontier distance away, which makes
+    "exact distance if settled, else frontier distance" a consistent A*
+    heuristic (INF once the whole graph is exhausted).
+    """
+
+    def __init__(self, graph: GateGraph, target: int):
+        reverse = graph.reversed()
+        self.offsets = reverse.offsets
+        self.sources = reverse.targets
+        self.weights = reverse.weights
+        self.distances = {target: 0}
+        self.next_hop = {target: -1}
+        self.settled = set()
+        self.heap = [(0, target)]
+
+    @property
+    def frontier(self):
+        return self.heap[0][0] if self.heap else INF
+
+    def grow(self, radius) -> None:
+        heap = self.heap
+        distances = self.distances
+        settled = self.settled
+        while heap and heap[0][0] <= radius:
+            distance, node = heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            for edge in range(self.offsets[node], self.offsets[node + 1]):
+                neighbor = self.sources[edge]
+                if neighbor in settled:
+                    continue
+                new_distance = distance + self.weights[edge]
+                if new_distance < distances.get(neighbor, INF):
+                    distances[neighbor] = new_distance
+                    self.next_hop[neighbor] = node
+                    heappush(heap, (new_distance, neighbor))
+
+    def estimator(self):
+        """
+        Heuristic function for the current frontier; call again after ``grow``.
+        """
+        distances, settled, frontier = self.distances, self.settled, self.frontier
+
+        def estimate(node):
+            return distances[node] if node in settled else frontier
+
+        return estimate
+
+
+def _prefix_costs(graph: GateGraph, path: list[int]) -> list[int]:
+    costs = [0]
+    for node, next_node in zip(path, path[1:]):
+        costs.append(costs[-1] + _edge_hu(graph, node, next_node))
+    return costs
+
+
+def _edge_hu(graph: GateGraph, source: int, target: int) -> int:
+    return min(
+        graph.weights[edge]
+        for edge in range(graph.offsets[source], graph.offsets[source + 1])
+        if graph.targets[edge] == target
+    )
+
+
+def _tree_path(to_target: DistancesToTarget, spur: int, target: int, blocked_nodes: set, blocked_edges: set):
+    """
+    The spur gate's path in the reverse tree, if nothing on it is blocked.
+    """
+    if spur not in to_target.settled:
+        return None
+    path = [spur]
+    node = spur
+    while node != target:
+        next_node = to_target.next_hop[node]
+        if next_node in blocked_nodes or (node, next_node) in blocked_edges:
+            return None
+        path.append(next_node)
+        node = next_node
+    return path, to_target.distances[spur]
+
+
+def _spur_search(graph: GateGraph, estimate, spur: int, target: int, blocked_nodes: set, blocked_edges: set):
+    """
+    A* from ``spur`` to ``target`` avoiding the blocked gates and edges.
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    distances = {spur: 0}
+    previous = {spur: -1}
+    settled = set()
+    heap = [(estimate(spur), spur)]
+    while heap:
+        _, node = heappop(heap)
+        if node in settled:
+            continue
+        if node == target:
+            break
+        settled.add(node)
+
+        distance = distances[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            if neighbor in settled or neighbor in blocked_nodes or (node, neighbor) in blocked_edges:
+                continue
+            lower_bound = estimate(neighbor)
+            if lower_bound == INF:
+                continue
+            new_distance = distance + weights[edge]
+            if new_distance < distances.get(neighbor, INF):
+                distances[neighbor] = new_distance
+                previous[neighbor] = node
+                heappush(heap, (new_distance + lower_bound, neighbor))
+    else:
+        return None
+
+    path = [target]
+    while path[-1] != spur:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path, distances[target]
@@ -0,0 +1,175 @@
+from array import array
+from heapq import heappop, heappush
+
+from django.conf import settings
+
+from app.services.engine import INF, dijkstra
+from app.services.graph import GateGraph
+
+
+UNREACHABLE = -1
+
+
+class Landmarks:
+    """
+    Precomputed distances from and to a few landmark gates (ALT).
+
+    By the triangle inequality, for any landmark L the HU from gate v to
+    gate t is at least d(L, t) - d(L, v) and at least d(v, L) - d(t, L). The
+    largest of these bounds is a consistent A* heuristic. Distances are kept
+    in int64 arrays with ``UNREACHABLE`` for gates a landmark cannot reach.
+
+    The bounds stay valid, if looser, on a graph whose edges only got more
+    expensive since the distances were measured, so after HU edits the
+    distances may be those of a lighter graph. ``relaxed`` maps the edges
+    that were measured cheaper than they are now to the HU measured.
+    """
+
+    def __init__(self, gates: list[int], forward: list[array], backward: list[array], relaxed: dict | None = None):
+        self.gates = gates
+        self.forward = forward
+        self.backward = backward
+        self.relaxed = relaxed or {}
+
+    @classmethod
+    def build(cls, graph: GateGraph, count: int) -> "Landmarks":
+        """
+        Pick up to ``count`` landmarks by farthest-point selection.
+
+        Each new landmark is the gate farthest (there and back) from every
+        landmark chosen so far, starting from the gate farthest from gate 0,
+        so landmarks end up on the edges of the network where their bounds
+        are tightest. Parts of the network no landmark reaches get one of
+        their own. Costs two full searches per landmark.
+        """
+        n = len(graph)
+        if n == 0 or count <= 0:
+            return cls([], [], [])
+
+        reverse = graph.reversed()
+        gates, forward, backward = [], [], []
+        spread = [INF] * n
+        candidate = _farthest(dijkstra(graph, 0).distances)
+        while len(gates) < min(count, n):
+            from_landmark = dijkstra(graph, candidate).distances
+            to_landmark = dijkstra(reverse, candidate).distances
+            gates.append(candidate)
+            forward.append(_as_array(from_landmark))
+            backward.append(_as_array(to_landmark))
+
+            for node in range(n):
+                there, back = from_landmark[node], to_landmark[node]
+                if there == INF and back == INF:
+                    continue
+                round_trip = (0 if there == INF else there) + (0 if back == INF else back)
+                if round_trip < spread[node]:
+                    spread[node] = round_trip
+            for gate in gates:
+                spread[gate] = -1
+            # Gates no landmark reaches either way stay at INF and win
+            candidate = max(range(n), key=spread.__getitem__)
+            if spread[candidate] <= 0:
+                break
+
+        return cls(gates, forward, backward)
+
+    def reweighted(self, graph: GateGraph, edge: int, old_hu: int) -> "Landmarks":
+        """
+        The landmarks for ``graph``, in which ``edge`` weighed ``old_hu`` before.
+
+        A more expensive edge keeps the distances as they are. A cheaper one
+        propagates the shorter distances it opens from the edge outwards, to
+        and from each landmark, touching only the gates that improve.
+        """
+        hu = graph.weights[edge]
+        relaxed = dict(self.relaxed)
+        measured = relaxed.pop(edge, old_hu)
+        if hu >= measured:
+            if hu > measured:
+                relaxed[edge] = measured
+            return Landmarks(self.gates, self.forward, self.backward, relaxed)
+
+        source, target = graph.edge_source(edge), graph.targets[edge]
+        reverse = graph.reversed()
+        reverse_relaxed = {graph.reverse_edge(e): measured_hu for e, measured_hu in relaxed.items()}
+        forward = [_lowered(graph, relaxed, distances, source, target, hu) for distances in self.forward]
+        backward = [_lowered(reverse, reverse_relaxed, distances, target, source, hu) for distances in self.backward]
+        return Landmarks(self.gates, forward, backward, relaxed)
+
+    def heuristic(self, target: int):
+        """
+        Lower bound function on the HU from any gate to ``target``.
+
+        Returns INF for gates the landmarks prove cannot reach the target.
+        """
+        bounds = [
+            (forward, forward[target], backward, backward[target])
+            for forward, backward in zip(self.forward, self.backward)
+        ]
+
+        def lower_bound(node: int):
+            best = 0
+            for forward, from_to_target, backward, target_to in bounds:
+                from_to_node = forward[node]
+                if from_to_target != UNREACHABLE:
+                    if from_to_node != UNREACHABLE and from_to_target - from_to_node > best:
+                        best = from_to_target - from_to_node
+                elif from_to_node != UNREACHABLE:
+                    # L reaches the node but not the target
+                    return INF
+
+                node_to = backward[node]
+                if node_to != UNREACHABLE:
+                    if target_to != UNREACHABLE and node_to - target_to > best:
+                        best = node_to - target_to
+                elif target_to != UNREACHABLE:
+                    # The target reaches L but the node does not
+                    return INF
+            return best
+
+        return lower_bound
+
+
+def get_landmarks(graph: GateGraph) -> Landmarks:
+    """
+    Landmarks for the given graph, selected on first use.
+    """
+    count = settings.ROUTE_ALT_LANDMARKS
+    return graph.memo(("landmarks", count), lambda: Landmarks.build(graph, count))
+
+
+def _as_array(distances: list) -> array:
+    return array("q", (UNREACHABLE if d == INF else d for d in distances))
+
+
+def _lowered(graph: GateGraph, relaxed: dict, distances: array, source: int, target: int, hu: int) -> array:
+    """
+    ``distances`` from one landmark after the edge source -> target dropped
+    to ``hu``, copied if any of them improve. Edges in ``relaxed`` weigh
+    the HU the distances were measured with.
+    """
+    if distances[source] == UNREACHABLE or distances[source] + hu >= distances[target]:
+        return distances
+
+    distances = array("q", distances)
+    distances[target] = distances[source] + hu
+    heap = [(distances[target], target)]
+    while heap:
+        distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        for e in range(graph.offsets[node], graph.offsets[node + 1]):
+            neighbor = graph.targets[e]
+            new_distance = distance + relaxed.get(e, graph.weights[e])
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                heappush(heap, (new_distance, neighbor))
+    return distances
+
+
+def _farthest(distances: list) -> int:
+    best, farthest = -1, 0
+    for node, distance in enumerate(distances):
+        if distance != INF and distance > best:
+            best, farthest = distance, node
+    return farthest
@@ -0,0 +1,205 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Upper bounds of the request duration histogram, in seconds
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestProfile:
+    """
+    Time spent per phase of one request, and counters such as gates settled.
+
+    Spans with the same name add up, so a span that runs several times (one
+    per SQL query, say) reports its total. Created by ProfilingMiddleware;
+    code on the request path reports to it through ``span`` and ``count``.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: dict[str, float] = {}
+        self.counters = Counter()
+        self.labels: dict[str, str] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        """
+        The spans as a Server-Timing header value, durations in milliseconds.
+        """
+        metrics = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items()]
+        if self.counters["settled_nodes"] or self.counters["relaxed_edges"]:
+            metrics.append(
+                f'search-work;desc="settled={self.counters["settled_nodes"]} relaxed={self.counters["relaxed_edges"]}"'
+            )
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+_profile: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> RequestProfile | None:
+    return _profile.get()
+
+
+@contextmanager
+def profile_request():
+    """
+    Collect spans and counters for the code run inside the block.
+    """
+    profile = RequestProfile()
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time the block as phase ``name`` of the current request, if it is profiled.
+    """
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start)
+
+
+def record_search(stats) -> None:
+    """
+    Count the work of a route search (a SearchStats) for the current request.
+    """
+    profile = _profile.get()
+    if profile is not None and stats.strategy:
+        profile.counters["searches"] += 1
+        profile.counters["settled_nodes"] += stats.settled_nodes
+        profile.counters["relaxed_edges"] += stats.relaxed_edges
+        profile.labels["strategy"] = stats.strategy
+
+
+class Metrics:
+    """
+    Per-process request metrics in the Prometheus text format.
+
+    Like the quote cache counters these are kept per worker; scrape every
+    worker, or run one worker per metrics target.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._requests = Counter()
+            self._durations: dict[str, list] = {}
+            self._span_seconds = Counter()
+            self._span_counts = Counter()
+            self._search = Counter()
+            self._db_queries = 0
+            self._profiles_dumped = 0
+
+    def observe(self, view: str, method: str, status_code: int, seconds: float, profile: RequestProfile) -> None:
+        with self._lock:
+            self._requests[(view, method, str(status_code))] += 1
+            buckets = self._durations.setdefault(view, [0] * (len(DURATION_BUCKETS) + 1) + [0.0])
+            buckets[bisect_left(DURATION_BUCKETS, seconds)] += 1
+            buckets[-1] += seconds
+            for name, span_seconds in profile.spans.items():
+                self._span_seconds[(view, name)] += span_seconds
+                self._span_counts[(view, name)] += 1
+            strategy = profile.labels.get("strategy")
+            if strategy:
+                for name in ("searches", "settled_nodes", "relaxed_edges"):
+                    self._search[(strategy, name)] += profile.counters[name]
+            self._db_queries += profile.counters["db_queries"]
+
+    def profile_dumped(self) -> None:
+        with self._lock:
+            self._profiles_dumped += 1
+
+    def render(self, extra=()) -> str:
+        """
+        All metrics as Prometheus text exposition. ``extra`` adds families
+        from elsewhere as (name, type, help, [(labels, value), ...]).
+        """
+        with self._lock:
+            requests = dict(self._requests)
+            durations = {view: list(buckets) for view, buckets in self._durations.items()}
+            span_seconds = dict(self._span_seconds)
+            span_counts = dict(self._span_counts)
+            search = dict(self._search)
+            db_queries = self._db_queries
+            profiles_dumped = self._profiles_dumped
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {_number(value)}" if label_text else f"{name}{suffix} {_number(value)}")
+
+        family("interstellar_http_requests_total", "counter", "HTTP requests by view, method and status.", [
+            ("", {"view": view, "method": method, "status": status_code}, value)
+            for (view, method, status_code), value in sorted(requests.items())
+        ])
+
+        histogram = []
+        for view, buckets in sorted(durations.items()):
+            cumulative = 0
+            for bound, bucket in zip(DURATION_BUCKETS + (float("inf"),), buckets):
+                cumulative += bucket
+                histogram.append(("_bucket", {"view": view, "le": "+Inf" if bound == float("inf") else repr(bound)}, cumulative))
+            histogram.append(("_sum", {"view": view}, buckets[-1]))
+            histogram.append(("_count", {"view": view}, cumulative))
+        family("interstellar_http_request_duration_seconds", "histogram", "Request latency by view.", histogram)
+
+        family("interstellar_request_phase_seconds_total", "counter", "Time spent per request phase.", [
+            ("", {"view": view, "phase": name}, value) for (view, name), value in sorted(span_seconds.items())
+        ])
+        family("interstellar_request_phase_requests_total", "counter", "Requests that went through each phase.", [
+            ("", {"view": view, "phase": name}, value) for (view, name), value in sorted(span_counts.items())
+        ])
+        for name, help_text in (
+            ("searches", "Route searches run."),
+            ("settled_nodes", "Gates settled (nodes expanded) by route searches."),
+            ("relaxed_edges", "Connections relaxed by route searches."),
+        ):
+            family(f"interstellar_route_{name}_total", "counter", help_text, [
+                ("", {"strategy": strategy}, value)
+                for (strategy, counter), value in sorted(search.items()) if counter == name
+            ])
+        family("interstellar_db_queries_total", "counter", "SQL queries run by profiled requests.", [
+            ("", {}, db_queries),
+        ])
+        family("interstellar_profiles_dumped_total", "counter", "Slow requests dumped as cProfile stats.", [
+            ("", {}, profiles_dumped),
+        ])
+        for name, kind, help_text, samples in extra:
+            family(name, kind, help_text, [("", labels, value) for labels, value in samples])
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+from app.services.profiling import span
+
+
+class QuoteCache:
+    """
+    Cache of computed quotes keyed on normalized parameters.
+
+    Entries are stored in the Django cache named by QUOTE_CACHE_ALIAS, so
+    eviction and TTL are those of the configured backend. Quotes that depend
+    on the gate network pass the graph version, which makes entries for an
+    older network unreachable as soon as the gates change.
+
+    Hit and miss counters are kept per process.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[settings.QUOTE_CACHE_ALIAS]
+
+    def key(self, kind: str, params: dict, version: str | None = None) -> str:
+        normalized = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha1(f"{version}:{normalized}".encode()).hexdigest()
+        return f"quote:{kind}:{digest}"
+
+    def get_or_compute(self, kind: str, params: dict, compute, version: str | None = None) -> tuple[object, bool]:
+        """
+        Return (value, hit). On a miss ``compute()`` is called and its result stored.
+        """
+        if not settings.QUOTE_CACHE_ENABLED:
+            return compute(), False
+
+        key = self.key(kind, params, version)
+        with span("quote_cache"):
+            value = self.cache.get(key)
+        hit = value is not None
+        if not hit:
+            value = compute()
+            with span("quote_cache"):
+                self.cache.set(key, value)
+
+        self._count(kind, hit)
+        return value, hit
+
+    async def aget_or_compute(self, kind: str, params: dict, compute, version: str | None = None) -> tuple[object, bool]:
+        """
+        ``get_or_compute`` for async callers; ``compute`` is a coroutine function.
+        """
+        if not settings.QUOTE_CACHE_ENABLED:
+            return await compute(), False
+
+        key = self.key(kind, params, version)
+        with span("quote_cache"):
+            value = await self.cache.aget(key)
+        hit = value is not None
+        if not hit:
+            value = await compute()
+            with span("quote_cache"):
+                await self.cache.aset(key, value)
+
+        self._count(kind, hit)
+        return value, hit
+
+    def _count(self, kind: str, hit: bool) -> None:
+        with self._lock:
+            self._counts[(kind, "hits" if hit else "misses")] += 1
+
+    def stats(self) -> dict:
+        """
+        Hit and miss counts per quote kind, e.g. {"route": {"hits": 3, "misses": 1}}.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+
+        stats = {}
+        for (kind, outcome), count in sorted(counts.items()):
+            stats.setdefault(kind, {"hits": 0, "misses": 0})[outcome] = count
+        return stats
+
+    def clear(self) -> None:
+        self.cache.clear()
+        with self._lock:
+            self._counts.clear()
+
+
+quote_cache = QuoteCache()
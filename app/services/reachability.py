@@ -0,0 +1,191 @@
+from array import array
+
+from django.conf import settings
+
+from app.services.graph import GateGraph
+
+
+class ReachabilityIndex:
+    """
+    Which gates can reach which, from the strongly connected components of
+    the graph.
+
+    Gates in one component reach each other. Components are numbered by
+    Tarjan's algorithm, which finishes a component only after every
+    component it reaches, so a component only reaches lower-numbered ones.
+    With at most ``max_components`` components each one also keeps the set
+    of components it reaches as a bitset (an int), and every query is a
+    lookup; otherwise pairs that fail the numbering or weak-component checks
+    are answered without a search and the rest by a search over components.
+
+    HU edits do not change which gates are connected, so the index carries
+    over to a reweighted graph as is.
+    """
+
+    def __init__(self, graph: GateGraph, max_components: int):
+        self.component, self.count = _strongly_connected_components(graph)
+        component = self.component
+
+        successors = [set() for _ in range(self.count)]
+        offsets, targets = graph.offsets, graph.targets
+        for node in range(len(graph)):
+            source = component[node]
+            for edge in range(offsets[node], offsets[node + 1]):
+                target = component[targets[edge]]
+                if target != source:
+                    successors[source].add(target)
+        self.successors = [sorted(targets) for targets in successors]
+        self.weak = _weak_components(self.successors)
+
+        # Gates of component c: members[member_offsets[c]:member_offsets[c + 1]], in gate ID order
+        sizes = [0] * (self.count + 1)
+        for c in component:
+            sizes[c + 1] += 1
+        self.member_offsets = array("q", [0] * (self.count + 1))
+        for c in range(self.count):
+            self.member_offsets[c + 1] = self.member_offsets[c] + sizes[c + 1]
+        self.members = array("i", [0] * len(graph))
+        fill = array("q", self.member_offsets)
+        for node, c in enumerate(component):
+            self.members[fill[c]] = node
+            fill[c] += 1
+
+        self.closure = None
+        if self.count <= max_components:
+            closure = []
+            for c, targets in enumerate(self.successors):
+                reach = 1 << c
+                for target in targets:
+                    reach |= closure[target]
+                closure.append(reach)
+            self.closure = closure
+
+    def reachable(self, source: int, target: int) -> bool:
+        """
+        True if a route from gate ``source`` to gate ``target`` exists.
+        """
+        source, target = self.component[source], self.component[target]
+        if source == target:
+            return True
+        if source < target or self.weak[source] != self.weak[target]:
+            return False
+        if self.closure is not None:
+            return bool(self.closure[source] >> target & 1)
+        return target in self._reached(source, target)
+
+    def reachable_from(self, source: int) -> list[int]:
+        """
+        Gates reachable from gate ``source``, itself included, in gate ID order.
+        """
+        origin = self.component[source]
+        if self.closure is not None:
+            bits = bin(self.closure[origin])[:1:-1]
+            components = [c for c, bit in enumerate(bits) if bit == "1"]
+        else:
+            components = self._reached(origin)
+
+        members, offsets = self.members, self.member_offsets
+        gates = [node for c in components for node in members[offsets[c]:offsets[c + 1]]]
+        gates.sort()
+        return gates
+
+    def reweighted(self, graph: GateGraph, edge: int, old_hu: int) -> "ReachabilityIndex":
+        return self
+
+    def _reached(self, origin: int, target: int = -1) -> set[int]:
+        # Components reached from ``origin``; only those numbered at least
+        # ``target`` can lead to it
+        seen = {origin}
+        stack = [origin]
+        while stack:
+            for next_component in self.successors[stack.pop()]:
+                if next_component >= target and next_component not in seen:
+                    if next_component == target:
+                        return {target}
+                    seen.add(next_component)
+                    stack.append(next_component)
+        return seen
+
+
+def get_reachability(graph: GateGraph) -> ReachabilityIndex:
+    """
+    Reachability index for the given graph, built on first use.
+    """
+    return graph.memo("reachability", lambda: ReachabilityIndex(graph, settings.REACHABILITY_MAX_COMPONENTS))
+
+
+def _strongly_connected_components(graph: GateGraph) -> tuple[array, int]:
+    """
+    (component of each gate, number of components), by an iterative Tarjan.
+    """
+    n = len(graph)
+    offsets, targets = graph.offsets, graph.targets
+    order = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = array("i", [-1] * n)
+    stack = []
+    counter = 0
+    count = 0
+
+    for root in range(n):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        # (gate, next edge to follow) of the depth-first path
+        path = [(root, offsets[root])]
+        while path:
+            node, edge = path[-1]
+            end = offsets[node + 1]
+            while edge < end:
+                neighbor = targets[edge]
+                edge += 1
+                if order[neighbor] == -1:
+                    path[-1] = (node, edge)
+                    order[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = True
+                    path.append((neighbor, offsets[neighbor]))
+                    break
+                if on_stack[neighbor] and order[neighbor] < low[node]:
+                    low[node] = order[neighbor]
+            else:
+                path.pop()
+                if low[node] == order[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = count
+                        if member == node:
+                            break
+                    count += 1
+                if path:
+                    parent = path[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+    return component, count
+
+
+def _weak_components(successors: list[list[int]]) -> list[int]:
+    """
+    Weakly connected component of each strongly connected one (union-find).
+    """
+    parent = list(range(len(successors)))
+
+    def find(c):
+        while parent[c] != c:
+            parent[c] = parent[parent[c]]
+            c = parent[c]
+        return c
+
+    for source, targets in enumerate(successors):
+        for target in targets:
+            a, b = find(source), find(target)
+            if a != b:
+                parent[a] = b
+    return [find(c) for c in range(len(successors))]
@@ -1,74 +1,226 @@
-from app.models import Gate
+from django.conf import settings
+
 from app.constants import HYPERSPACE_COST_PER_PASSENGER_PER_HU
+from app.services.constrained import RouteConstraints, constrained_route
+from app.services.contraction import get_contraction_hierarchy
+from app.services.engine import INF, SearchStats, astar, bidirectional_dijkstra, dijkstra
+from app.services.graph import get_graph
+from app.services.k_shortest import k_shortest_paths
+from app.services.landmarks import get_landmarks
+from app.services.profiling import record_search, span
+from app.services.reachability import get_reachability
+from app.services.route_pool import route_groups
+from app.services.route_table import get_route_table
+
 
+SEARCH_STRATEGIES = ("dijkstra", "bidirectional", "astar", "ch")
 
-def find_cheapest_route(origin_id: str, destination_id: str) -> dict | None:
+
+def find_cheapest_route(
+    origin_id: str,
+    destination_id: str,
+    strategy: str | None = None,
+    stats: SearchStats | None = None,
+    constraints: RouteConstraints | None = None,
+) -> dict | None:
     """
     Find the cheapest route between two gates using Dijkstra's algorithm.
     Returns route info with path, total HU distance, and cost per passenger.
+
+    ``strategy`` is one of SEARCH_STRATEGIES (default ROUTE_SEARCH_STRATEGY).
+    "dijkstra", "bidirectional" and "astar" return the same route. "ch"
+    (contraction hierarchy) returns an equally cheap one, which is the same
+    route unless several cheapest routes tie; without a hierarchy built for
+    the current gates it falls back to "bidirectional". Pass ``stats`` to find out
+    which search ran and how much work it did.
+
+    With ``constraints`` the cheapest route that respects them is returned
+    (or None) by the constrained search, whatever the strategy.
+    """
+    origin_id = origin_id.upper()
+    destination_id = destination_id.upper()
+    strategy = strategy or settings.ROUTE_SEARCH_STRATEGY
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy '{strategy}'")
+    if stats is None:
+        stats = SearchStats()
+    stats.strategy, stats.settled_nodes, stats.relaxed_edges = strategy, 0, 0
+
+    if origin_id == destination_id and not (constraints and origin_id in constraints.avoid_gates):
+        return route_result(origin_id, destination_id, [origin_id], 0)
+
+    # Compiled graph, shared across requests until the gates change
+    with span("graph"):
+        graph = get_graph()
+    origin, destination = _gate_indices(graph, origin_id, destination_id)
+
+    # Gates in parts of the network with no route between them are answered
+    # without a search (constraints only ever remove routes)
+    if not get_reachability(graph).reachable(origin, destination):
+        stats.strategy = "reachability"
+        record_search(stats)
+        return None
+
+    if constraints:
+        stats.strategy = "constrained"
+        with span("search"):
+            route, stats.settled_nodes = _constrained_route(graph, origin, destination, constraints, stats)
+        record_search(stats)
+        return _graph_route_result(graph, route)
+
+    table = get_route_table(graph)
+    if table is not None:
+        stats.strategy = "table"
+        with span("search"):
+            route = table.route(origin, destination)
+        record_search(stats)
+        return _graph_route_result(graph, route)
+
+    hierarchy = get_contraction_hierarchy(graph) if strategy == "ch" else None
+    if strategy == "ch" and hierarchy is None:
+        # Not built for this graph yet, see build_contraction_hierarchy
+        strategy = stats.strategy = "bidirectional"
+
+    # These searches rebuild Dijkstra's path from distances, which relies
+    # on every connection costing at least 1 HU
+    if strategy in ("bidirectional", "astar") and not graph.positive_weights:
+        strategy = stats.strategy = "dijkstra"
+
+    with span("search"):
+        if strategy == "ch":
+            route, stats.settled_nodes = hierarchy.route(origin, destination, stats)
+        elif strategy == "bidirectional":
+            route, stats.settled_nodes = bidirectional_dijkstra(graph, origin, destination, stats)
+        elif strategy == "astar":
+            heuristic = get_landmarks(graph).heuristic(destination)
+            route, stats.settled_nodes = astar(graph, origin, destination, heuristic, stats)
+        else:
+            tree = dijkstra(graph, origin, destination, stats)
+            route, stats.settled_nodes = tree.route(destination), tree.settled
+    record_search(stats)
+
+    return _graph_route_result(graph, route)
+
+
+def find_alternative_routes(origin_id: str, destination_id: str, k: int) -> list[dict]:
+    """
+    The cheapest route plus up to ``k - 1`` alternatives, cheapest first.
+
+    The first route is the one find_cheapest_route returns with the default
+    Dijkstra search. Returns an empty list when no route exists and raises
+    ValueError for unknown gates.
     """
     origin_id = origin_id.upper()
     destination_id = destination_id.upper()
 
     if origin_id == destination_id:
-        return {
-            "origin": origin_id,
-            "destination": destination_id,
-            "path": [origin_id],
-            "total_hu": 0,
-            "cost_per_passenger_gbp": 0.0,
-        }
-
-    # Build adjacency map from database
-    gates = { gate.id: gate for gate in Gate.objects.all()}
-
-    if origin_id not in gates:
-        raise ValueError(f"Origin gate '{origin_id}' not found")
-    if destination_id not in gates:
-        raise ValueError(f"Destination gate '{destination_id}' not found")
+        return [route_result(origin_id, destination_id, [origin_id], 0)]
 
-    graph = {}
-    for gate_id, gate in gates.items():
-        graph[gate_id] = []
-        for conn in gate.connections:
-            neighbor_gate_id = conn.get("id")
-            distance_hu = int(conn.get("hu", 0))
-            graph[gate_id].append((neighbor_gate_id, distance_hu))
+    graph = get_graph()
+    origin, destination = _gate_indices(graph, origin_id, destination_id)
+    if not get_reachability(graph).reachable(origin, destination):
+        return []
+    return [_graph_route_result(graph, route) for route in k_shortest_paths(graph, origin, destination, k)]
 
 
-    # Using Dijkstra's algorithm
-    distances = {gate_id: float("inf") for gate_id in gates}
-    distances[origin_id] = 0
-    previous = {}
-    unvisited = set(gates.keys()) 
+def find_cheapest_routes(pairs: list[tuple[str, str]], workers: int | None = None) -> list[dict | None | ValueError]:
+    """
+    Batch version of find_cheapest_route.
 
-    while unvisited:
-        current_node = min(unvisited, key=lambda node: distances[node])
+    Pairs are grouped by origin and every destination of an origin is answered
+    from one shortest-path tree. With ``workers`` > 1 (default
+    ROUTE_POOL_WORKERS) the origins are searched in parallel on the route
+    process pool. Each item of the returned list is the route, None when no
+    route exists, or the ValueError find_cheapest_route would have raised for
+    that pair.
+    """
+    graph = get_graph()
+    table = get_route_table(graph)
+    reachability = get_reachability(graph)
 
-        if distances[current_node] == float("inf") or current_node == destination_id:
-            break
+    results = [None] * len(pairs)
+    by_origin = {}
+    for i, (origin_id, destination_id) in enumerate(pairs):
+        origin_id = origin_id.upper()
+        destination_id = destination_id.upper()
+        if origin_id == destination_id:
+            results[i] = route_result(origin_id, destination_id, [origin_id], 0)
+            continue
+        try:
+            origin, destination = _gate_indices(graph, origin_id, destination_id)
+        except ValueError as e:
+            results[i] = e
+            continue
+        if not reachability.reachable(origin, destination):
+            continue
+        by_origin.setdefault(origin, []).append((i, destination))
 
-        unvisited.remove(current_node)
+    if table is not None:
+        routes = []
+        for origin, destinations in by_origin.items():
+            tree = table.tree(origin)
+            routes.append([tree.route(destination) for _, destination in destinations])
+    else:
+        groups = [(origin, [destination for _, destination in destinations]) for origin, destinations in by_origin.items()]
+        routes = route_groups(graph, groups, settings.ROUTE_POOL_WORKERS if workers is None else workers)
 
-        for neighbor_id, hu in graph.get(current_node, []):
-            if neighbor_id  in unvisited:
-                new_distance = distances[current_node] + hu
-                if new_distance < distances[neighbor_id]:
-                    distances[neighbor_id] = new_distance
-                    previous[neighbor_id] = current_node
+    for destinations, group_routes in zip(by_origin.values(), routes):
+        for (i, _), route in zip(destinations, group_routes):
+            results[i] = _graph_route_result(graph, route)
 
-    if distances[destination_id] == float("inf"):   
-        return None
-    
-    path = []
-    target_node = destination_id
-    while target_node in previous:
-        path.append(target_node)
-        target_node = previous[target_node]
-    path.append(origin_id)
-    path.reverse()
-
-    total_hu = distances[destination_id]
+    return results
+
+
+def iter_routes_from(origin_id: str, include_path: bool = False):
+    """
+    Cheapest routes from one gate to every gate reachable from it.
+
+    Runs one full single-source search (or reads one route table row) and
+    returns a generator of route payloads in gate ID order, so callers can
+    stream the results. Without ``include_path`` the payloads omit "path".
+    Raises ValueError up front if the origin gate does not exist.
+    """
+    origin_id = origin_id.upper()
+    graph = get_graph()
+    origin = graph.index.get(origin_id)
+    if origin is None:
+        raise ValueError(f"Origin gate '{origin_id}' not found")
+
+    table = get_route_table(graph)
+    tree = table.tree(origin) if table is not None else dijkstra(graph, origin)
+
+    def routes():
+        for destination, total_hu in enumerate(tree.distances):
+            if destination == origin or total_hu == INF:
+                continue
+            if include_path:
+                yield _graph_route_result(graph, tree.route(destination))
+            else:
+                result = route_result(origin_id, graph.ids[destination], None, total_hu)
+                del result["path"]
+                yield result
+
+    return routes()
+
+
+def find_reachable_gates(origin_id: str) -> list[str]:
+    """
+    IDs of the gates a route from ``origin_id`` leads to, in gate ID order
+    (the origin itself excluded), from the reachability index rather than
+    a search. Raises ValueError if the origin gate does not exist.
+    """
+    origin_id = origin_id.upper()
+    graph = get_graph()
+    origin = graph.index.get(origin_id)
+    if origin is None:
+        raise ValueError(f"Origin gate '{origin_id}' not found")
+    return [graph.ids[gate] for gate in get_reachability(graph).reachable_from(origin) if gate != origin]
+
+
+def route_result(origin_id: str, destination_id: str, path: list[str], total_hu: int) -> dict:
+    """
+    Route payload in the shape of RouteSerializer.
+    """
     cost_per_passenger = total_hu * HYPERSPACE_COST_PER_PASSENGER_PER_HU * 2
 
     return {
@@ -77,4 +229,36 @@ def find_cheapest_route(origin_id: str, destination_id: str) -> dict | None:
         "path": path,
         "total_hu": total_hu,
         "cost_per_passenger_gbp": round(cost_per_passenger, 2),
-    }
\ No newline at end of file
+    }
+
+
+def _constrained_route(graph, origin: int, destination: int, constraints: RouteConstraints, stats: SearchStats):
+    index = graph.index
+    # Gates unknown to the graph have no connections to avoid
+    blocked_nodes = {index[gate_id] for gate_id in constraints.avoid_gates if gate_id in index}
+    blocked_edges = {
+        (index[source_id], index[target_id])
+        for source_id, target_id in constraints.avoid_connections
+        if source_id in index and target_id in index
+    }
+    return constrained_route(
+        graph, origin, destination, constraints.max_hops, constraints.max_leg_hu, blocked_nodes, blocked_edges, stats
+    )
+
+
+def _gate_indices(graph, origin_id: str, destination_id: str) -> tuple[int, int]:
+    origin = graph.index.get(origin_id)
+    destination = graph.index.get(destination_id)
+    if origin is None:
+        raise ValueError(f"Origin gate '{origin_id}' not found")
+    if destination is None:
+        raise ValueError(f"Destination gate '{destination_id}' not found")
+    return origin, destination
+
+
+def _graph_route_result(graph, route: tuple[list[int], int] | None) -> dict | None:
+    if route is None:
+        return None
+    path, total_hu = route
+    path = [graph.ids[node] for node in path]
+    return route_result(path[0], path[-1], path, total_hu)
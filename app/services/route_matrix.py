@@ -0,0 +1,108 @@
+import csv
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from app.constants import HYPERSPACE_COST_PER_PASSENGER_PER_HU
+from app.services.graph import GateGraph
+from app.services.route_pool import distance_rows
+from app.services.route_table import UNREACHABLE, get_route_table
+
+
+FORMATS = ("npy", "csv")
+CSV_HEADER = ["origin", "destination", "total_hu", "cost_per_passenger_gbp"]
+
+# Files of an npy export, in its output directory
+GATE_IDS_FILE = "gate_ids.txt"
+TOTAL_HU_FILE = "total_hu.npy"
+COST_FILE = "cost_per_passenger_gbp.npy"
+
+
+def format_for_path(path: str) -> str:
+    """
+    Output format by extension: csv for .csv files (and stdout), npy otherwise.
+    """
+    return "csv" if path == "-" or str(path).lower().endswith(".csv") else "npy"
+
+
+def route_matrix_rows(graph: GateGraph, workers: int = 0, block_size: int = 64) -> Iterator[np.ndarray]:
+    """
+    Yield the total HU from every gate to every gate, one origin row at a
+    time in gate ID order (UNREACHABLE where there is no route).
+
+    Rows come from the precomputed route table when one is loaded, and
+    otherwise from one full Dijkstra tree per origin, computed on the route
+    process pool with more than one worker. At most two blocks of
+    ``block_size`` rows are held at a time.
+    """
+    table = get_route_table(graph)
+    if table is not None:
+        yield from table.distances
+        return
+    yield from distance_rows(graph, list(range(len(graph))), workers, block_size)
+
+
+def costs(total_hu: np.ndarray) -> np.ndarray:
+    """
+    Round-trip cost per passenger for an array of HU totals, as route_result
+    computes it; NaN where there is no route.
+    """
+    # hu * 0.2 has a single decimal, so numpy's rounding agrees with round()
+    cost = np.round(total_hu * (HYPERSPACE_COST_PER_PASSENGER_PER_HU * 2), 2)
+    return np.where(total_hu == UNREACHABLE, np.nan, cost)
+
+
+def write_npy(graph: GateGraph, rows: Iterator[np.ndarray], directory: Path, progress=None) -> None:
+    """
+    Write the matrix as N x N .npy files (int64 HU, float64 cost) plus the
+    gate IDs of the rows and columns, one per line.
+
+    The .npy files are written through memory maps, so rows go to disk as
+    they arrive. ``progress(done)`` is called after every row.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / GATE_IDS_FILE).write_text("".join(f"{gate_id}\n" for gate_id in graph.ids), encoding="utf-8")
+
+    n = len(graph)
+    total_hu = np.lib.format.open_memmap(directory / TOTAL_HU_FILE, mode="w+", dtype=np.int64, shape=(n, n))
+    cost = np.lib.format.open_memmap(directory / COST_FILE, mode="w+", dtype=np.float64, shape=(n, n))
+    try:
+        for origin, row in enumerate(rows):
+            total_hu[origin] = row
+            cost[origin] = costs(row)
+            if progress is not None:
+                progress(origin + 1)
+        total_hu.flush()
+        cost.flush()
+    finally:
+        del total_hu, cost
+
+
+def write_csv(graph: GateGraph, rows: Iterator[np.ndarray], out, progress=None, include_unreachable: bool = False) -> None:
+    """
+    Write the matrix as CSV_HEADER rows, one per origin/destination pair in
+    gate ID order. Pairs without a route are skipped, or written with empty
+    total_hu and cost with ``include_unreachable``.
+    """
+    writer = csv.writer(out)
+    writer.writerow(CSV_HEADER)
+    ids = graph.ids
+    for origin, row in enumerate(rows):
+        origin_id = ids[origin]
+        row_costs = costs(row).tolist()
+        for destination, (hu, cost) in enumerate(zip(row.tolist(), row_costs)):
+            if hu != UNREACHABLE:
+                writer.writerow((origin_id, ids[destination], hu, cost))
+            elif include_unreachable:
+                writer.writerow((origin_id, ids[destination], "", ""))
+        if progress is not None:
+            progress(origin + 1)
+
+
+def load_npy(directory: Path) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """
+    (gate IDs, HU matrix, cost matrix) of an npy export, the matrices memory-mapped.
+    """
+    ids = (directory / GATE_IDS_FILE).read_text(encoding="utf-8").split()
+    return ids, np.load(directory / TOTAL_HU_FILE, mmap_mode="r"), np.load(directory / COST_FILE, mmap_mode="r")
@@ -0,0 +1,248 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# app.services.graph and app.services.engine are imported where used:
+# spawned workers have to set Django up before importing models.
+
+
+logger = logging.getLogger(__name__)
+
+
+# In a pool worker: the graph routes are searched on. In the parent: the
+# graph forked workers inherit, only while a pool starts its workers.
+_graph = None
+
+_pool: "RoutePool | None" = None
+_pool_lock = threading.Lock()
+
+
+class RoutePool:
+    """
+    Process pool for batches of single-source route searches.
+
+    Searches are pure Python, so one process can only use one core. Each
+    worker holds the compiled graph for the pool's lifetime and tasks only
+    carry gate indices, never the graph:
+
+    - with the "fork" start method (the default on Linux) workers inherit
+      the parent's graph, pages shared copy-on-write;
+    - otherwise workers map the graph's snapshot file, or unpickle its CSR
+      arrays once at start-up if it has none.
+    """
+
+    def __init__(self, graph, workers: int, mp_context=None):
+        global _graph
+
+        self.graph = graph
+        self.workers = workers
+        # Requests mapping over the pool, and whether it has been replaced;
+        # guarded by _pool_lock. A replaced pool shuts down with its last user.
+        self.users = 0
+        self.retired = False
+        context = mp_context or multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        if context.get_start_method() == "fork":
+            _graph = graph
+            initargs = (None, None)
+        elif graph.snapshot is not None:
+            initargs = (str(graph.snapshot.path), None)
+        else:
+            initargs = (None, (graph.ids, graph.offsets, graph.targets, graph.weights, graph.version))
+
+        self.executor = ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=initargs)
+        try:
+            # Start the workers now, while _graph is this pool's graph
+            started = all(self.executor.map(_has_graph, range(workers)))
+        finally:
+            # Forked workers are all started on the first task and never
+            # replaced; the parent must not keep the graph alive for them.
+            _graph = None
+        if not started:
+            self.shutdown()
+            raise RuntimeError("Route pool workers started without a graph")
+
+    def route_groups(self, groups: list[tuple[int, list[int]]]) -> list[list]:
+        """
+        Like ``route_groups`` below, with the groups sharded over the workers.
+        """
+        shard_count = min(len(groups), 4 * self.workers)
+        shards = [groups[i::shard_count] for i in range(shard_count)]
+        results = [None] * len(groups)
+        for i, shard_results in enumerate(self.executor.map(_route_shard, shards)):
+            results[i::shard_count] = shard_results
+        return results
+
+    def distance_rows(self, origins: list[int], block_size: int):
+        """
+        Like ``distance_rows`` below, ``block_size`` origins at a time split
+        over the workers. The next block is computed while the caller
+        consumes the current one; no more are queued, to bound memory.
+        """
+        pending = deque()
+        for start in range(0, len(origins), block_size):
+            block = origins[start:start + block_size]
+            shard_size = -(-len(block) // self.workers)
+            pending.append([
+                self.executor.submit(_distance_shard, block[i:i + shard_size])
+                for i in range(0, len(block), shard_size)
+            ])
+            if len(pending) > 1:
+                yield from _shard_rows(pending.popleft())
+        while pending:
+            yield from _shard_rows(pending.popleft())
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def route_groups(graph, groups: list[tuple[int, list[int]]], workers: int = 0) -> list[list]:
+    """
+    Cheapest routes for (origin, destinations) groups of gate indices.
+
+    Returns one list per group with a (path, total_hu) route or None per
+    destination. With more than one worker, and at least
+    ROUTE_POOL_MIN_ORIGINS groups to make the hand-off worth it, the groups
+    are searched in parallel by the process pool.
+    """
+    if workers > 1 and len(groups) >= settings.ROUTE_POOL_MIN_ORIGINS:
+        with get_route_pool(graph, workers) as pool:
+            try:
+                return pool.route_groups(groups)
+            except (BrokenProcessPool, CancelledError):
+                logger.warning("Route pool failed, searching in-process", exc_info=True)
+                _discard_pool(pool)
+    return [_route_group(graph, origin, destinations) for origin, destinations in groups]
+
+
+def distance_rows(graph, origins: list[int], workers: int = 0, block_size: int = 64):
+    """
+    Yield the HU from each origin to every gate, as an int64 array with
+    UNREACHABLE (-1) where there is no route, in origin order.
+
+    With more than one worker the rows are computed on the process pool
+    (see ``RoutePool.distance_rows``).
+    """
+    done = 0
+    if workers > 1 and len(origins) > 1:
+        with get_route_pool(graph, workers) as pool:
+            try:
+                for row in pool.distance_rows(origins, block_size):
+                    yield row
+                    done += 1
+                return
+            except (BrokenProcessPool, CancelledError):
+                logger.warning("Route pool failed, computing the remaining rows in-process", exc_info=True)
+                _discard_pool(pool)
+    for origin in origins[done:]:
+        yield _distance_row(graph, origin)
+
+
+@contextmanager
+def get_route_pool(graph, workers: int):
+    """
+    Use the process-wide pool for ``graph``, restarted when the graph changes.
+
+    The pool a new graph replaces is shut down once the requests still
+    using it are done, not under them.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None or _pool.graph is not graph or _pool.workers != workers:
+            if _pool is not None:
+                _retire(_pool)
+            _pool = RoutePool(graph, workers)
+        pool = _pool
+        pool.users += 1
+    try:
+        yield pool
+    finally:
+        with _pool_lock:
+            pool.users -= 1
+            if pool.retired and not pool.users:
+                pool.shutdown()
+
+
+def shutdown_route_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _retire(_pool)
+            _pool = None
+
+
+def _retire(pool: RoutePool) -> None:
+    # Called with _pool_lock held
+    pool.retired = True
+    if not pool.users:
+        pool.shutdown()
+
+
+def _discard_pool(pool: RoutePool) -> None:
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown()
+
+
+def _route_group(graph, origin: int, destinations: list[int]) -> list:
+    from app.services.engine import dijkstra
+
+    # One destination: stop once it is settled. Several: one full tree.
+    tree = dijkstra(graph, origin, destinations[0] if len(destinations) == 1 else -1)
+    return [tree.route(destination) for destination in destinations]
+
+
+def _distance_row(graph, origin: int):
+    import numpy as np
+    from app.services.engine import dijkstra
+    from app.services.route_table import UNREACHABLE
+
+    row = np.array(dijkstra(graph, origin).distances)
+    row[np.isinf(row)] = UNREACHABLE
+    return row.astype(np.int64)
+
+
+def _shard_rows(futures):
+    for future in futures:
+        yield from future.result()
+
+
+def _init_worker(snapshot_path, csr) -> None:
+    global _graph
+
+    if snapshot_path is None and csr is None:
+        return
+
+    import django
+    django.setup()
+    from app.services.graph import GateGraph
+
+    _graph = GateGraph.from_snapshot(snapshot_path) if snapshot_path else GateGraph(*csr)
+
+
+def _has_graph(_) -> bool:
+    return _graph is not None
+
+
+def _route_shard(groups: list[tuple[int, list[int]]]) -> list[list]:
+    return [_route_group(_graph, origin, destinations) for origin, destinations in groups]
+
+
+def _distance_shard(origins: list[int]) -> list:
+    return [_distance_row(_graph, origin) for origin in origins]
+
+
+atexit.register(shutdown_route_pool)
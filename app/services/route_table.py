@@ -0,0 +1,259 @@
+import logging
+import os
+from heapq import heappop, heappush
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from app.services.engine import INF, ShortestPathTree, dijkstra
+from app.services.graph import GateGraph
+
+
+logger = logging.getLogger(__name__)
+
+UNREACHABLE = -1
+
+# int64 distance + int32 predecessor per (origin, destination) pair
+BYTES_PER_PAIR = 12
+
+
+class RouteTable:
+    """
+    Precomputed all-pairs routes for a compiled graph.
+
+    ``distances[s, t]`` holds the total HU from gate index ``s`` to ``t``
+    (``UNREACHABLE`` if there is no route) and ``previous[s, t]`` the gate
+    before ``t`` on that route. The matrices are filled from one full Dijkstra
+    tree per origin, so reconstructed paths are exactly the ones
+    ``find_cheapest_route`` would return, ties included.
+    """
+
+    def __init__(self, distances: np.ndarray, previous: np.ndarray, fingerprint: str):
+        self.distances = distances
+        self.previous = previous
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, graph: GateGraph) -> "RouteTable":
+        n = len(graph)
+        distances = np.full((n, n), UNREACHABLE, dtype=np.int64)
+        previous = np.full((n, n), -1, dtype=np.int32)
+
+        for source in range(n):
+            tree = dijkstra(graph, source)
+            distances[source] = [UNREACHABLE if d == INF else d for d in tree.distances]
+            previous[source] = tree.previous
+
+        return cls(distances, previous, graph.fingerprint)
+
+    def reweighted(self, graph: GateGraph, edge: int, old_hu: int) -> "RouteTable":
+        """
+        The table for ``graph``, in which ``edge`` weighed ``old_hu`` before.
+
+        Only the origins whose routes the change can affect are updated, in
+        the style of Ramalingam and Reps' dynamic shortest paths: when the
+        edge gets more expensive, the origins routing over it recompute the
+        subtree hanging below it; when it gets cheaper, the origins it now
+        shortens propagate the improvement outwards from its target.
+        Predecessors follow ``dijkstra``'s tie-breaking, so the result
+        equals a fresh ``build``. The matrices are copied before any update,
+        as the table of the previous graph may still be serving requests.
+        """
+        source = graph.edge_source(edge)
+        target = graph.targets[edge]
+        # Parallel connections: only the cheapest one carries routes
+        others = [
+            graph.weights[e] for e in range(graph.offsets[source], graph.offsets[source + 1])
+            if graph.targets[e] == target and e != edge
+        ]
+        old_hu = min(others + [old_hu])
+        hu = min(others + [graph.weights[edge]])
+        if hu == old_hu:
+            return RouteTable(self.distances, self.previous, graph.fingerprint)
+
+        if hu > old_hu:
+            rows = np.flatnonzero(self.previous[:, target] == source)
+        else:
+            to_source = self.distances[:, source]
+            rows = np.flatnonzero((to_source != UNREACHABLE) & (to_source + hu <= self.distances[:, target]))
+
+        table = RouteTable(self.distances.copy(), self.previous.copy(), graph.fingerprint)
+        for row in rows.tolist():
+            if not graph.positive_weights:
+                # Zero-HU ties do not settle in distance order; search again
+                tree = dijkstra(graph, row)
+                table.distances[row] = [UNREACHABLE if d == INF else d for d in tree.distances]
+                table.previous[row] = tree.previous
+            elif hu > old_hu:
+                table._raise_edge(graph, row, target)
+            else:
+                table._lower_edge(graph, row, source, target, hu)
+        return table
+
+    def _raise_edge(self, graph: GateGraph, origin: int, target: int) -> None:
+        """
+        Recompute the routes of ``origin`` through the subtree below ``target``.
+        """
+        distances = self.distances[origin]
+        previous = self.previous[origin]
+        reverse = graph.reversed()
+
+        # Gates whose current route passes through target
+        order = np.argsort(previous, kind="stable")
+        parents = previous[order]
+        subtree = {target}
+        stack = [target]
+        while stack:
+            node = stack.pop()
+            lo, hi = np.searchsorted(parents, [node, node + 1])
+            for child in order[lo:hi].tolist():
+                subtree.add(child)
+                stack.append(child)
+
+        # Best entry into each subtree gate from the unchanged rest of the tree
+        heap = []
+        for node in subtree:
+            best = INF
+            for r in range(reverse.offsets[node], reverse.offsets[node + 1]):
+                gate = reverse.targets[r]
+                if gate not in subtree and distances[gate] != UNREACHABLE:
+                    best = min(best, int(distances[gate]) + reverse.weights[r])
+            distances[node] = UNREACHABLE
+            if best != INF:
+                heappush(heap, (best, node))
+
+        while heap:
+            distance, node = heappop(heap)
+            if distances[node] != UNREACHABLE:
+                continue
+            distances[node] = distance
+            for e in range(graph.offsets[node], graph.offsets[node + 1]):
+                neighbor = graph.targets[e]
+                if neighbor in subtree and distances[neighbor] == UNREACHABLE:
+                    heappush(heap, (distance + graph.weights[e], neighbor))
+
+        for node in subtree:
+            previous[node] = _first_predecessor(reverse, distances, node)
+
+    def _lower_edge(self, graph: GateGraph, origin: int, source: int, target: int, hu: int) -> None:
+        """
+        Propagate the cheaper edge source -> target through the routes of ``origin``.
+        """
+        distances = self.distances[origin]
+        previous = self.previous[origin]
+
+        improved = []
+        distance = int(distances[source]) + hu
+        if distance < distances[target]:
+            distances[target] = distance
+            heap = [(distance, target)]
+            while heap:
+                distance, node = heappop(heap)
+                if distance > distances[node]:
+                    continue
+                improved.append(node)
+                for e in range(graph.offsets[node], graph.offsets[node + 1]):
+                    neighbor = graph.targets[e]
+                    if distance + graph.weights[e] < distances[neighbor]:
+                        distances[neighbor] = distance + graph.weights[e]
+                        heappush(heap, (distance + graph.weights[e], neighbor))
+
+        # The gates whose best predecessor may have changed
+        changed = {target}
+        for node in improved:
+            changed.update(graph.targets[e] for e in range(graph.offsets[node], graph.offsets[node + 1]))
+        changed.discard(origin)
+        reverse = graph.reversed()
+        for node in changed:
+            previous[node] = _first_predecessor(reverse, distances, node)
+
+    def route(self, origin: int, destination: int) -> tuple[list[int], int] | None:
+        """
+        Path (as gate indices) and total HU, or None if unreachable.
+        """
+        total_hu = int(self.distances[origin, destination])
+        if total_hu == UNREACHABLE:
+            return None
+
+        previous = self.previous[origin]
+        path = [destination]
+        while path[-1] != origin:
+            path.append(int(previous[path[-1]]))
+        path.reverse()
+        return path, total_hu
+
+    def tree(self, origin: int) -> ShortestPathTree:
+        """
+        The stored shortest-path tree of one origin.
+        """
+        distances = [INF if d == UNREACHABLE else d for d in self.distances[origin].tolist()]
+        return ShortestPathTree(origin, distances, self.previous[origin].tolist())
+
+    def save(self, path: Path) -> None:
+        """
+        Write the table atomically, so readers never see a partial file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, distances=self.distances, previous=self.previous, fingerprint=np.array(self.fingerprint))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "RouteTable":
+        with np.load(path) as data:
+            return cls(data["distances"], data["previous"], str(data["fingerprint"]))
+
+
+def _first_predecessor(reverse: GateGraph, distances: np.ndarray, node: int) -> int:
+    """
+    The predecessor ``dijkstra`` gives ``node``: of the gates with a shortest
+    route continuing to it, the first one settled, i.e. the nearest, lowest
+    index first. Only holds for positive weights.
+    """
+    distance = distances[node]
+    best, best_distance = -1, INF
+    for r in range(reverse.offsets[node], reverse.offsets[node + 1]):
+        gate = reverse.targets[r]
+        gate_distance = distances[gate]
+        if gate_distance != UNREACHABLE and gate_distance + reverse.weights[r] == distance:
+            if gate_distance < best_distance or (gate_distance == best_distance and gate < best):
+                best, best_distance = gate, gate_distance
+    return best
+
+
+def table_size_bytes(gate_count: int) -> int:
+    return gate_count * gate_count * BYTES_PER_PAIR
+
+
+def get_route_table(graph: GateGraph) -> RouteTable | None:
+    """
+    Route table for the given graph, or None to search on demand.
+
+    Returns None when the table is disabled or would exceed
+    ROUTE_TABLE_MAX_BYTES. Otherwise the table written by
+    ``manage.py build_route_table`` is used if it matches the graph, and a
+    fresh one is built in-process if not.
+    """
+    if not settings.ROUTE_TABLE_ENABLED:
+        return None
+    if table_size_bytes(len(graph)) > settings.ROUTE_TABLE_MAX_BYTES:
+        return None
+    return graph.memo("route_table", lambda: _load_or_build(graph))
+
+
+def _load_or_build(graph: GateGraph) -> RouteTable:
+    path = Path(settings.ROUTE_TABLE_PATH)
+    if path.exists():
+        try:
+            table = RouteTable.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not read route table %s: %s", path, e)
+        else:
+            if table.fingerprint == graph.fingerprint:
+                return table
+            logger.info("Route table %s is stale, rebuilding in-process", path)
+
+    return RouteTable.build(graph)
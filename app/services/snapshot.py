@@ -0,0 +1,95 @@
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+
+
+MAGIC = b"GATEGRPH"
+FORMAT_VERSION = 1
+
+# magic, format version, flags, gate count, edge count, ID table bytes, graph version
+HEADER = struct.Struct("<8sIIqqq32s")
+
+
+class Snapshot:
+    """
+    Read-only view of a graph snapshot file.
+
+    Layout (little-endian, every section 8-byte aligned):
+
+        header     HEADER
+        offsets    int64[gate_count + 1]
+        weights    int64[edge_count]
+        targets    int32[edge_count]
+        ids        UTF-8 gate IDs joined by newlines
+
+    The numeric sections are memoryviews over a shared read-only mmap, so
+    every process that opens the same file shares the same physical pages.
+    The ID table is decoded per process.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if stat.st_size < HEADER.size:
+                raise ValueError(f"{self.path} is not a graph snapshot")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, _, gate_count, edge_count, ids_size, version = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} graph snapshot")
+
+        sections = _section_bounds(gate_count, edge_count, ids_size)
+        if sections["ids"][1] != stat.st_size:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+
+        view = memoryview(self._mmap)
+        self.offsets = view[slice(*sections["offsets"])].cast("q")
+        self.weights = view[slice(*sections["weights"])].cast("q")
+        self.targets = view[slice(*sections["targets"])].cast("i")
+        ids = bytes(view[slice(*sections["ids"])]).decode()
+        self.ids = ids.split("\n") if gate_count else []
+        self.version = version.rstrip(b"\0").decode()
+
+
+def write_snapshot(path: Path, ids, offsets: array, targets: array, weights: array, version: str) -> None:
+    """
+    Write a snapshot atomically: readers see the old file or the new one, never a mix.
+
+    Processes that already mapped the old file keep using it until they
+    reopen the path.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ids_blob = "\n".join(ids).encode()
+    sections = _section_bounds(len(ids), len(targets), len(ids_blob))
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(ids), len(targets), len(ids_blob), version.encode()))
+        for name, buffer in (("offsets", offsets), ("weights", weights), ("targets", targets)):
+            f.seek(sections[name][0])
+            f.write(memoryview(buffer).cast("B"))
+        f.seek(sections["ids"][0])
+        f.write(ids_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _section_bounds(gate_count: int, edge_count: int, ids_size: int) -> dict:
+    bounds = {}
+    position = HEADER.size
+    for name, size in (
+        ("offsets", 8 * (gate_count + 1)),
+        ("weights", 8 * edge_count),
+        ("targets", 4 * edge_count),
+        ("ids", ids_size),
+    ):
+        position += -position % 8
+        bounds[name] = (position, position + size)
+        position += size
+    return bounds
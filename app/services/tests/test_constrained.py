@@ -0,0 +1,137 @@
+import random
+
+from django.test import SimpleTestCase, TestCase
+from app.models import Gate, GateConnection
+from app.services.constrained import RouteConstraints, constrained_route
+from app.services.engine import INF, SearchStats, dijkstra
+from app.services.graph import GateGraph
+from app.services.route_finder import find_cheapest_route
+
+
+def cheapest_within_hops(graph, source, target, max_hops, usable):
+    """Cheapest cost over at most ``max_hops`` usable connections (Bellman-Ford by hop count), as a reference."""
+    costs = {source: 0}
+    best = 0 if source == target else INF
+    for _ in range(max_hops):
+        next_costs = dict(costs)
+        for node, cost in costs.items():
+            for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+                neighbor, hu = graph.targets[edge], graph.weights[edge]
+                if usable(node, neighbor, hu) and cost + hu < next_costs.get(neighbor, INF):
+                    next_costs[neighbor] = cost + hu
+        costs = next_costs
+        best = min(best, costs.get(target, INF))
+    return best
+
+
+class ConstrainedRouteTest(SimpleTestCase):
+    def assert_valid_route(self, graph, route, max_hops, usable):
+        path, total_hu = route
+        self.assertLessEqual(len(path) - 1, max_hops)
+        self.assertEqual(len(set(path)), len(path))
+        cost = 0
+        for node, next_node in zip(path, path[1:]):
+            hu = min(
+                (graph.weights[edge] for edge in range(graph.offsets[node], graph.offsets[node + 1])
+                 if graph.targets[edge] == next_node and usable(node, next_node, graph.weights[edge])),
+                default=None,
+            )
+            self.assertIsNotNone(hu)
+            cost += hu
+        self.assertEqual(cost, total_hu)
+
+    def test_matches_reference(self):
+        for seed in range(30):
+            rng = random.Random(seed)
+            ids = [f"G{i}" for i in range(9)]
+            graph = GateGraph.from_rows([
+                (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(0, 6))} for _ in range(rng.randint(0, 4))])
+                for gate_id in ids
+            ])
+            blocked_nodes = set(rng.sample(range(len(graph)), rng.randint(0, 2)))
+            blocked_edges = {(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(rng.randint(0, 3))}
+            max_leg_hu = rng.choice([None, 3, 5])
+            max_hops = rng.choice([1, 2, 3, 4])
+
+            def usable(node, neighbor, hu):
+                return (
+                    (max_leg_hu is None or hu <= max_leg_hu) and neighbor not in blocked_nodes
+                    and (node, neighbor) not in blocked_edges
+                )
+
+            for source in range(len(graph)):
+                for target in range(len(graph)):
+                    if source == target or source in blocked_nodes or target in blocked_nodes:
+                        continue
+                    with self.subTest(seed=seed, source=source, target=target):
+                        expected = cheapest_within_hops(graph, source, target, max_hops, usable)
+                        route, _ = constrained_route(
+                            graph, source, target, max_hops, max_leg_hu, blocked_nodes, blocked_edges
+                        )
+                        self.assertEqual(route[1] if route else INF, expected)
+                        if route:
+                            self.assert_valid_route(graph, route, max_hops, usable)
+
+                        # No hop limit: Dijkstra over the usable connections
+                        route, _ = constrained_route(graph, source, target, None, max_leg_hu, blocked_nodes, blocked_edges)
+                        expected = cheapest_within_hops(graph, source, target, len(graph), usable)
+                        self.assertEqual(route[1] if route else INF, expected)
+
+    def test_no_constraints_matches_dijkstra(self):
+        rng = random.Random(1)
+        ids = [f"G{i}" for i in range(20)]
+        graph = GateGraph.from_rows([
+            (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(1, 9))} for _ in range(3)]) for gate_id in ids
+        ])
+        for target in range(1, len(graph)):
+            expected = dijkstra(graph, 0, target).route(target)
+            route, _ = constrained_route(graph, 0, target)
+            self.assertEqual(route[1] if route else None, expected[1] if expected else None)
+
+    def test_hop_limit_prunes_labels(self):
+        # A long cheap chain and a direct expensive connection
+        rows = [(f"C{i:02}", [{"id": f"C{i + 1:02}", "hu": "1"}]) for i in range(10)] + [("C10", [])]
+        rows[0][1].append({"id": "C10", "hu": "50"})
+        graph = GateGraph.from_rows(rows)
+        stats = SearchStats()
+        route, settled = constrained_route(graph, 0, 10, max_hops=3, stats=stats)
+        self.assertEqual(route, ([0, 10], 50))
+        # The chain cannot reach C10 within three hops, so only C00 and C10 settle
+        self.assertEqual(settled, 2)
+        self.assertEqual(constrained_route(graph, 0, 10, max_hops=10)[0][1], 10)
+
+
+class ConstrainedFindCheapestRouteTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            GateConnection.objects.create(source_id="SOL", target_id="ALC", hu=20)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=5)
+            Gate.objects.create(id="ALC", name="Alpha Centauri")
+            GateConnection.objects.create(source_id="ALC", target_id="PRX", hu=20)
+            Gate.objects.create(id="SIR", name="Sirius")
+
+    def route(self, **constraints):
+        stats = SearchStats()
+        result = find_cheapest_route("SOL", "SIR", stats=stats, constraints=RouteConstraints(**constraints))
+        return result and result["path"], stats.strategy
+
+    def test_unconstrained(self):
+        self.assertEqual(self.route(), (["SOL", "ALC", "PRX", "SIR"], "dijkstra"))
+
+    def test_max_hops(self):
+        self.assertEqual(self.route(max_hops=2), (["SOL", "PRX", "SIR"], "constrained"))
+        self.assertEqual(self.route(max_hops=1)[0], ["SOL", "SIR"])
+
+    def test_max_leg_hu(self):
+        self.assertEqual(self.route(max_leg_hu=90)[0], ["SOL", "ALC", "PRX", "SIR"])
+        self.assertIsNone(self.route(max_leg_hu=4)[0])
+
+    def test_avoid(self):
+        self.assertEqual(self.route(avoid_gates=frozenset({"ALC"}))[0], ["SOL", "PRX", "SIR"])
+        self.assertEqual(self.route(avoid_gates=frozenset({"PRX", "XYZ"}))[0], ["SOL", "SIR"])
+        self.assertEqual(self.route(avoid_connections=frozenset({("PRX", "SIR")}))[0], ["SOL", "SIR"])
+        self.assertIsNone(self.route(avoid_gates=frozenset({"SIR"}))[0])
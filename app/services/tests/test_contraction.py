@@ -0,0 +1,166 @@
+import random
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from app.models import Gate, GateConnection
+from app.services import contraction
+from app.services.contraction import ContractionHierarchy, get_contraction_hierarchy
+from app.services.engine import SearchStats, dijkstra
+from app.services.graph import GateGraph, get_graph
+from app.services.route_finder import find_cheapest_route
+
+
+def random_rows(n, degree, seed, max_hu):
+    rng = random.Random(seed)
+    ids = [f"G{i:02d}" for i in range(n)]
+    return [
+        (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(0, max_hu))} for _ in range(rng.randint(0, degree))])
+        for gate_id in ids
+    ]
+
+
+class ContractionHierarchyTest(SimpleTestCase):
+    def assert_cheapest_routes(self, graph, hierarchy, same_paths=False):
+        for origin in range(len(graph)):
+            tree = dijkstra(graph, origin)
+            for destination in range(len(graph)):
+                route, _ = hierarchy.route(origin, destination)
+                expected = tree.route(destination)
+                if expected is None:
+                    self.assertIsNone(route)
+                    continue
+                path, total_hu = route
+                self.assertEqual(total_hu, expected[1])
+                self.assertEqual((path[0], path[-1]), (origin, destination))
+                hu = sum(
+                    min(w for gate_id, w in graph.neighbors(graph.ids[a]) if gate_id == graph.ids[b])
+                    for a, b in zip(path, path[1:])
+                )
+                self.assertEqual(hu, total_hu)
+                if same_paths:
+                    self.assertEqual(path, expected[0])
+
+    def test_cheapest_routes_with_ties_and_zero_hu(self):
+        for seed in range(4):
+            graph = GateGraph.from_rows(random_rows(30, 4, seed, max_hu=3))
+            self.assert_cheapest_routes(graph, ContractionHierarchy.build(graph))
+
+    def test_unique_routes_match_dijkstra(self):
+        for seed in range(4):
+            graph = GateGraph.from_rows(random_rows(30, 4, seed, max_hu=10**9))
+            self.assert_cheapest_routes(graph, ContractionHierarchy.build(graph), same_paths=True)
+
+    def test_core(self):
+        graph = GateGraph.from_rows(random_rows(30, 4, 5, max_hu=10))
+        with mock.patch.object(contraction, "MAX_CONTRACTION_PAIRS", 2):
+            hierarchy = ContractionHierarchy.build(graph)
+        self.assertGreater(hierarchy.core_size, 0)
+        self.assert_cheapest_routes(graph, hierarchy)
+        self.assert_cheapest_routes(graph, hierarchy.rebuild(graph))
+
+    def test_rebuild_reuses_order_after_hu_change(self):
+        rows = random_rows(30, 4, 6, max_hu=10)
+        hierarchy = ContractionHierarchy.build(GateGraph.from_rows(rows))
+        for _, connections in rows[:5]:
+            for connection in connections:
+                connection["hu"] = "7"
+        changed = GateGraph.from_rows(rows)
+
+        rebuilt = hierarchy.rebuild(changed)
+        self.assertEqual(rebuilt.order, hierarchy.order)
+        self.assertEqual(rebuilt.fingerprint, changed.fingerprint)
+        self.assert_cheapest_routes(changed, rebuilt)
+
+    def test_save_and_load(self):
+        graph = GateGraph.from_rows(random_rows(20, 3, 8, max_hu=10))
+        hierarchy = ContractionHierarchy.build(graph)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "ch.npz"
+            hierarchy.save(path)
+            loaded = ContractionHierarchy.load(path)
+        self.assertEqual(loaded.order, hierarchy.order)
+        self.assertEqual((loaded.fingerprint, loaded.ids_digest), (hierarchy.fingerprint, hierarchy.ids_digest))
+        self.assert_cheapest_routes(graph, loaded)
+
+
+class ContractionHierarchyServiceTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=5)
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+            Gate.objects.create(id="SIR", name="Sirius")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "contraction_hierarchy.npz"
+
+    def test_find_cheapest_route(self):
+        with override_settings(ROUTE_CH_PATH=self.path):
+            stats = SearchStats()
+            find_cheapest_route("SOL", "SIR", "ch", stats)
+            self.assertEqual(stats.strategy, "bidirectional")
+
+            call_command("build_contraction_hierarchy", stdout=StringIO())
+            result = find_cheapest_route("sol", "sir", "ch", stats)
+            self.assertEqual(result, find_cheapest_route("SOL", "SIR", "dijkstra"))
+            self.assertEqual(stats.strategy, "ch")
+            self.assertIsNone(find_cheapest_route("SIR", "SOL", "ch"))
+
+    def test_build_command_and_incremental_rebuild(self):
+        with override_settings(ROUTE_CH_PATH=self.path):
+            call_command("build_contraction_hierarchy", stdout=StringIO())
+            order = ContractionHierarchy.load(self.path).order
+
+            connection = GateConnection.objects.get(source_id="PRX", target_id="SIR")
+            connection.hu = 50
+            with self.captureOnCommitCallbacks(execute=True):
+                connection.save()
+            stale = ContractionHierarchy.load(self.path)
+            self.assertNotEqual(stale.fingerprint, get_graph().fingerprint)
+
+            out = StringIO()
+            call_command("build_contraction_hierarchy", stdout=out)
+            self.assertIn("re-contracted", out.getvalue())
+            rebuilt = ContractionHierarchy.load(self.path)
+            self.assertEqual(rebuilt.order, order)
+            self.assertEqual(rebuilt.fingerprint, get_graph().fingerprint)
+            self.assertEqual(find_cheapest_route("SOL", "SIR", "ch")["total_hu"], 100)
+
+    def test_recontraction_keeps_core_size(self):
+        with override_settings(ROUTE_CH_PATH=self.path):
+            graph = get_graph()
+            ContractionHierarchy.build(graph, ContractionHierarchy.build(graph).order, core_size=2).save(self.path)
+
+            connection = GateConnection.objects.get(source_id="PRX", target_id="SIR")
+            connection.hu = 50
+            with self.captureOnCommitCallbacks(execute=True):
+                connection.save()
+            out = StringIO()
+            call_command("build_contraction_hierarchy", stdout=out)
+            self.assertIn("re-contracted", out.getvalue())
+            rebuilt = ContractionHierarchy.load(self.path)
+            self.assertEqual(rebuilt.core_size, 2)
+            self.assertEqual(find_cheapest_route("SOL", "SIR", "ch")["total_hu"], 100)
+
+    def test_stale_file_not_rebuilt_in_process(self):
+        with override_settings(ROUTE_CH_PATH=self.path):
+            ContractionHierarchy.build(get_graph()).save(self.path)
+            connection = GateConnection.objects.get(source_id="SOL", target_id="SIR")
+            connection.hu = 1
+            with self.captureOnCommitCallbacks(execute=True):
+                connection.save()
+            with mock.patch.object(ContractionHierarchy, "build", side_effect=AssertionError("contracted in-process")):
+                self.assertIsNone(get_contraction_hierarchy(get_graph()))
+                stats = SearchStats()
+                self.assertEqual(find_cheapest_route("SOL", "SIR", "ch", stats)["path"], ["SOL", "SIR"])
+                self.assertEqual(stats.strategy, "bidirectional")
+
+            call_command("build_contraction_hierarchy", stdout=StringIO())
+            self.assertEqual(get_contraction_hierarchy(get_graph()).fingerprint, get_graph().fingerprint)
@@ -0,0 +1,185 @@
+import random
+
+from django.test import SimpleTestCase
+from app.services.engine import INF, astar, bidirectional_dijkstra, dijkstra
+from app.services.graph import GateGraph
+from app.services.landmarks import Landmarks
+
+
+def min_scan_dijkstra(rows, origin_id, destination_id):
+    """The original O(V^2) search, kept as a reference implementation."""
+    graph = {gate_id: [(c["id"], int(c["hu"])) for c in conns] for gate_id, conns in rows}
+    distances = {gate_id: float("inf") for gate_id in graph}
+    distances[origin_id] = 0
+    previous = {}
+    unvisited = set(graph)
+    while unvisited:
+        current = min(unvisited, key=lambda node: distances[node])
+        if distances[current] == float("inf") or current == destination_id:
+            break
+        unvisited.remove(current)
+        for neighbor, hu in graph[current]:
+            if neighbor in unvisited and distances[current] + hu < distances[neighbor]:
+                distances[neighbor] = distances[current] + hu
+                previous[neighbor] = current
+    if distances[destination_id] == float("inf"):
+        return None, None
+    path = [destination_id]
+    while path[-1] in previous:
+        path.append(previous[path[-1]])
+    return list(reversed(path)), distances[destination_id]
+
+
+def random_rows(n, degree, seed):
+    rng = random.Random(seed)
+    ids = [f"G{i:02d}" for i in range(n)]
+    # Wide weight range so shortest paths are unique and comparable
+    return [
+        (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(1, 10**9))} for _ in range(degree)])
+        for gate_id in ids
+    ]
+
+
+class DijkstraEngineTest(SimpleTestCase):
+    def test_matches_min_scan_reference(self):
+        for seed in range(3):
+            rows = random_rows(30, 2, seed)
+            graph = GateGraph.from_rows(rows)
+            for origin_id, _ in rows:
+                for destination_id, _ in rows:
+                    if origin_id == destination_id:
+                        continue
+                    expected_path, expected_hu = min_scan_dijkstra(rows, origin_id, destination_id)
+                    tree = dijkstra(graph, graph.index[origin_id], graph.index[destination_id])
+                    path = tree.path_to(graph.index[destination_id])
+                    if expected_path is None:
+                        self.assertIsNone(path)
+                    else:
+                        self.assertEqual([graph.ids[i] for i in path], expected_path)
+                        self.assertEqual(tree.distance_to(graph.index[destination_id]), expected_hu)
+
+    def test_full_tree(self):
+        graph = GateGraph.from_rows([
+            ("A", [{"id": "B", "hu": "1"}, {"id": "C", "hu": "5"}]),
+            ("B", [{"id": "C", "hu": "1"}]),
+            ("C", []),
+            ("D", [{"id": "A", "hu": "1"}]),
+        ])
+        tree = dijkstra(graph, graph.index["A"])
+        self.assertEqual(tree.distances, [0, 1, 2, INF])
+        self.assertEqual(tree.path_to(graph.index["C"]), [0, 1, 2])
+        self.assertIsNone(tree.path_to(graph.index["D"]))
+
+    def test_equal_cost_ties_settle_in_gate_id_order(self):
+        graph = GateGraph.from_rows([
+            ("A", [{"id": "C", "hu": "1"}, {"id": "B", "hu": "1"}]),
+            ("B", [{"id": "D", "hu": "1"}]),
+            ("C", [{"id": "D", "hu": "1"}]),
+            ("D", []),
+        ])
+        tree = dijkstra(graph, graph.index["A"], graph.index["D"])
+        self.assertEqual([graph.ids[i] for i in tree.path_to(graph.index["D"])], ["A", "B", "D"])
+
+
+def tied_rows(n, degree, seed):
+    rng = random.Random(seed)
+    ids = [f"G{i:02d}" for i in range(n)]
+    # Narrow weight range so most pairs have several cheapest paths
+    return [
+        (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(1, 3))} for _ in range(rng.randint(0, degree))])
+        for gate_id in ids
+    ]
+
+
+class GoalDirectedSearchTest(SimpleTestCase):
+    def assert_matches_dijkstra(self, graph, search):
+        for origin in range(len(graph)):
+            for destination in range(len(graph)):
+                if origin == destination:
+                    continue
+                tree = dijkstra(graph, origin, destination)
+                route, settled = search(graph, origin, destination)
+                self.assertEqual(route, tree.route(destination), (graph.ids[origin], graph.ids[destination]))
+                self.assertGreater(settled, 0)
+
+    def test_bidirectional_matches_dijkstra_including_ties(self):
+        for seed in range(4):
+            self.assert_matches_dijkstra(GateGraph.from_rows(tied_rows(25, 3, seed)), bidirectional_dijkstra)
+
+    def test_astar_matches_dijkstra_including_ties(self):
+        for seed in range(4):
+            graph = GateGraph.from_rows(tied_rows(25, 3, seed))
+            landmarks = Landmarks.build(graph, 4)
+            self.assert_matches_dijkstra(
+                graph, lambda g, o, d: astar(g, o, d, landmarks.heuristic(d))
+            )
+
+    def test_astar_without_landmarks_matches_dijkstra(self):
+        graph = GateGraph.from_rows(tied_rows(20, 3, 7))
+        self.assert_matches_dijkstra(graph, lambda g, o, d: astar(g, o, d, lambda node: 0))
+
+    def test_equal_cost_ties_follow_dijkstra(self):
+        graph = GateGraph.from_rows([
+            ("A", [{"id": "C", "hu": "1"}, {"id": "B", "hu": "1"}]),
+            ("B", [{"id": "D", "hu": "1"}]),
+            ("C", [{"id": "D", "hu": "1"}]),
+            ("D", []),
+        ])
+        a, d = graph.index["A"], graph.index["D"]
+        self.assertEqual(bidirectional_dijkstra(graph, a, d)[0], ([0, 1, 3], 2))
+        self.assertEqual(astar(graph, a, d, Landmarks.build(graph, 2).heuristic(d))[0], ([0, 1, 3], 2))
+
+    def test_astar_settles_fewer_gates_on_a_line(self):
+        ids = [f"G{i:02d}" for i in range(40)]
+        rows = [
+            (gate_id, [{"id": other, "hu": "1"} for other in (ids[i - 1] if i else None, ids[i + 1] if i < 39 else None) if other])
+            for i, gate_id in enumerate(ids)
+        ]
+        graph = GateGraph.from_rows(rows)
+        origin, destination = graph.index["G20"], graph.index["G30"]
+        heuristic = Landmarks.build(graph, 2).heuristic(destination)
+
+        route, settled = astar(graph, origin, destination, heuristic)
+        self.assertEqual(route[1], 10)
+        self.assertLess(settled, dijkstra(graph, origin, destination).settled)
+
+    def test_unreachable(self):
+        graph = GateGraph.from_rows([("A", [{"id": "B", "hu": "1"}]), ("B", []), ("C", [])])
+        a, c = graph.index["A"], graph.index["C"]
+        self.assertIsNone(bidirectional_dijkstra(graph, a, c)[0])
+        self.assertIsNone(astar(graph, a, c, Landmarks.build(graph, 2).heuristic(c))[0])
+
+
+class LandmarksTest(SimpleTestCase):
+    def test_heuristic_is_a_lower_bound(self):
+        graph = GateGraph.from_rows(tied_rows(30, 3, 11))
+        landmarks = Landmarks.build(graph, 4)
+        self.assertEqual(len(landmarks.gates), len(set(landmarks.gates)))
+        for target in range(len(graph)):
+            heuristic = landmarks.heuristic(target)
+            reverse_tree = dijkstra(graph.reversed(), target)
+            for node in range(len(graph)):
+                self.assertLessEqual(heuristic(node), reverse_tree.distances[node])
+
+    def test_reweighted_heuristic_stays_a_lower_bound(self):
+        rng = random.Random(3)
+        graph = GateGraph.from_rows(tied_rows(30, 3, 11))
+        landmarks = Landmarks.build(graph, 4)
+        for _ in range(20):
+            edge = rng.randrange(graph.edge_count)
+            old_hu = graph.weights[edge]
+            graph = graph.with_weight(edge, rng.randint(1, 5))
+            landmarks = landmarks.reweighted(graph, edge, old_hu)
+        for target in range(len(graph)):
+            heuristic = landmarks.heuristic(target)
+            for origin in range(len(graph)):
+                self.assertEqual(astar(graph, origin, target, heuristic)[0], dijkstra(graph, origin, target).route(target))
+
+    def test_disconnected_parts_get_a_landmark(self):
+        graph = GateGraph.from_rows([
+            ("A", [{"id": "B", "hu": "1"}]), ("B", [{"id": "A", "hu": "1"}]),
+            ("X", [{"id": "Y", "hu": "1"}]), ("Y", [{"id": "X", "hu": "1"}]),
+        ])
+        landmarks = Landmarks.build(graph, 2)
+        self.assertEqual({graph.ids[gate] in "AB" for gate in landmarks.gates}, {True, False})
+        self.assertEqual(landmarks.heuristic(graph.index["X"])(graph.index["A"]), INF)
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from app.models import Gate
+from app.services.gate_index import GateIndex, get_gate_index
+from app.services.graph import graph_version
+
+
+class GateIndexTest(TestCase):
+    def test_lookups(self):
+        index = GateIndex("v1", [("PRX", "Proxima"), ("SIR", None), ("SOL", "Sol")])
+        self.assertEqual(index.lookup("SOL"), "SOL")
+        self.assertEqual(index.lookup("sOl"), "SOL")
+        self.assertIsNone(index.lookup("XYZ"))
+        self.assertIn("prx", index)
+        self.assertEqual(index.name("PRX"), "Proxima")
+        self.assertIsNone(index.name("SIR"))
+        self.assertEqual(index.after("PRX"), 1)
+        self.assertEqual(index.after("A"), 0)
+        self.assertEqual(index.after("ZZZ"), 3)
+
+    def test_reloaded_per_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+        index = get_gate_index(graph_version())
+        with self.assertNumQueries(0):
+            self.assertIs(get_gate_index(graph_version()), index)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="PRX", name="Proxima")
+        self.assertEqual(get_gate_index(graph_version()).ids, ["PRX", "SOL"])
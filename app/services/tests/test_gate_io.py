@@ -0,0 +1,128 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from app.models import Gate, GateConnection
+from app.services.gate_io import GateFileError, read_gates
+from app.services.graph import get_graph
+
+
+def network():
+    return (
+        list(Gate.objects.order_by("id").values_list("id", "name")),
+        list(GateConnection.objects.order_by("source_id", "id").values_list("source_id", "target_id", "hu")),
+    )
+
+
+class GateImportExportTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+            Gate.objects.create(id="SIR", name=None)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def import_file(self, name, text, *args):
+        path = Path(self.tmp.name) / name
+        path.write_text(text)
+        out = StringIO()
+        call_command("import_gates", str(path), *args, stdout=out)
+        return out.getvalue()
+
+    def assert_round_trip(self, name):
+        path = Path(self.tmp.name) / name
+        expected = network()
+        fingerprint = get_graph().fingerprint
+        call_command("export_gates", "--output", str(path), "--chunk-size", "2", stdout=StringIO())
+
+        output = self.import_file(name, path.read_text(), "--clear", "--chunk-size", "2")
+        self.assertIn("Imported 3 gates and 3 connections", output)
+        self.assertEqual(network(), expected)
+        self.assertEqual(get_graph().fingerprint, fingerprint)
+
+    def test_ndjson_round_trip(self):
+        self.assert_round_trip("gates.ndjson")
+
+    def test_csv_round_trip(self):
+        self.assert_round_trip("gates.csv")
+
+    def test_export_to_stdout(self):
+        out = StringIO()
+        call_command("export_gates", "--format", "ndjson", stdout=out, stderr=StringIO())
+        self.assertEqual(out.getvalue().splitlines()[1], '{"id": "SIR", "name": null, "connections": []}')
+
+    def test_import_replaces_connections_of_imported_gates(self):
+        output = self.import_file(
+            "gates.csv",
+            "id,name,target,hu\nprx,Proxima b,SIR,5\nPRX,Proxima b,VEG,7\nVEG,Vega,,\n",
+        )
+        self.assertRegex(output, r"Imported 2 gates and 2 connections in [\d.]+s \(\d+ rows/s\)")
+        self.assertNotIn("unknown gates", output)
+        self.assertEqual(Gate.objects.get(id="PRX").name, "Proxima b")
+        self.assertEqual(
+            list(GateConnection.objects.filter(source_id="PRX").values_list("target_id", "hu")),
+            [("SIR", 5), ("VEG", 7)],
+        )
+        self.assertEqual(GateConnection.objects.filter(source_id="SOL").count(), 2)
+        self.assertEqual(get_graph().neighbors("PRX"), [("SIR", 5), ("VEG", 7)])
+
+    def test_unknown_targets_reported(self):
+        GateConnection.objects.create(source_id="SIR", target_id="RAN", hu=1)
+        text = (
+            '{"id": "VEG", "connections": [{"id": "XYZ", "hu": "3"}, {"id": "ALT", "hu": "4"}, {"id": "SOL", "hu": "5"}]}\n'
+            '{"id": "ALT", "connections": [{"id": "XYZ", "hu": "6"}]}\n'
+        )
+        for args in [("--dry-run",), ()]:
+            with self.subTest(args=args):
+                output = self.import_file("gates.ndjson", text, "--chunk-size", "1", *args)
+                self.assertIn("2 connections point at unknown gates", output)
+
+    def test_dry_run_writes_nothing(self):
+        before = network()
+        with CaptureQueriesContext(connection) as queries:
+            output = self.import_file("gates.ndjson", '{"id": "VEG", "name": "Vega"}\n', "--dry-run", "--clear")
+        self.assertIn("Validated 1 gates and 0 connections", output)
+        self.assertEqual(network(), before)
+        writes = [q["sql"] for q in queries if q["sql"].lstrip().upper().startswith(("INSERT INTO \"GATE", "DELETE", "COPY \"GATE"))]
+        self.assertEqual(writes, [])
+
+    def test_duplicate_gate_rolls_back(self):
+        before = network()
+        text = '{"id": "VEG"}\n{"id": "ALT"}\n{"id": "veg", "connections": [{"id": "SOL", "hu": 1}]}\n'
+        for chunk_size in ["1", "10"]:
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaisesMessage(CommandError, "Line 3: gate VEG appears more than once"):
+                    self.import_file("gates.ndjson", text, "--chunk-size", chunk_size)
+                self.assertEqual(network(), before)
+
+    def test_malformed_record_rolls_back(self):
+        before = network()
+        text = '{"id": "VEG", "name": "Vega"}\n{"id": "ALT", "connections": [{"id": "SOL", "hu": -1}]}\n'
+        with self.assertRaisesMessage(CommandError, "Line 2: gate ALT: connection to SOL needs an HU"):
+            self.import_file("gates.ndjson", text, "--chunk-size", "1")
+        self.assertEqual(network(), before)
+
+    def test_read_gates_validation(self):
+        bad = {
+            "ndjson": ['{"id": "TOOLONG"}', "[1]", '{"id": "A", "connections": [{"id": "B"}]}'],
+            "csv": ["SOL,Sol,PRX", "SOL,Sol,,5"],
+        }
+        for format, texts in bad.items():
+            for text in texts:
+                with self.subTest(text=text), self.assertRaises(GateFileError):
+                    list(read_gates(StringIO(text), format))
+
+        records = list(read_gates(StringIO("SOL,Sol,PRX,1\nSOL,Sol,SIR, 2\nprx,,,\n"), "csv"))
+        self.assertEqual(records, [
+            ("SOL", "Sol", [("PRX", 1), ("SIR", 2)], 1),
+            ("PRX", None, [], 3),
+        ])
@@ -0,0 +1,209 @@
+import asyncio
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from app.models import Gate, GateConnection
+from app.services import graph as graph_module
+from app.services.graph import (
+    GRAPH_DELTA_CACHE_KEY, GateGraph, aget_graph, get_graph, graph_version, invalidate_graph, publish_connection_hu,
+)
+from app.services.route_finder import find_cheapest_route
+
+
+class GateGraphCacheTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="RAN", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+
+    def test_unknown_connections_dropped(self):
+        graph = get_graph()
+        self.assertEqual(graph.neighbors("SOL"), [("PRX", 90)])
+
+    def test_graph_reused_between_calls(self):
+        graph = get_graph()
+        with self.assertNumQueries(0):
+            self.assertIs(get_graph(), graph)
+            find_cheapest_route("SOL", "PRX")
+
+    def test_invalidated_on_save(self):
+        graph = get_graph()
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="RAN", name="Ran")
+        new_graph = get_graph()
+        self.assertIsNot(new_graph, graph)
+        self.assertEqual(new_graph.neighbors("SOL"), [("PRX", 90), ("RAN", 100)])
+
+    def test_invalidated_on_delete(self):
+        get_graph()
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.filter(id="PRX").first().delete()
+        self.assertNotIn("PRX", get_graph())
+
+    def test_invalidate_graph_forces_rebuild(self):
+        graph = get_graph()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_graph()
+        self.assertIsNot(get_graph(), graph)
+        self.assertNotEqual(get_graph().version, graph.version)
+
+    def test_version_published_on_commit(self):
+        graph = get_graph()
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="RAN", name="Ran")
+            self.assertEqual(graph_version(), graph.version)
+            self.assertIs(get_graph(), graph)
+        self.assertNotEqual(graph_version(), graph.version)
+
+    def test_hu_edit_replayed_without_recompiling(self):
+        graph = get_graph()
+        graph.reversed()
+        connection = GateConnection.objects.get(source_id="SOL", target_id="PRX")
+        connection.hu = 40
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.save()
+        GateConnection.objects.filter(source_id="PRX").update(hu=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            GateConnection.objects.get(source_id="PRX").save()
+
+        with self.assertNumQueries(0):
+            new_graph = get_graph()
+        self.assertNotEqual(new_graph.version, graph.version)
+        self.assertIs(new_graph.ids, graph.ids)
+        self.assertEqual(new_graph.fingerprint, GateGraph.from_db().fingerprint)
+        self.assertEqual(new_graph.reversed().neighbors("PRX"), [("SOL", 40)])
+        self.assertEqual(graph.neighbors("SOL"), [("PRX", 90)])
+
+    def test_hu_edit_reloads_without_published_change(self):
+        graph = get_graph()
+        connection = GateConnection.objects.get(source_id="SOL", target_id="PRX")
+        connection.hu = 40
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.save()
+        cache.delete(GRAPH_DELTA_CACHE_KEY.format(cache.get("gate-graph-version")))
+
+        new_graph = get_graph()
+        self.assertIsNot(new_graph.ids, graph.ids)
+        self.assertEqual(new_graph.neighbors("SOL"), [("PRX", 40)])
+
+    def test_rolled_back_hu_edit_not_published(self):
+        graph = get_graph()
+        connection = GateConnection.objects.get(source_id="SOL", target_id="PRX")
+        connection.hu = 40
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                connection.save()
+                raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        with self.assertNumQueries(0):
+            self.assertIs(get_graph(), graph)
+        self.assertEqual(graph.neighbors("SOL"), [("PRX", 90)])
+
+    def test_retargeted_connection_recompiles(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="RAN", name="Ran")
+        graph = get_graph()
+        connection = GateConnection.objects.get(source_id="SOL", target_id="PRX")
+        connection.target_id = "RAN"
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.save()
+
+        new_graph = get_graph()
+        self.assertIsNot(new_graph.ids, graph.ids)
+        self.assertEqual(new_graph.neighbors("SOL"), [("RAN", 90), ("RAN", 100)])
+
+    def invalidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_graph()
+
+    async def test_aget_graph(self):
+        graph = await sync_to_async(get_graph)()
+        self.assertIs(await aget_graph(), graph)
+
+        await sync_to_async(self.invalidate)()
+        graphs = await asyncio.gather(*(aget_graph() for _ in range(5)))
+        self.assertIsNot(graphs[0], graph)
+        self.assertTrue(all(other is graphs[0] for other in graphs))
+        self.assertEqual(graphs[0].neighbors("SOL"), [("PRX", 90)])
+        self.assertIs(await sync_to_async(get_graph)(), graphs[0])
+
+    def test_from_rows(self):
+        graph = GateGraph.from_rows([("SOL", [{"id": "PRX", "hu": "5"}]), ("PRX", [])])
+        self.assertEqual(graph.ids, ["PRX", "SOL"])
+        self.assertEqual(list(graph.offsets), [0, 0, 1])
+        self.assertEqual(list(graph.targets), [0])
+        self.assertEqual(list(graph.weights), [5])
+
+    def test_reversed(self):
+        graph = GateGraph.from_rows([
+            ("A", [{"id": "B", "hu": "1"}, {"id": "C", "hu": "2"}]),
+            ("B", [{"id": "C", "hu": "3"}]),
+            ("C", []),
+        ])
+        reverse = graph.reversed()
+        self.assertEqual(reverse.neighbors("A"), [])
+        self.assertEqual(reverse.neighbors("B"), [("A", 1)])
+        self.assertEqual(reverse.neighbors("C"), [("A", 2), ("B", 3)])
+        self.assertIs(graph.reversed(), reverse)
+
+
+class GraphPublishTest(TransactionTestCase):
+    def setUp(self):
+        Gate.objects.create(id="SOL", name="Sol")
+        Gate.objects.create(id="PRX", name="Proxima")
+        GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+        GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+
+    def test_concurrent_hu_publishes_form_one_chain(self):
+        graph = get_graph()
+        GateConnection.objects.filter(source_id="SOL").update(hu=40)
+        GateConnection.objects.filter(source_id="PRX").update(hu=30)
+        first, second = GateConnection.objects.order_by("id").values_list("id", flat=True)
+
+        entered, release = threading.Event(), threading.Event()
+        read_version = graph_module.graph_version
+
+        def paused_version():
+            version = read_version()
+            # The first publisher waits here, having read its base version, until the second has started
+            if threading.current_thread().name == "first":
+                entered.set()
+                release.wait(5)
+            return version
+
+        def publish(pk):
+            try:
+                publish_connection_hu(pk)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=publish, args=(first,), name="first"),
+            threading.Thread(target=publish, args=(second,), name="second"),
+        ]
+        # Every cache.add succeeds, as it does for workers in different
+        # processes with a per-process cache
+        with (
+            mock.patch.object(graph_module, "graph_version", paused_version),
+            mock.patch("django.core.cache.backends.locmem.LocMemCache.add", return_value=True),
+        ):
+            threads[0].start()
+            self.assertTrue(entered.wait(5))
+            threads[1].start()
+            threads[1].join(0.2)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        new_graph = get_graph()
+        self.assertIs(new_graph.ids, graph.ids)
+        self.assertEqual(new_graph.neighbors("SOL"), [("PRX", 40)])
+        self.assertEqual(new_graph.neighbors("PRX"), [("SOL", 30)])
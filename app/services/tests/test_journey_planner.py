@@ -0,0 +1,48 @@
+from django.test import TestCase
+from app.models import Gate, GateConnection
+from app.services.journey_planner import plan_journey, plan_journeys
+
+
+class JourneyPlannerServiceTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            Gate.objects.create(id="SIR", name="Sirius")
+
+    def test_journey_costs(self):
+        result = plan_journey("sol", "prx", 100, 2, 0)
+        # Transport: Personal, 100 * 0.30 = 30
+        self.assertEqual(result["transport"]["transport_type"], "Personal")
+        self.assertEqual(result["transport"]["total_cost_gbp"], 30.0)
+        # Hyperspace: 90 HU * 0.10 * 2 = 18 per passenger, 2 passengers
+        self.assertEqual(result["route"]["path"], ["SOL", "PRX"])
+        self.assertEqual(result["hyperspace_cost_gbp"], 36.0)
+        self.assertEqual(result["total_cost_gbp"], 66.0)
+
+    def test_no_route(self):
+        self.assertIsNone(plan_journey("SIR", "SOL", 100, 2, 0))
+
+    def test_unknown_gate(self):
+        with self.assertRaises(ValueError):
+            plan_journey("XYZ", "SOL", 100, 2, 0)
+
+    def test_invalid_transport(self):
+        with self.assertRaises(ValueError):
+            plan_journey("SOL", "PRX", 100, 6, 0)
+
+    def test_batch(self):
+        results = plan_journeys([
+            {"origin": "SOL", "destination": "PRX", "distance_au": 100, "passengers": 1, "parking_days": 0},
+            {"origin": "SOL", "destination": "SIR", "distance_au": 10, "passengers": 5, "parking_days": 0},
+            {"origin": "SIR", "destination": "SOL", "distance_au": 10, "passengers": 5, "parking_days": 0},
+            {"origin": "SOL", "destination": "PRX", "distance_au": -1, "passengers": 1, "parking_days": 0},
+        ])
+        self.assertEqual(results[0], plan_journey("SOL", "PRX", 100, 1, 0))
+        # HSTC 10 * 0.45 = 4.5, plus 100 HU * 0.10 * 2 * 5 passengers = 100
+        self.assertEqual(results[1]["total_cost_gbp"], 104.5)
+        self.assertIsNone(results[2])
+        self.assertIsInstance(results[3], ValueError)
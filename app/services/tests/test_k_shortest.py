@@ -0,0 +1,85 @@
+import random
+
+from django.test import SimpleTestCase, TestCase
+from app.models import Gate, GateConnection
+from app.services.engine import dijkstra
+from app.services.graph import GateGraph
+from app.services.k_shortest import k_shortest_paths
+from app.services.route_finder import find_alternative_routes, find_cheapest_route
+
+
+def all_simple_path_costs(graph, source, target):
+    """Every loopless route cost by exhaustive search, as a reference."""
+    costs = []
+
+    def visit(node, path, cost):
+        if node == target:
+            costs.append(cost)
+            return
+        cheapest = {}
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            neighbor = graph.targets[edge]
+            cheapest[neighbor] = min(cheapest.get(neighbor, graph.weights[edge]), graph.weights[edge])
+        for neighbor, hu in cheapest.items():
+            if neighbor not in path:
+                path.add(neighbor)
+                visit(neighbor, path, cost + hu)
+                path.remove(neighbor)
+
+    visit(source, {source}, 0)
+    return sorted(costs)
+
+
+class KShortestPathsTest(SimpleTestCase):
+    def test_matches_exhaustive_search(self):
+        for seed in range(10):
+            rng = random.Random(seed)
+            ids = [f"G{i}" for i in range(8)]
+            graph = GateGraph.from_rows([
+                (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(1, 5))} for _ in range(rng.randint(0, 4))])
+                for gate_id in ids
+            ])
+            for source in range(len(graph)):
+                for target in range(len(graph)):
+                    if source == target:
+                        continue
+                    expected = all_simple_path_costs(graph, source, target)
+                    routes = k_shortest_paths(graph, source, target, 6)
+                    self.assertEqual([hu for _, hu in routes], expected[:6])
+                    self.assertEqual(len({tuple(path) for path, _ in routes}), len(routes))
+                    for path, _ in routes:
+                        self.assertEqual((path[0], path[-1]), (source, target))
+                        self.assertEqual(len(set(path)), len(path))
+                    if routes:
+                        self.assertEqual(routes[0], dijkstra(graph, source, target).route(target))
+
+    def test_unreachable(self):
+        graph = GateGraph.from_rows([("A", []), ("B", [])])
+        self.assertEqual(k_shortest_paths(graph, 0, 1, 3), [])
+
+
+class FindAlternativeRoutesServiceTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=5)
+            Gate.objects.create(id="SIR", name="Sirius")
+
+    def test_alternatives(self):
+        routes = find_alternative_routes("sol", "sir", 3)
+        self.assertEqual([route["path"] for route in routes], [["SOL", "PRX", "SIR"], ["SOL", "SIR"]])
+        self.assertEqual([route["total_hu"] for route in routes], [95, 100])
+        self.assertEqual(routes[0], find_cheapest_route("SOL", "SIR"))
+
+    def test_same_gate(self):
+        self.assertEqual(find_alternative_routes("SOL", "SOL", 3), [find_cheapest_route("SOL", "SOL")])
+
+    def test_no_route(self):
+        self.assertEqual(find_alternative_routes("SIR", "SOL", 3), [])
+
+    def test_unknown_gate(self):
+        with self.assertRaises(ValueError):
+            find_alternative_routes("SOL", "XYZ", 3)
@@ -0,0 +1,57 @@
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from app.services.quote_cache import quote_cache
+
+
+class QuoteCacheTest(SimpleTestCase):
+    def setUp(self):
+        quote_cache.clear()
+
+    def test_key_normalizes_parameter_order(self):
+        self.assertEqual(
+            quote_cache.key("route", {"origin": "SOL", "destination": "PRX"}, "v1"),
+            quote_cache.key("route", {"destination": "PRX", "origin": "SOL"}, "v1"),
+        )
+
+    def test_key_includes_version(self):
+        params = {"origin": "SOL", "destination": "PRX"}
+        self.assertNotEqual(quote_cache.key("route", params, "v1"), quote_cache.key("route", params, "v2"))
+
+    def test_get_or_compute(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"total": 1}
+
+        self.assertEqual(quote_cache.get_or_compute("route", {"a": 1}, compute), ({"total": 1}, False))
+        self.assertEqual(quote_cache.get_or_compute("route", {"a": 1}, compute), ({"total": 1}, True))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(quote_cache.stats(), {"route": {"hits": 1, "misses": 1}})
+
+    async def test_aget_or_compute(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {"total": 1}
+
+        self.assertEqual(await quote_cache.aget_or_compute("route", {"a": 1}, compute), ({"total": 1}, False))
+        self.assertEqual(await quote_cache.aget_or_compute("route", {"a": 1}, compute), ({"total": 1}, True))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(quote_cache.stats(), {"route": {"hits": 1, "misses": 1}})
+
+    @override_settings(QUOTE_CACHE_ENABLED=False)
+    def test_disabled(self):
+        quote_cache.get_or_compute("route", {"a": 1}, dict)
+        self.assertEqual(quote_cache.get_or_compute("route", {"a": 1}, dict), ({}, False))
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "quotes": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+            }):
+                quote_cache.get_or_compute("transport", {"a": 1}, lambda: {"total": 2})
+                self.assertEqual(quote_cache.get_or_compute("transport", {"a": 1}, dict), ({"total": 2}, True))
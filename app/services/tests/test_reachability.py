@@ -0,0 +1,104 @@
+import random
+
+from django.test import SimpleTestCase, TestCase
+from app.models import Gate, GateConnection
+from app.services.engine import SearchStats
+from app.services.graph import GateGraph, get_graph
+from app.services.reachability import ReachabilityIndex, get_reachability
+from app.services.route_finder import find_cheapest_route, find_cheapest_routes, find_reachable_gates
+
+
+def random_graph(rng, n):
+    ids = [f"G{i:02d}" for i in range(n)]
+    return GateGraph.from_rows([
+        (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(1, 9))} for _ in range(rng.randint(0, 2))])
+        for gate_id in ids
+    ])
+
+
+def reached(graph, source):
+    """Gates reachable from ``source`` by depth-first search, as a reference."""
+    seen = {source}
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            if graph.targets[edge] not in seen:
+                seen.add(graph.targets[edge])
+                stack.append(graph.targets[edge])
+    return seen
+
+
+class ReachabilityIndexTest(SimpleTestCase):
+    def test_matches_search(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            graph = random_graph(rng, rng.randint(1, 30))
+            # With the closure, and searching components without it
+            for max_components in (len(graph), 0):
+                index = ReachabilityIndex(graph, max_components)
+                self.assertEqual(index.closure is None, max_components == 0)
+                for source in range(len(graph)):
+                    expected = reached(graph, source)
+                    with self.subTest(seed=seed, max_components=max_components, source=source):
+                        self.assertEqual(index.reachable_from(source), sorted(expected))
+                        self.assertEqual(
+                            [index.reachable(source, target) for target in range(len(graph))],
+                            [target in expected for target in range(len(graph))],
+                        )
+
+    def test_components(self):
+        # A cycle SOL -> PRX -> SIR -> SOL leading to a chain ALC -> BAR
+        graph = GateGraph.from_rows([
+            ("SOL", [{"id": "PRX", "hu": "1"}]),
+            ("PRX", [{"id": "SIR", "hu": "1"}]),
+            ("SIR", [{"id": "SOL", "hu": "1"}, {"id": "ALC", "hu": "1"}]),
+            ("ALC", [{"id": "BAR", "hu": "1"}]),
+            ("BAR", []),
+        ])
+        index = ReachabilityIndex(graph, 10)
+        component = {gate_id: index.component[graph.index[gate_id]] for gate_id in graph.ids}
+        self.assertEqual(index.count, 3)
+        self.assertEqual(len({component["SOL"], component["PRX"], component["SIR"]}), 1)
+        # Components are numbered after the ones they reach
+        self.assertLess(component["BAR"], component["ALC"])
+        self.assertLess(component["ALC"], component["SOL"])
+
+    def test_survives_reweighting(self):
+        graph = random_graph(random.Random(0), 10)
+        index = get_reachability(graph)
+        self.assertIs(get_reachability(graph.with_weight(0, 100)), index)
+
+
+class ReachabilityServiceTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+            Gate.objects.create(id="SIR", name="Sirius")
+            GateConnection.objects.create(source_id="SIR", target_id="ALC", hu=10)
+            Gate.objects.create(id="ALC", name="Alpha Centauri")
+
+    def test_unreachable_pair_is_not_searched(self):
+        stats = SearchStats()
+        self.assertIsNone(find_cheapest_route("SOL", "SIR", stats=stats))
+        self.assertEqual((stats.strategy, stats.settled_nodes), ("reachability", 0))
+
+        self.assertEqual(find_cheapest_route("SOL", "PRX", stats=stats)["total_hu"], 90)
+        self.assertEqual(stats.strategy, "dijkstra")
+
+    def test_batch(self):
+        self.assertEqual(
+            [result and result["total_hu"] for result in find_cheapest_routes([("SOL", "SIR"), ("SIR", "ALC")], workers=0)],
+            [None, 10],
+        )
+
+    def test_reachable_gates(self):
+        self.assertEqual(find_reachable_gates("sol"), ["PRX"])
+        self.assertEqual(find_reachable_gates("SIR"), ["ALC"])
+        self.assertEqual(find_reachable_gates("ALC"), [])
+        with self.assertRaises(ValueError):
+            find_reachable_gates("XYZ")
+        self.assertEqual(get_reachability(get_graph()).count, 3)
@@ -1,22 +1,23 @@
-from django.test import TestCase
-from app.models import Gate
-from app.services.route_finder import find_cheapest_route
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from app.models import Gate, GateConnection
+from app.services.contraction import ContractionHierarchy
+from app.services.engine import SearchStats
+from app.services.graph import get_graph
+from app.services.route_finder import SEARCH_STRATEGIES, find_cheapest_route, find_cheapest_routes, iter_routes_from
 
 
 class RouteFinderServiceTest(TestCase):
     def setUp(self):
-        Gate.objects.create(
-            id="SOL", name="Sol",
-            connections=[{"id": "PRX", "hu": "90"}, {"id": "SIR", "hu": "100"}]
-        )
-        Gate.objects.create(
-            id="PRX", name="Proxima",
-            connections=[{"id": "SIR", "hu": "10"}]
-        )
-        Gate.objects.create(
-            id="SIR", name="Sirius",
-            connections=[]
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            Gate.objects.create(id="SIR", name="Sirius")
 
     def test_direct_route(self):
         result = find_cheapest_route("SOL", "PRX")
@@ -58,3 +59,82 @@ class RouteFinderServiceTest(TestCase):
         result = find_cheapest_route("SOL", "PRX")
         # Round trip: 90 HU * 0.10 * 2 = 18.0
         self.assertEqual(result["cost_per_passenger_gbp"], 18.0)
+
+
+    def test_strategies_return_the_same_route(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "contraction_hierarchy.npz"
+            ContractionHierarchy.build(get_graph()).save(path)
+            with override_settings(ROUTE_CH_PATH=path):
+                self.assert_strategies_agree()
+
+    def assert_strategies_agree(self):
+        for strategy in SEARCH_STRATEGIES:
+            for origin, destination in [("SOL", "SIR"), ("SOL", "PRX"), ("SIR", "SOL")]:
+                stats = SearchStats()
+                result = find_cheapest_route(origin, destination, strategy, stats)
+                self.assertEqual(result, find_cheapest_route(origin, destination, "dijkstra"))
+                if result is None:
+                    # Answered by the reachability index, without a search
+                    self.assertEqual((stats.strategy, stats.settled_nodes), ("reachability", 0))
+                    continue
+                self.assertEqual(stats.strategy, strategy)
+                self.assertGreater(stats.settled_nodes, 0)
+
+    @override_settings(ROUTE_SEARCH_STRATEGY="bidirectional")
+    def test_default_strategy_setting(self):
+        stats = SearchStats()
+        find_cheapest_route("SOL", "SIR", stats=stats)
+        self.assertEqual(stats.strategy, "bidirectional")
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            find_cheapest_route("SOL", "SIR", "bfs")
+
+    def test_zero_hu_connections_fall_back_to_dijkstra(self):
+        GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=0)
+        stats = SearchStats()
+        result = find_cheapest_route("SOL", "SIR", "astar", stats)
+        self.assertEqual(result["total_hu"], 100)
+        self.assertEqual(stats.strategy, "dijkstra")
+
+
+class FindCheapestRoutesServiceTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            Gate.objects.create(id="SIR", name="Sirius")
+
+    def test_matches_single_route_search(self):
+        pairs = [("SOL", "PRX"), ("sol", "sir"), ("PRX", "SIR"), ("SOL", "SOL")]
+        results = find_cheapest_routes(pairs)
+        self.assertEqual(results, [find_cheapest_route(*pair) for pair in pairs])
+
+    def test_per_item_errors(self):
+        results = find_cheapest_routes([("SIR", "SOL"), ("XYZ", "SOL"), ("SOL", "XYZ"), ("SOL", "PRX")])
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3]["total_hu"], 90)
+
+    def test_iter_routes_from(self):
+        routes = list(iter_routes_from("sol"))
+        self.assertEqual([r["destination"] for r in routes], ["PRX", "SIR"])
+        self.assertEqual(routes[1], {
+            "origin": "SOL", "destination": "SIR", "total_hu": 100, "cost_per_passenger_gbp": 20.0,
+        })
+
+    def test_iter_routes_from_with_path(self):
+        routes = list(iter_routes_from("SOL", include_path=True))
+        self.assertEqual(routes, [find_cheapest_route("SOL", "PRX"), find_cheapest_route("SOL", "SIR")])
+
+    def test_iter_routes_from_no_reachable_gates(self):
+        self.assertEqual(list(iter_routes_from("SIR")), [])
+
+    def test_iter_routes_from_unknown_origin(self):
+        with self.assertRaises(ValueError):
+            iter_routes_from("XYZ")
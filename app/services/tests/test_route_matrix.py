@@ -0,0 +1,109 @@
+import math
+import tempfile
+from concurrent.futures import CancelledError
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from app.models import Gate, GateConnection
+from app.services.engine import INF, dijkstra
+from app.services.route_finder import find_cheapest_route
+from app.services.route_matrix import costs, load_npy
+from app.services.route_pool import RoutePool, distance_rows, shutdown_route_pool
+from app.services.tests.test_route_pool import random_graph
+
+
+class DistanceRowsTest(SimpleTestCase):
+    def setUp(self):
+        self.graph = random_graph()
+        self.addCleanup(shutdown_route_pool)
+
+    def expected(self):
+        return [
+            [-1 if hu == INF else hu for hu in dijkstra(self.graph, origin).distances]
+            for origin in range(len(self.graph))
+        ]
+
+    def test_in_process(self):
+        rows = distance_rows(self.graph, list(range(len(self.graph))))
+        self.assertEqual([row.tolist() for row in rows], self.expected())
+
+    def test_pool(self):
+        rows = distance_rows(self.graph, list(range(len(self.graph))), workers=2, block_size=7)
+        self.assertEqual([row.tolist() for row in rows], self.expected())
+
+    def test_cancelled_pool_computes_remaining_rows_in_process(self):
+        def cancelled(pool, origins, block_size):
+            yield from distance_rows(self.graph, origins[:3])
+            raise CancelledError
+
+        with mock.patch.object(RoutePool, "distance_rows", cancelled):
+            rows = distance_rows(self.graph, list(range(len(self.graph))), workers=2)
+            self.assertEqual([row.tolist() for row in rows], self.expected())
+
+    def test_costs(self):
+        hu = np.array([0, 1, 7, 123, 100001, -1])
+        self.assertEqual(costs(hu)[:-1].tolist(), [round(x * 0.10 * 2, 2) for x in hu[:-1].tolist()])
+        self.assertTrue(math.isnan(costs(hu)[-1]))
+
+
+class ExportRouteMatrixCommandTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=5)
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=91)
+            Gate.objects.create(id="SIR", name="Sirius")
+        self.addCleanup(shutdown_route_pool)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command("export_route_matrix", *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_npy(self):
+        for route_table in (False, True):
+            with self.subTest(route_table=route_table), override_settings(ROUTE_TABLE_ENABLED=route_table), \
+                    tempfile.TemporaryDirectory() as tmp:
+                self.export(tmp, "--workers", "2", "--block-size", "2")
+                ids, total_hu, cost = load_npy(Path(tmp))
+                self.assertEqual(ids, ["PRX", "SIR", "SOL"])
+                for i, origin in enumerate(ids):
+                    for j, destination in enumerate(ids):
+                        route = find_cheapest_route(origin, destination)
+                        if route is None:
+                            self.assertEqual(total_hu[i, j], -1)
+                            self.assertTrue(math.isnan(cost[i, j]))
+                        else:
+                            self.assertEqual(total_hu[i, j], route["total_hu"])
+                            self.assertEqual(cost[i, j], route["cost_per_passenger_gbp"])
+
+    def test_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "matrix.csv"
+            report = self.export(str(output), "--workers", "1")
+            self.assertIn("Exported the 3x3 route matrix", report)
+            self.assertEqual(output.read_text().splitlines(), [
+                "origin,destination,total_hu,cost_per_passenger_gbp",
+                "PRX,PRX,0,0.0",
+                "PRX,SIR,5,1.0",
+                "PRX,SOL,91,18.2",
+                "SIR,SIR,0,0.0",
+                "SOL,PRX,90,18.0",
+                "SOL,SIR,95,19.0",
+                "SOL,SOL,0,0.0",
+            ])
+
+    def test_csv_stdout_with_unreachable(self):
+        out, err = StringIO(), StringIO()
+        call_command("export_route_matrix", "-", "--include-unreachable", "--workers", "1", stdout=out, stderr=err)
+        lines = out.getvalue().splitlines()
+        self.assertIn("SIR,PRX,,", lines)
+        self.assertEqual(len(lines), 1 + 9)
+        self.assertIn("Exported", err.getvalue())
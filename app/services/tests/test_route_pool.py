@@ -0,0 +1,105 @@
+import multiprocessing
+import random
+import tempfile
+from concurrent.futures import CancelledError
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from app.models import Gate, GateConnection
+from app.services import route_pool
+from app.services.graph import GateGraph
+from app.services.route_finder import find_cheapest_routes
+from app.services.route_pool import RoutePool, get_route_pool, route_groups, shutdown_route_pool
+
+
+def random_graph(n=40, seed=0):
+    rng = random.Random(seed)
+    ids = [f"G{i:02d}" for i in range(n)]
+    rows = [
+        (gate_id, [{"id": rng.choice(ids), "hu": str(rng.randint(1, 20))} for _ in range(rng.randint(0, 4))])
+        for gate_id in ids
+    ]
+    return GateGraph.from_rows(rows, "v1")
+
+
+class RoutePoolTest(SimpleTestCase):
+    def setUp(self):
+        self.graph = random_graph()
+        rng = random.Random(1)
+        self.groups = [
+            (origin, rng.sample(range(len(self.graph)), rng.randint(1, 3)))
+            for origin in range(len(self.graph))
+        ]
+        self.expected = route_groups(self.graph, self.groups)
+
+    def assert_pool_routes(self, graph, mp_context=None):
+        pool = RoutePool(graph, 2, mp_context)
+        self.addCleanup(pool.shutdown)
+        self.assertEqual(pool.route_groups(self.groups), self.expected)
+
+    def test_fork(self):
+        self.assert_pool_routes(self.graph, multiprocessing.get_context("fork"))
+        self.assertIsNone(route_pool._graph)
+
+    def test_spawn_with_arrays(self):
+        self.assert_pool_routes(self.graph, multiprocessing.get_context("spawn"))
+
+    def test_spawn_with_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "gate_graph.snapshot"
+            self.graph.write_snapshot(path)
+            self.assert_pool_routes(GateGraph.from_snapshot(path), multiprocessing.get_context("spawn"))
+
+    def test_replaced_pool_shut_down_after_its_users(self):
+        self.addCleanup(shutdown_route_pool)
+        with get_route_pool(self.graph, 2) as pool:
+            with get_route_pool(random_graph(seed=1), 2) as new_pool:
+                self.assertIsNot(new_pool, pool)
+            self.assertEqual(pool.route_groups(self.groups), self.expected)
+        with self.assertRaises(RuntimeError):
+            pool.executor.submit(len, [])
+
+    @override_settings(ROUTE_POOL_MIN_ORIGINS=1)
+    def test_cancelled_pool_searches_in_process(self):
+        self.addCleanup(shutdown_route_pool)
+        with mock.patch.object(RoutePool, "route_groups", side_effect=CancelledError):
+            self.assertEqual(route_groups(self.graph, self.groups, workers=2), self.expected)
+
+
+@override_settings(ROUTE_POOL_MIN_ORIGINS=1)
+class RoutePoolServiceTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+            Gate.objects.create(id="SIR", name="Sirius")
+        self.addCleanup(shutdown_route_pool)
+
+    def test_find_cheapest_routes(self):
+        pairs = [("SOL", "SIR"), ("PRX", "SOL"), ("SIR", "SOL"), ("PRX", "SIR"), ("SOL", "XYZ"), ("SOL", "PRX")]
+        expected = find_cheapest_routes(pairs, workers=0)
+        results = find_cheapest_routes(pairs, workers=2)
+        self.assertEqual(results[:4] + results[5:], expected[:4] + expected[5:])
+        self.assertIsInstance(results[4], ValueError)
+
+    def test_find_routes_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pairs = Path(tmp) / "pairs.csv"
+            pairs.write_text("origin,destination\nsol,sir\nSIR,SOL\nSOL,XYZ\n")
+            output = Path(tmp) / "routes.csv"
+            out = StringIO()
+            call_command("find_routes", str(pairs), "--output", str(output), "--workers", "2", stdout=out)
+            self.assertIn("Found 1 routes (1 without a route, 1 with an unknown gate)", out.getvalue())
+            self.assertEqual(output.read_text().splitlines(), [
+                "origin,destination,total_hu,cost_per_passenger_gbp,path,error",
+                "SOL,SIR,100,20.0,SOL SIR,",
+                "SIR,SOL,,,,No route found from SIR to SOL",
+                "SOL,XYZ,,,,Destination gate 'XYZ' not found",
+            ])
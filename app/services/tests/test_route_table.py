@@ -0,0 +1,108 @@
+import random
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from app.models import Gate, GateConnection
+from app.services.engine import dijkstra
+from app.services.graph import GateGraph, get_graph
+from app.services.route_finder import find_cheapest_route
+from app.services.route_table import RouteTable, get_route_table
+from app.services.tests.test_engine import tied_rows
+
+
+class RouteTableTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=10)
+            GateConnection.objects.create(source_id="PRX", target_id="SOL", hu=90)
+            Gate.objects.create(id="SIR", name="Sirius")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "route_table.npz"
+
+    def test_matches_on_demand_search(self):
+        graph = get_graph()
+        table = RouteTable.build(graph)
+        for origin in range(len(graph)):
+            for destination in range(len(graph)):
+                tree = dijkstra(graph, origin, destination)
+                route = table.route(origin, destination)
+                expected = tree.path_to(destination)
+                if expected is None:
+                    self.assertIsNone(route)
+                else:
+                    self.assertEqual(route, (expected, tree.distance_to(destination)))
+
+    def test_reweighted_matches_build(self):
+        for seed in range(6):
+            rng = random.Random(seed)
+            graph = GateGraph.from_rows(tied_rows(25, 3, seed))
+            table = RouteTable.build(graph)
+            # Small HU ranges, for plenty of ties; the last graph has zero-HU edges
+            for _ in range(20):
+                edge = rng.randrange(graph.edge_count)
+                old_hu = graph.weights[edge]
+                graph = graph.with_weight(edge, rng.randint(0 if seed == 5 else 1, 5))
+                table = table.reweighted(graph, edge, old_hu)
+                expected = RouteTable.build(graph)
+                self.assertEqual(table.distances.tolist(), expected.distances.tolist())
+                self.assertEqual(table.previous.tolist(), expected.previous.tolist())
+                self.assertEqual(table.fingerprint, graph.fingerprint)
+
+    def test_table_updated_on_hu_edit(self):
+        with override_settings(ROUTE_TABLE_ENABLED=True, ROUTE_TABLE_PATH=self.path):
+            table = get_route_table(get_graph())
+            GateConnection.objects.filter(source_id="SOL", target_id="SIR").update(hu=200)
+            with self.captureOnCommitCallbacks(execute=True):
+                GateConnection.objects.get(source_id="SOL", target_id="SIR").save()
+            with mock.patch.object(RouteTable, "build", side_effect=AssertionError("table rebuilt")):
+                new_table = get_route_table(get_graph())
+                self.assertEqual(find_cheapest_route("SOL", "SIR")["path"], ["SOL", "PRX", "SIR"])
+            self.assertIsNot(new_table, table)
+            sol, sir = get_graph().index["SOL"], get_graph().index["SIR"]
+            self.assertEqual(table.route(sol, sir), ([sol, sir], 100))
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_route_table(get_graph()))
+
+    def test_falls_back_over_memory_budget(self):
+        with override_settings(ROUTE_TABLE_ENABLED=True, ROUTE_TABLE_MAX_BYTES=10, ROUTE_TABLE_PATH=self.path):
+            self.assertIsNone(get_route_table(get_graph()))
+            self.assertEqual(find_cheapest_route("SOL", "SIR")["total_hu"], 100)
+
+    def test_route_lookup(self):
+        with override_settings(ROUTE_TABLE_ENABLED=True, ROUTE_TABLE_PATH=self.path):
+            self.assertIsNotNone(get_route_table(get_graph()))
+            result = find_cheapest_route("sol", "sir")
+            self.assertEqual(result["path"], ["SOL", "SIR"])
+            self.assertEqual(result["total_hu"], 100)
+            self.assertEqual(result["cost_per_passenger_gbp"], 20.0)
+            self.assertIsNone(find_cheapest_route("SIR", "SOL"))
+
+    def test_save_and_load(self):
+        table = RouteTable.build(get_graph())
+        table.save(self.path)
+        loaded = RouteTable.load(self.path)
+        self.assertEqual(loaded.fingerprint, get_graph().fingerprint)
+        self.assertEqual(loaded.distances.tolist(), table.distances.tolist())
+        self.assertEqual(loaded.previous.tolist(), table.previous.tolist())
+
+    def test_build_route_table_command(self):
+        with override_settings(ROUTE_TABLE_ENABLED=True, ROUTE_TABLE_PATH=self.path):
+            call_command("build_route_table", stdout=StringIO())
+            self.assertTrue(self.path.exists())
+            self.assertEqual(RouteTable.load(self.path).fingerprint, get_graph().fingerprint)
+
+    def test_build_route_table_command_over_budget(self):
+        with override_settings(ROUTE_TABLE_MAX_BYTES=10, ROUTE_TABLE_PATH=self.path):
+            with self.assertRaises(CommandError):
+                call_command("build_route_table", stdout=StringIO())
@@ -0,0 +1,93 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from app.models import Gate, GateConnection
+from app.services.graph import GateGraph, get_graph, invalidate_graph, publish_snapshot
+from app.services.route_finder import find_cheapest_route
+
+
+class GraphSnapshotTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Gate.objects.create(id="SOL", name="Sol")
+            GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+            GateConnection.objects.create(source_id="SOL", target_id="SIR", hu=100)
+            Gate.objects.create(id="PRX", name="Proxima")
+            GateConnection.objects.create(source_id="PRX", target_id="SIR", hu=5)
+            Gate.objects.create(id="SIR", name="Sirius")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "gate_graph.snapshot"
+
+    def tearDown(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_graph()
+
+    def test_round_trip(self):
+        graph = GateGraph.from_db("v1")
+        graph.write_snapshot(self.path)
+        mapped = GateGraph.from_snapshot(self.path)
+        self.assertEqual(mapped.ids, graph.ids)
+        self.assertEqual(list(mapped.offsets), list(graph.offsets))
+        self.assertEqual(list(mapped.targets), list(graph.targets))
+        self.assertEqual(list(mapped.weights), list(graph.weights))
+        self.assertEqual(mapped.version, "v1")
+        self.assertEqual(mapped.fingerprint, graph.fingerprint)
+        self.assertIsInstance(mapped.offsets, memoryview)
+        self.assertTrue(mapped.offsets.readonly)
+
+    def test_rejects_corrupt_file(self):
+        GateGraph.from_db("v1").write_snapshot(self.path)
+        data = self.path.read_bytes()
+        self.path.write_bytes(data[:-3])
+        with self.assertRaises(ValueError):
+            GateGraph.from_snapshot(self.path)
+        self.path.write_bytes(b"not a snapshot" * 10)
+        with self.assertRaises(ValueError):
+            GateGraph.from_snapshot(self.path)
+
+    def test_workers_map_published_snapshot(self):
+        with override_settings(GRAPH_SNAPSHOT_PATH=self.path):
+            with self.captureOnCommitCallbacks(execute=True):
+                publish_snapshot(GateGraph.from_db("published"), self.path)
+            graph = get_graph()
+            self.assertIsNotNone(graph.snapshot)
+            self.assertEqual(graph.version, "published")
+            self.assertIs(get_graph(), graph)
+            self.assertEqual(find_cheapest_route("SOL", "SIR")["path"], ["SOL", "PRX", "SIR"])
+
+    def test_new_snapshot_swapped_in_without_restart(self):
+        with override_settings(GRAPH_SNAPSHOT_PATH=self.path):
+            with self.captureOnCommitCallbacks(execute=True):
+                publish_snapshot(GateGraph.from_db("first"), self.path)
+            self.assertEqual(get_graph().version, "first")
+
+            # Written by another process, which updates the file but not this process' cache
+            GateGraph.from_edges(["SOL", "SIR"], [("SOL", "SIR", 1)], "second").write_snapshot(self.path)
+            graph = get_graph()
+            self.assertEqual(graph.version, "second")
+            self.assertEqual(graph.ids, ["SIR", "SOL"])
+
+    def test_gate_write_removes_snapshot(self):
+        with override_settings(GRAPH_SNAPSHOT_PATH=self.path):
+            with self.captureOnCommitCallbacks(execute=True):
+                publish_snapshot(GateGraph.from_db("published"), self.path)
+            get_graph()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                GateConnection.objects.create(source_id="SIR", target_id="SOL", hu=1)
+                self.assertTrue(self.path.exists())
+            self.assertFalse(self.path.exists())
+            graph = get_graph()
+            self.assertIsNone(graph.snapshot)
+            self.assertEqual(graph.neighbors("SIR"), [("SOL", 1)])
+
+    def test_export_command(self):
+        with override_settings(GRAPH_SNAPSHOT_PATH=self.path):
+            call_command("export_graph_snapshot", stdout=StringIO())
+            graph = get_graph()
+            self.assertIsNotNone(graph.snapshot)
+            self.assertEqual(graph.fingerprint, GateGraph.from_db().fingerprint)
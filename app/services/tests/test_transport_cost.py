@@ -1,5 +1,7 @@
+import random
+
 from django.test import TestCase
-from app.services.transport_cost import cheapest_transport
+from app.services.transport_cost import cheapest_transport, cheapest_transport_bulk
 
 
 class TransportCostServiceTest(TestCase):
@@ -40,3 +42,44 @@ class TransportCostServiceTest(TestCase):
     def test_invalid_negative_parking(self):
         with self.assertRaises(ValueError):
             cheapest_transport(100, 2, -1)
+
+
+class TransportCostBulkServiceTest(TestCase):
+    def test_matches_scalar(self):
+        rng = random.Random(7)
+        rows = [
+            (round(rng.uniform(0, 5000), rng.randint(0, 3)), rng.randint(1, 5), rng.randint(0, 30))
+            for _ in range(2000)
+        ]
+        # Values on a half-cent boundary, where np.round and round() disagree
+        rows += [(1.005 / 0.45, 5, 0), (8.915, 2, 0), (0.125, 5, 0), (0.0, 1, 0)]
+
+        result = cheapest_transport_bulk(*zip(*rows))
+        for i, row in enumerate(rows):
+            expected = cheapest_transport(*row)
+            self.assertEqual(result["transport_type"][i], expected["transport_type"])
+            self.assertEqual(result["total_cost_gbp"][i], expected["total_cost_gbp"])
+            self.assertEqual(result["breakdown"]["fuel_cost"][i], expected["breakdown"]["fuel_cost"])
+            self.assertEqual(result["breakdown"]["parking_cost"][i], expected["breakdown"]["parking_cost"])
+
+    def test_tie_prefers_personal(self):
+        # Personal: 100 * 0.30 + 3 * 5 = 45, HSTC: 100 * 0.45 = 45
+        result = cheapest_transport_bulk([100], [2], [3])
+        self.assertEqual(result["transport_type"].tolist(), ["Personal"])
+
+    def test_broadcasts_scalars(self):
+        result = cheapest_transport_bulk([10, 100], 5, 0)
+        self.assertEqual(result["transport_type"].tolist(), ["HSTC", "HSTC"])
+        self.assertEqual(result["total_cost_gbp"].tolist(), [4.5, 45.0])
+
+    def test_invalid_row_reported(self):
+        with self.assertRaisesMessage(ValueError, "row 1: passengers must be >= 1"):
+            cheapest_transport_bulk([100, 100, -1], [2, 0, 2], [0, 0, 0])
+
+    def test_invalid_row_uses_scalar_check_order(self):
+        with self.assertRaisesMessage(ValueError, "row 0: distance must be >= 0"):
+            cheapest_transport_bulk([-1], [6], [-1])
+
+    def test_too_many_passengers(self):
+        with self.assertRaisesMessage(ValueError, "row 0: Too many passengers: max is 5"):
+            cheapest_transport_bulk([100], [6], [0])
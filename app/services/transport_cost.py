@@ -1,3 +1,5 @@
+import numpy as np
+
 from app.constants import (
     PERSONAL_TRANSPORT_COST_PER_AU,
     PERSONAL_TRANSPORT_PARKING_PER_DAY,
@@ -5,7 +7,9 @@ from app.constants import (
     HSTC_TRANSPORT_COST_PER_AU,
     HSTC_TRANSPORT_MAX_PASSENGERS,
 )
+from app.services.profiling import span
 
+@span("pricing")
 def cheapest_transport(distance_au: float, passengers: int, parking_days: int) -> dict:
     if distance_au < 0:
         raise ValueError("distance must be >= 0")
@@ -52,6 +56,68 @@ def cheapest_transport(distance_au: float, passengers: int, parking_days: int) -
         },
     }
 
-        
 
+@span("pricing")
+def cheapest_transport_bulk(distance_au, passengers, parking_days) -> dict:
+    """
+    Vectorized cheapest_transport over equal-length arrays (or scalars, which broadcast).
+
+    Returns arrays of the chosen transport type, total cost and cost breakdown,
+    matching cheapest_transport element by element, rounding included.
+    Raises ValueError for the first invalid row, with cheapest_transport's message.
+    """
+    distance_au, passengers, parking_days = np.broadcast_arrays(
+        np.asarray(distance_au, dtype=np.float64),
+        np.asarray(passengers, dtype=np.int64),
+        np.asarray(parking_days, dtype=np.int64),
+    )
+
+    checks = [
+        (distance_au < 0, "distance must be >= 0"),
+        (passengers < 1, "passengers must be >= 1"),
+        (parking_days < 0, "parking_days must be >= 0"),
+        (passengers > HSTC_TRANSPORT_MAX_PASSENGERS, f"Too many passengers: max is {HSTC_TRANSPORT_MAX_PASSENGERS}"),
+    ]
+    invalid = np.zeros(distance_au.shape, dtype=bool)
+    for failed, _ in checks:
+        invalid |= failed
+    if invalid.any():
+        row = int(np.flatnonzero(invalid)[0])
+        message = next(message for failed, message in checks if failed.flat[row])
+        raise ValueError(f"row {row}: {message}")
+
+    personal_fuel = distance_au * PERSONAL_TRANSPORT_COST_PER_AU
+    personal_parking = parking_days * PERSONAL_TRANSPORT_PARKING_PER_DAY
+    personal_total = personal_fuel + personal_parking
+    hstc_fuel = distance_au * HSTC_TRANSPORT_COST_PER_AU
+
+    # Personal wins ties, like min() over the options in cheapest_transport
+    personal = (passengers <= PERSONAL_TRANSPORT_MAX_PASSENGERS) & (personal_total <= hstc_fuel)
+
+    return {
+        "transport_type": np.where(personal, "Personal", "HSTC"),
+        "total_cost_gbp": _round_2(np.where(personal, personal_total, hstc_fuel)),
+        "breakdown": {
+            "fuel_cost": _round_2(np.where(personal, personal_fuel, hstc_fuel)),
+            "parking_cost": _round_2(np.where(personal, personal_parking, 0.0)),
+        },
+    }
+
+
+def _round_2(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 2 decimals exactly like Python's round(value, 2).
+
+    np.round scales by 100 and rounds half to even, so it can disagree with
+    round() for values sitting on (or, after scaling error, near) a half-cent
+    boundary, and for values too large to scale exactly. Those few are
+    re-rounded with round().
+    """
+    rounded = np.round(values, 2)
 
+    scaled = values * 100
+    distance_to_half = np.abs(scaled - np.floor(scaled) - 0.5)
+    suspect = (distance_to_half <= 1e-6 + np.abs(scaled) * 1e-14) | (np.abs(values) >= 2 ** 45)
+    if suspect.any():
+        rounded[suspect] = [round(value, 2) for value in values[suspect].tolist()]
+    return rounded
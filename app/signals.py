@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from app.models import Gate, GateConnection
+from app.services.graph import invalidate_graph, publish_connection_hu
+
+
+@receiver(post_save, sender=Gate)
+@receiver(post_delete, sender=Gate)
+@receiver(post_delete, sender=GateConnection)
+def invalidate_gate_graph(sender, **kwargs):
+    invalidate_graph()
+
+
+@receiver(pre_save, sender=GateConnection)
+def remember_connection_ends(sender, instance, **kwargs):
+    instance._saved_ends = (
+        GateConnection.objects.filter(pk=instance.pk).values_list("source_id", "target_id").first()
+        if instance.pk is not None else None
+    )
+
+
+@receiver(post_save, sender=GateConnection)
+def update_gate_graph(sender, instance, created, **kwargs):
+    # An HU edit is replayed on the compiled graphs, anything else recompiles them.
+    # Published on commit, so workers never replay a change that was rolled back.
+    if not created and instance._saved_ends == (instance.source_id, instance.target_id):
+        pk = instance.pk
+        transaction.on_commit(lambda: publish_connection_hu(pk) or invalidate_graph())
+        return
+    invalidate_graph()
@@ -1,16 +1,28 @@
 from django.test import TestCase
-from app.models import Gate
+from app.models import Gate, GateConnection
 
 
 class GateModelTest(TestCase):
     def setUp(self):
-        Gate.objects.create(
-            id="SOL",
-            name="Sol",
-            connections=[{"id": "PRX", "hu": "90"}, {"id": "RAN", "hu": "100"}]
-        )
+        Gate.objects.create(id="SOL", name="Sol")
+        GateConnection.objects.create(source_id="SOL", target_id="PRX", hu=90)
+        GateConnection.objects.create(source_id="SOL", target_id="RAN", hu=100)
 
     def test_gate_str(self):
         gate = Gate.objects.get(id="SOL")
         self.assertEqual(str(gate), "SOL - Sol")
 
+
+    def test_gate_connection_str(self):
+        connection = GateConnection.objects.get(source_id="SOL", target_id="PRX")
+        self.assertEqual(str(connection), "SOL -> PRX (90 HU)")
+
+    def test_connection_to_unknown_gate(self):
+        self.assertEqual(
+            list(Gate.objects.get(id="SOL").outgoing_connections.order_by("id").values_list("target_id", flat=True)),
+            ["PRX", "RAN"]
+        )
+
+    def test_connections_deleted_with_gate(self):
+        Gate.objects.get(id="SOL").delete()
+        self.assertFalse(GateConnection.objects.exists())
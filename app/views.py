@@ -1,3 +1,22 @@
-from django.shortcuts import render
+from django.http import HttpResponse
 
-# Create your views here.
+from app.services.profiling import metrics as request_metrics
+from app.services.quote_cache import quote_cache
+
+
+def metrics(request):
+    """
+    This worker's metrics in the Prometheus text format.
+
+    Request metrics are collected by ProfilingMiddleware (PROFILING_ENABLED);
+    quote cache counters are always reported.
+    """
+    quote_counts = [
+        ({"kind": kind, "outcome": {"hits": "hit", "misses": "miss"}[outcome]}, count)
+        for kind, counts in quote_cache.stats().items()
+        for outcome, count in counts.items()
+    ]
+    body = request_metrics.render(extra=[
+        ("interstellar_quote_cache_requests_total", "counter", "Quote cache lookups by outcome.", quote_counts),
+    ])
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
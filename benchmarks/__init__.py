@@ -0,0 +1,7 @@
+"""
+Benchmarks for the route planner hot paths.
+
+Run from the project root, e.g. ``python -m benchmarks.graph_cache``.
+Benchmarks that need gates create and destroy their own throwaway test
+database, so they never touch the data in the configured database.
+"""
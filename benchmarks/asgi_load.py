@@ -0,0 +1,170 @@
+"""
+Concurrency under load: synchronous views behind WSGI vs async views behind ASGI.
+
+    python -m benchmarks.asgi_load
+    python -m benchmarks.asgi_load --gates 5000 --db-latency-ms 5 --workers 2 --concurrency 32
+
+WSGI runs the DRF views with ``--workers`` requests in flight, like that many
+sync gunicorn workers. ASGI runs the async views (ASYNC_API_VIEWS) through
+Django's ASGI handler in one event loop with ``--concurrency`` requests in
+flight, like one uvicorn worker. Both go through the full middleware stack
+in-process (no network); ``--db-latency-ms`` adds a delay to every SQL query
+to stand in for a database server.
+"""
+import argparse
+import asyncio
+import random
+import time
+import types
+
+from benchmarks.common import benchmark_database, latency_stats, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+SCENARIOS = ("route", "gate_detail", "gates_list")
+
+
+def async_urlconf():
+    """
+    A root URLconf serving the API with the async views.
+    """
+    from django.urls import include, path
+    from app.api.v1.urls import api_urlpatterns
+
+    urlconf = types.ModuleType("asgi_load_urls")
+    urlconf.urlpatterns = [path("api/v1/", include(api_urlpatterns(async_views=True)))]
+    return urlconf
+
+
+def drive_asgi(make_request, requests: int, concurrency: int, seed: int = 0) -> dict:
+    """
+    Send ``requests`` GET requests to the ASGI application from ``concurrency`` tasks.
+    """
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+
+    async def get(path):
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+            "root_path": "", "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 0), "server": ("testserver", 80),
+        }
+        done = asyncio.Event()
+        received = False
+        status_code = None
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif not message.get("more_body"):
+                done.set()
+
+        await application(scope, receive, send)
+        return status_code
+
+    async def worker(index, count, latencies, errors):
+        rng = random.Random(seed + index)
+        for _ in range(count):
+            _, path, _ = make_request(rng)
+            start = time.perf_counter()
+            status_code = await get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors.append(status_code >= 500)
+
+    async def run():
+        latencies, errors = [], []
+        per_task = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+        await asyncio.gather(*(worker(i, count, latencies, errors) for i, count in enumerate(per_task)))
+        return latencies, errors
+
+    start = time.perf_counter()
+    latencies, errors = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    stats = latency_stats(latencies)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(errors),
+        "rps": requests / elapsed,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+        "mean_ms": stats["mean_ms"],
+        "max_ms": stats["max_ms"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=2000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario and server")
+    parser.add_argument("--workers", type=int, default=2, help="WSGI requests in flight (sync workers)")
+    parser.add_argument("--concurrency", type=int, default=32, help="ASGI requests in flight")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="delay added to every SQL query")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.conf import settings
+    from django.db.backends.signals import connection_created
+    from django.test.utils import override_settings
+    from app.services.graph import get_graph
+    from app.services.quote_cache import quote_cache
+    from benchmarks.load import drive, scenarios
+    from benchmarks.networks import network_rows, seed_gates
+    from benchmarks.results import save_results
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(args.db_latency_ms / 1000)
+        return execute(sql, params, many, context)
+
+    def add_latency(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delay)
+
+    servers = (
+        ("wsgi", args.workers, settings.ROOT_URLCONF, lambda make_request: drive(make_request, args.requests, args.workers)),
+        ("asgi", args.concurrency, async_urlconf(), lambda make_request: drive_asgi(make_request, args.requests, args.concurrency)),
+    )
+
+    results = []
+    with benchmark_database():
+        seed_gates(network_rows(args.gates, args.topology))
+        available = scenarios(list(get_graph().ids))
+        if args.db_latency_ms:
+            # Only connections opened from here on, i.e. those of the request threads
+            connection_created.connect(add_latency)
+        try:
+            for name in args.scenarios:
+                for server, in_flight, urlconf, run in servers:
+                    quote_cache.clear()
+                    with override_settings(ROOT_URLCONF=urlconf):
+                        stats = run(available[name])
+                    results.append({"name": name, "server": server, "db_latency_ms": args.db_latency_ms, **stats})
+                    print(f"  {name} {server} ({in_flight} in flight): {stats['rps']:.0f} req/s", flush=True)
+        finally:
+            connection_created.disconnect(add_latency)
+
+    print()
+    print_table(results, ["name", "server", "concurrency", "errors", "rps", "p50_ms", "p99_ms", "max_ms"])
+    if not args.no_save:
+        print(f"\nSaved {save_results('asgi_load', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import math
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "interstellar.settings")
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(fixtures=()):
+    """
+    Create a throwaway test database, optionally load fixtures, and drop it afterwards.
+    """
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        if fixtures:
+            call_command("loaddata", *fixtures, verbosity=0)
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(fn, rounds: int = 100, warmup: int = 5, before=None) -> dict:
+    """
+    Call ``fn`` repeatedly and return latency statistics in milliseconds.
+
+    ``before`` runs ahead of every round but outside the timed section.
+    """
+    for _ in range(warmup):
+        if before:
+            before()
+        fn()
+
+    samples = []
+    for _ in range(rounds):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return latency_stats(samples)
+
+
+def measure_for(fn, min_time: float = 0.5, max_rounds: int = 10_000, warmup: int = 5) -> dict:
+    """
+    Like ``measure`` but calibrated: run ``fn`` until ``min_time`` seconds
+    have been spent in it (at least 5 rounds, at most ``max_rounds``).
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    spent = 0.0
+    while len(samples) < max_rounds and (spent < min_time or len(samples) < 5):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        spent += elapsed
+        samples.append(elapsed * 1000)
+
+    return latency_stats(samples)
+
+
+def latency_stats(samples: list[float]) -> dict:
+    """
+    Summary statistics of latency samples given in milliseconds.
+    """
+    samples = sorted(samples)
+    mean = statistics.fmean(samples)
+    return {
+        "rounds": len(samples),
+        "min_ms": samples[0],
+        "mean_ms": mean,
+        "stddev_ms": statistics.pstdev(samples),
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": samples[-1],
+        "ops_per_s": 1000 / mean if mean else None,
+    }
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of already sorted samples.
+    """
+    rank = math.ceil(pct / 100 * len(sorted_samples))
+    return sorted_samples[min(max(rank, 1), len(sorted_samples)) - 1]
+
+
+def print_table(rows: list[dict], columns: list[str]) -> None:
+    widths = {c: max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(c)).ljust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
@@ -0,0 +1,59 @@
+"""
+Compare two saved benchmark result files and flag regressions.
+
+    python -m benchmarks.compare benchmarks/results/micro-abc123-....json benchmarks/results/micro-def456-....json
+
+Results are matched on their "name" and compared on --metric (default
+p50_ms, lower is better). Exits with status 1 if any result regressed by
+more than --threshold percent.
+"""
+import argparse
+import sys
+
+from benchmarks.common import print_table
+from benchmarks.results import load_results
+
+
+def compare(baseline: dict, current: dict, metric: str, threshold: float) -> tuple[list[dict], bool]:
+    before = {r["name"]: r for r in baseline["results"] if "name" in r}
+    rows = []
+    regressed = False
+    for result in current["results"]:
+        old = before.get(result.get("name"))
+        if old is None or old.get(metric) is None or result.get(metric) is None:
+            continue
+        change = (result[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+        flag = change > threshold
+        regressed |= flag
+        rows.append({
+            "name": result["name"],
+            "before": old[metric],
+            "after": result[metric],
+            "change_%": change,
+            "status": "REGRESSION" if flag else ("faster" if change < -threshold else "ok"),
+        })
+    return rows, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change treated as a regression")
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+    rows, regressed = compare(baseline, current, args.metric, args.threshold)
+
+    print(f"{baseline['environment'].get('commit')} -> {current['environment'].get('commit')} ({args.metric})")
+    if rows:
+        print_table(rows, ["name", "before", "after", "change_%", "status"])
+    else:
+        print("No matching results")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
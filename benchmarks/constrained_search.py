@@ -0,0 +1,69 @@
+"""
+Constrained route search (hop limit, per-leg HU limit, avoided gates) vs plain Dijkstra.
+
+    python -m benchmarks.constrained_search
+    python -m benchmarks.constrained_search --gates 20000 --topology grid --queries 50
+
+Runs on a compiled synthetic graph (no database). The hop limit of each
+query is the hop count of its unconstrained cheapest route minus
+``--hop-slack``, so the constrained search has to find a different route.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import latency_stats, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=5000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--avoid", type=float, default=0.02, help="fraction of gates avoided")
+    parser.add_argument("--hop-slack", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.constrained import constrained_route
+    from app.services.engine import dijkstra
+    from benchmarks.networks import network_graph
+
+    graph = network_graph(args.gates, args.topology)
+    rng = random.Random(0)
+    blocked = set(rng.sample(range(len(graph)), int(len(graph) * args.avoid)))
+    weights = sorted(graph.weights)
+    max_leg_hu = weights[int(len(weights) * 0.9)]
+
+    queries = []
+    while len(queries) < args.queries:
+        source, target = rng.sample(range(len(graph)), 2)
+        route = dijkstra(graph, source, target).route(target)
+        if route is not None and len(route[0]) - 1 > args.hop_slack + 1:
+            queries.append((source, target, len(route[0]) - 1 - args.hop_slack))
+
+    cases = {
+        "dijkstra": lambda s, t, hops: dijkstra(graph, s, t).settled,
+        "avoid gates": lambda s, t, hops: constrained_route(graph, s, t, blocked_nodes=blocked)[1],
+        "max leg HU": lambda s, t, hops: constrained_route(graph, s, t, max_leg_hu=max_leg_hu)[1],
+        "max hops": lambda s, t, hops: constrained_route(graph, s, t, max_hops=hops)[1],
+        "all": lambda s, t, hops: constrained_route(graph, s, t, hops, max_leg_hu, blocked)[1],
+    }
+    rows = []
+    for name, search in cases.items():
+        samples = []
+        settled = 0
+        for source, target, hops in queries:
+            start = time.perf_counter()
+            settled += search(source, target, hops)
+            samples.append((time.perf_counter() - start) * 1000)
+        rows.append({"search": name, **latency_stats(samples), "settled": settled // len(queries)})
+
+    print(f"gates={len(graph)} topology={args.topology} edges={graph.edge_count} max_leg_hu={max_leg_hu}")
+    print_table(rows, ["search", "rounds", "p50_ms", "mean_ms", "p99_ms", "settled"])
+
+
+if __name__ == "__main__":
+    main()
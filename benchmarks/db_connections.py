@@ -0,0 +1,77 @@
+"""
+Per-request database latency: a new connection per request vs persistent connections vs a psycopg pool.
+
+    docker-compose up -d db
+    DB_NAME=interstellar DB_USER=postgres DB_PASSWORD=... python -m benchmarks.db_connections
+    python -m benchmarks.db_connections --queries 3 --rounds 500
+
+Needs the Postgres database of the DB_* settings (e.g. the docker-compose
+"db" service); a throwaway test database is created on it. Each round is
+one request's database work as Django does it: close_old_connections() when
+the request starts, ``--queries`` gate lookups, close_old_connections()
+when it finishes. The three rows use the default connection settings
+(CONN_MAX_AGE=0), DB_CONN_MAX_AGE with health checks, and DB_POOL.
+"""
+import argparse
+import random
+
+from benchmarks.common import benchmark_database, measure, print_table, setup_django
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=1, help="queries per request")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.db import close_old_connections, connections
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    from app.models import Gate
+    from benchmarks.networks import network_rows, seed_gates
+
+    if connections["default"].vendor != "postgresql":
+        parser.error("needs a PostgreSQL default database (see the DB_* settings)")
+
+    profiles = {
+        "connect per request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+        "persistent": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+    }
+    if is_psycopg3:
+        profiles["pool"] = {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": {"pool": {"min_size": 1, "max_size": 4}}}
+    else:
+        print("psycopg 3 is not installed, skipping the pool")
+
+    rows = []
+    with benchmark_database():
+        seed_gates(network_rows(args.gates))
+        gate_ids = list(Gate.objects.values_list("id", flat=True))
+        rng = random.Random(0)
+
+        default = connections["default"].settings_dict
+        for alias, overrides in profiles.items():
+            database = {**default, **overrides, "OPTIONS": {**default["OPTIONS"], **overrides.get("OPTIONS", {})}}
+            connections.settings[alias] = connections.configure_settings({"default": default, alias: database})[alias]
+
+            def request():
+                close_old_connections()
+                for _ in range(args.queries):
+                    Gate.objects.using(alias).filter(id=rng.choice(gate_ids)).values_list("id", "name").first()
+                close_old_connections()
+
+            try:
+                rows.append({"connections": alias, **measure(request, args.rounds)})
+            finally:
+                connections[alias].close()
+                if "pool" in database["OPTIONS"]:
+                    connections[alias].close_pool()
+            print(f"  {alias}: p50 {rows[-1]['p50_ms']:.3f} ms", flush=True)
+
+    print(f"\ngates={args.gates} queries_per_request={args.queries}")
+    print_table(rows, ["connections", "rounds", "min_ms", "p50_ms", "mean_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Heap-based routing engine scaling on synthetic networks.
+
+    python -m benchmarks.engine_scaling
+    python -m benchmarks.engine_scaling --sizes 10000 100000 --queries 20
+
+The original min-scan search is timed alongside for sizes up to
+``--legacy-max`` gates; beyond that it takes minutes per query.
+"""
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks.common import measure, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def min_scan_search(graph, origin, destination):
+    """The pre-engine O(V^2) search, over the same compiled graph."""
+    distances = {node: float("inf") for node in range(len(graph))}
+    distances[origin] = 0
+    unvisited = set(distances)
+    while unvisited:
+        current = min(unvisited, key=lambda node: distances[node])
+        if distances[current] == float("inf") or current == destination:
+            break
+        unvisited.remove(current)
+        for edge in range(graph.offsets[current], graph.offsets[current + 1]):
+            neighbor = graph.targets[edge]
+            if neighbor in unvisited and distances[current] + graph.weights[edge] < distances[neighbor]:
+                distances[neighbor] = distances[current] + graph.weights[edge]
+    return distances[destination]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--legacy-max", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.engine import dijkstra
+    from benchmarks.networks import network_graph
+
+    rows = []
+    for n in args.sizes:
+        start = time.perf_counter()
+        graph = network_graph(n, args.topology)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(n)
+        pairs = [tuple(rng.sample(range(n), 2)) for _ in range(args.queries)]
+
+        engine_pairs = itertools.cycle(pairs)
+        legacy_pairs = itertools.cycle(pairs)
+
+        def engine():
+            dijkstra(graph, *next(engine_pairs))
+
+        def legacy():
+            min_scan_search(graph, *next(legacy_pairs))
+
+        row = {"gates": n, "edges": graph.edge_count, "build_ms": build_ms}
+        row.update({f"heap_{k}": v for k, v in measure(engine, args.queries, warmup=0).items() if k in ("p50_ms", "max_ms")})
+
+        if n <= args.legacy_max:
+            row["min_scan_p50_ms"] = measure(legacy, min(args.queries, 5), warmup=0)["p50_ms"]
+        rows.append(row)
+        print(f"{n} gates done", flush=True)
+
+    print_table(rows, ["gates", "edges", "build_ms", "heap_p50_ms", "heap_max_ms", "min_scan_p50_ms"])
+
+
+if __name__ == "__main__":
+    main()
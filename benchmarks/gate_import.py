@@ -0,0 +1,105 @@
+"""
+Seeding a network: `loaddata` fixtures vs streaming `import_gates`.
+
+    python -m benchmarks.gate_import
+    python -m benchmarks.gate_import --gates 40000 --chunk-size 5000
+
+Every method loads the same synthetic network into an empty database, once
+timed and once under tracemalloc for the peak heap (tracing slows Python
+down, so the two are separate runs). ``loaddata`` deserializes the whole
+fixture and saves one row at a time, each save sending model signals.
+``import_gates`` streams the file and writes in chunks. ``export_gates`` is
+measured on the network the NDJSON import loaded.
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.common import benchmark_database, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=5000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.core.management import call_command
+    from app.services.gate_io import GateRecord, write_gates
+    from benchmarks.networks import network_rows
+
+    rows = network_rows(args.gates, args.topology)
+    records = [
+        GateRecord(gate_id, gate_id, [(conn["id"], int(conn["hu"])) for conn in connections])
+        for gate_id, connections in rows
+    ]
+    connection_count = sum(len(record.connections) for record in records)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        for format in ("ndjson", "csv"):
+            files[format] = Path(tmp) / f"gates.{format}"
+            with open(files[format], "w", newline="") as f:
+                write_gates(records, f, format)
+        fixture = Path(tmp) / "gates.json"
+        pk = iter(range(1, connection_count + 1))
+        fixture.write_text(json.dumps(
+            [{"model": "app.gate", "pk": r.id, "fields": {"name": r.name}} for r in records]
+            + [
+                {"model": "app.gateconnection", "pk": next(pk), "fields": {"source": r.id, "target": t, "hu": hu}}
+                for r in records for t, hu in r.connections
+            ]
+        ))
+        del records, rows
+
+        methods = [
+            ("loaddata", lambda: call_command("loaddata", str(fixture), verbosity=0)),
+            *(
+                (f"import_gates {format}", lambda path=path: call_command(
+                    "import_gates", str(path), "--chunk-size", str(args.chunk_size), stdout=StringIO(),
+                ))
+                for format, path in files.items()
+            ),
+        ]
+
+        export = lambda: call_command("export_gates", "--output", str(Path(tmp) / "export.ndjson"), stdout=StringIO())
+        total = args.gates + connection_count
+        results = []
+        for name, run in methods:
+            timed, traced = {}, {}
+            for traced_run, measured in ((False, timed), (True, traced)):
+                with benchmark_database():
+                    measured[name] = _measure(run, total, traced_run)
+                    if name == "import_gates ndjson":
+                        measured["export_gates ndjson"] = _measure(export, total, traced_run)
+            for method, stats in timed.items():
+                results.append({"method": method, **stats, "peak_heap_mb": traced[method]["peak_heap_mb"]})
+                print(f"  {method}: {stats['rows_per_s']:.0f} rows/s", flush=True)
+
+    print(f"\ngates={args.gates} connections={connection_count} topology={args.topology}")
+    print_table(results, ["method", "seconds", "rows_per_s", "peak_heap_mb"])
+
+
+def _measure(run, rows: int, traced: bool) -> dict:
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    if not traced:
+        return {"seconds": seconds, "rows_per_s": rows / seconds}
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"peak_heap_mb": peak / 2**20}
+
+
+if __name__ == "__main__":
+    main()
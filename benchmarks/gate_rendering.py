@@ -0,0 +1,88 @@
+"""
+Gate list and gate detail rendering: DRF serializers vs pre-rendered JSON.
+
+    python -m benchmarks.gate_rendering
+    python -m benchmarks.gate_rendering --gates 50000 --rounds 20
+
+"serializers" is what GatesListView and GateDetailView did before: model
+instances through GateListSerializer / GateDetailSerializer and DRF's
+JSONRenderer. "cold" reads the gate index and renders for a new graph
+version, "warm" serves the bytes already rendered for the current one, and
+"request" is the full view through the test client ("detail 404" asks for
+an unknown gate, answered from the gate index). The detail rows are
+averaged over every gate.
+"""
+import argparse
+import itertools
+
+from benchmarks.common import benchmark_database, measure, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=10000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework.renderers import JSONRenderer
+    from app.api.v1.rendering import RenderedGates, orjson
+    from app.api.v1.serializers import GateDetailSerializer, GateListSerializer
+    from app.models import Gate
+    from benchmarks.networks import network_rows, seed_gates
+
+    rows = []
+    with benchmark_database():
+        seed_gates(network_rows(args.gates, args.topology))
+        gate_ids = list(Gate.objects.order_by("id").values_list("id", flat=True))
+        client = Client()
+
+        def serializer_list():
+            JSONRenderer().render(GateListSerializer(Gate.objects.order_by("id"), many=True).data)
+
+        def serializer_details():
+            for gate in Gate.objects.order_by("id"):
+                JSONRenderer().render(GateDetailSerializer(gate).data)
+
+        versions = (f"benchmark-{i}" for i in itertools.count())
+
+        def rendered_details(rendered):
+            for gate_id in gate_ids:
+                rendered.gate_detail(gate_id)
+
+        rows.append({"endpoint": "list", "path": "serializers", **measure(serializer_list, args.rounds)})
+        rows.append({"endpoint": "detail", "path": "serializers", **measure(serializer_details, 1)})
+        for renderer in ("json", "orjson") if orjson is not None else ("json",):
+            with override_settings(API_ORJSON=renderer == "orjson"):
+                rows.append({"endpoint": "list", "path": f"cold {renderer}", **measure(
+                    lambda: RenderedGates(next(versions)).gates_page(), args.rounds
+                )})
+                rows.append({"endpoint": "detail", "path": f"cold {renderer}", **measure(
+                    lambda: rendered_details(RenderedGates(next(versions))), 1
+                )})
+        warm = RenderedGates(next(versions))
+        rows.append({"endpoint": "list", "path": "warm", **measure(warm.gates_page, args.rounds)})
+        rows.append({"endpoint": "detail", "path": "warm", **measure(lambda: rendered_details(warm), 1)})
+        rows.append({"endpoint": "list", "path": "request", **measure(lambda: client.get("/api/v1/gates/"), args.rounds)})
+        rows.append({"endpoint": "list page", "path": "request", **measure(
+            lambda: client.get(f"/api/v1/gates/?limit=100&after={gate_ids[len(gate_ids) // 2]}"), args.rounds
+        )})
+        rows.append({"endpoint": "detail 404", "path": "request", **measure(
+            lambda: client.get("/api/v1/gates/-/"), args.rounds
+        )})
+
+    for row in rows:
+        if row["endpoint"] == "detail":
+            for key in ("min_ms", "p50_ms", "mean_ms", "p99_ms", "max_ms"):
+                row[key] /= len(gate_ids)
+    print(f"gates={len(gate_ids)}")
+    print_table(rows, ["endpoint", "path", "rounds", "min_ms", "p50_ms", "mean_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
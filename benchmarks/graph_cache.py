@@ -0,0 +1,50 @@
+"""
+Per-request RouteView latency with a cold and a warm compiled-graph cache.
+
+    python -m benchmarks.graph_cache
+    python -m benchmarks.graph_cache --gates 5000 --rounds 200
+"""
+import argparse
+import random
+
+from benchmarks.common import benchmark_database, measure, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=0, help="synthetic network size (default: initial_gates fixture)")
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.test import Client
+    from app.services.graph import get_graph, invalidate_graph
+    from benchmarks.networks import network_rows, seed_gates
+
+    fixtures = () if args.gates else ("initial_gates",)
+    with benchmark_database(fixtures):
+        if args.gates:
+            seed_gates(network_rows(args.gates, args.topology))
+
+        gate_ids = list(get_graph().ids)
+        rng = random.Random(0)
+        client = Client()
+
+        def request():
+            origin, destination = rng.sample(gate_ids, 2)
+            client.get(f"/api/v1/gates/{origin}/to/{destination}/")
+
+        rows = [
+            {"cache": "cold", **measure(request, args.rounds, before=invalidate_graph)},
+            {"cache": "warm", **measure(request, args.rounds)},
+        ]
+
+    print(f"gates={len(gate_ids)}")
+    print_table(rows, ["cache", "rounds", "min_ms", "p50_ms", "mean_ms", "p99_ms", "max_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Graph load time and per-process heap: compiling from the database vs mapping a snapshot.
+
+    python -m benchmarks.graph_snapshot
+    python -m benchmarks.graph_snapshot --gates 40000 --topology grid
+
+Heap is what tracemalloc sees after loading, i.e. memory private to each
+worker. Mapped snapshot pages are shared page cache and do not count.
+"""
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import benchmark_database, measure, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=10000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.engine import dijkstra
+    from app.services.graph import GateGraph
+    from benchmarks.networks import network_rows, seed_gates
+
+    with benchmark_database(), tempfile.TemporaryDirectory() as tmp:
+        seed_gates(network_rows(args.gates, args.topology))
+        path = Path(tmp) / "gate_graph.snapshot"
+        GateGraph.from_db("benchmark").write_snapshot(path)
+        snapshot_bytes = path.stat().st_size
+
+        rows = []
+        for source, load in (("database", lambda: GateGraph.from_db("benchmark")), ("snapshot", lambda: GateGraph.from_snapshot(path))):
+            tracemalloc.start()
+            graph = load()
+            heap_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            rows.append({
+                "source": source,
+                "heap_mb": heap_bytes / 2**20,
+                **measure(load, args.rounds),
+                "search_ms": measure(lambda: dijkstra(graph, 0), 3)["p50_ms"],
+            })
+
+    print(f"gates={args.gates} topology={args.topology} snapshot={snapshot_bytes} bytes")
+    print_table(rows, ["source", "heap_mb", "rounds", "p50_ms", "max_ms", "search_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Route table and landmarks after a connection HU edit: incremental update vs rebuild.
+
+    python -m benchmarks.incremental_update
+    python -m benchmarks.incremental_update --gates 3000 --topology grid --edits 50
+
+Each edit raises or lowers one random connection's HU by up to half. The
+incremental side is ``GateGraph.with_weight``, which carries the reversed
+graph, route table and landmarks over to the new graph (what a worker does
+when it replays a published HU edit); the rebuild side builds them from
+scratch, as a worker did before. Both run on a compiled synthetic graph (no
+database).
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import latency_stats, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=1000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--rebuilds", type=int, default=2, help="full rebuilds timed for the baseline")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.landmarks import Landmarks
+    from app.services.route_table import RouteTable
+    from benchmarks.networks import network_graph
+
+    def rebuild(graph):
+        graph.reversed()
+        graph.memo("route_table", lambda: RouteTable.build(graph))
+        graph.memo(("landmarks", args.landmarks), lambda: Landmarks.build(graph, args.landmarks))
+        return graph
+
+    rng = random.Random(0)
+    graph = network_graph(args.gates, args.topology)
+    start = time.perf_counter()
+    rebuild(graph)
+    rebuild_samples = [(time.perf_counter() - start) * 1000]
+
+    samples = {"raise": [], "lower": []}
+    for _ in range(args.edits):
+        edge = rng.randrange(graph.edge_count)
+        old_hu = graph.weights[edge]
+        kind = rng.choice(["raise", "lower"])
+        hu = old_hu + rng.randint(1, old_hu // 2 + 1) if kind == "raise" else max(1, old_hu - rng.randint(1, old_hu // 2 + 1))
+        start = time.perf_counter()
+        graph = graph.with_weight(edge, hu)
+        samples[kind].append((time.perf_counter() - start) * 1000)
+
+    for _ in range(args.rebuilds - 1):
+        fresh = network_graph(args.gates, args.topology)
+        start = time.perf_counter()
+        rebuild(fresh)
+        rebuild_samples.append((time.perf_counter() - start) * 1000)
+
+    rebuild_ms = latency_stats(rebuild_samples)["p50_ms"]
+    rows = [{"update": "rebuild", **latency_stats(rebuild_samples), "speedup": 1.0}]
+    for kind, kind_samples in samples.items():
+        if kind_samples:
+            stats = latency_stats(kind_samples)
+            rows.append({"update": f"incremental {kind}", **stats, "speedup": rebuild_ms / stats["p50_ms"]})
+
+    print(f"gates={args.gates} topology={args.topology} edges={graph.edge_count} landmarks={args.landmarks}")
+    print_table(rows, ["update", "rounds", "p50_ms", "p99_ms", "max_ms", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
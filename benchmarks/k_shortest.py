@@ -0,0 +1,55 @@
+"""
+Cost of k-shortest alternative routes (Yen's algorithm) as k grows.
+
+    python -m benchmarks.k_shortest
+    python -m benchmarks.k_shortest --sizes 10000 100000 --ks 1 2 4 8 16 --topology grid
+
+Runs on compiled synthetic graphs (no database), timing the same random
+origin/destination pairs for every k.
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--ks", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--pairs", type=int, default=10, help="origin/destination pairs per size")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.k_shortest import k_shortest_paths
+    from benchmarks.networks import network_graph
+
+    rows = []
+    for size in args.sizes:
+        graph = network_graph(size, args.topology)
+        rng = random.Random(0)
+        pairs = [tuple(rng.sample(range(size), 2)) for _ in range(args.pairs)]
+        for k in args.ks:
+            queue = iter(pairs)
+            found = []
+            stats = measure(lambda: found.append(len(k_shortest_paths(graph, *next(queue), k))), len(pairs), warmup=0)
+            rows.append({
+                "gates": size,
+                "k": k,
+                "routes": sum(found) / len(found),
+                "p50_ms": stats["p50_ms"],
+                "mean_ms": stats["mean_ms"],
+                "max_ms": stats["max_ms"],
+                "ms_per_route": stats["mean_ms"] * len(found) / max(sum(found), 1),
+            })
+            print(f"  {size} gates, k={k}: {stats['mean_ms']:.1f} ms", flush=True)
+
+    print()
+    print_table(rows, ["gates", "k", "routes", "p50_ms", "mean_ms", "max_ms", "ms_per_route"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+In-process load driver for the API views.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --gates 5000 --requests 2000 --concurrency 4 --scenarios route journey
+
+Requests go through the Django test client (full middleware and DRF stack,
+no network). Reports p50/p99 latency and requests per second per scenario
+and saves them as JSON.
+"""
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import benchmark_database, latency_stats, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def scenarios(gate_ids):
+    """
+    Scenario name -> function(rng) returning (method, path, body).
+    """
+    def route(rng):
+        origin, destination = rng.sample(gate_ids, 2)
+        return "get", f"/api/v1/gates/{origin}/to/{destination}/", None
+
+    def transport(rng):
+        return "get", f"/api/v1/transport/{rng.randint(0, 5000)}/?passengers={rng.randint(1, 5)}&parking={rng.randint(0, 30)}", None
+
+    def journey(rng):
+        origin, destination = rng.sample(gate_ids, 2)
+        return "get", (
+            f"/api/v1/journeys/?origin={origin}&destination={destination}"
+            f"&distance_au={rng.randint(0, 5000)}&passengers={rng.randint(1, 5)}"
+        ), None
+
+    def gate_detail(rng):
+        return "get", f"/api/v1/gates/{rng.choice(gate_ids)}/", None
+
+    def gates_list(rng):
+        return "get", "/api/v1/gates/", None
+
+    def route_batch(rng):
+        routes = [dict(zip(("origin", "destination"), rng.sample(gate_ids, 2))) for _ in range(50)]
+        return "post", "/api/v1/routes/batch/", {"routes": routes}
+
+    return {
+        "route": route,
+        "transport": transport,
+        "journey": journey,
+        "gate_detail": gate_detail,
+        "gates_list": gates_list,
+        "route_batch": route_batch,
+    }
+
+
+def drive(make_request, requests: int, concurrency: int, seed: int = 0) -> dict:
+    """
+    Send ``requests`` requests from ``concurrency`` threads, each with its own client.
+    """
+    from django.db import connections
+    from django.test import Client
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(index, count):
+        client = Client()
+        rng = random.Random(seed + index)
+        samples = []
+        failures = 0
+        for _ in range(count):
+            method, path, body = make_request(rng)
+            start = time.perf_counter()
+            if method == "post":
+                response = client.post(path, body, content_type="application/json")
+            else:
+                response = client.get(path)
+            samples.append((time.perf_counter() - start) * 1000)
+            failures += response.status_code >= 500
+        with lock:
+            latencies.extend(samples)
+            errors.append(failures)
+        connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(i, count)) for i, count in enumerate(per_thread)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stats = latency_stats(latencies)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(errors),
+        "rps": requests / elapsed,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+        "mean_ms": stats["mean_ms"],
+        "max_ms": stats["max_ms"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=0, help="synthetic network size (default: initial_gates fixture)")
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--scenarios", nargs="+", default=None, help="default: all")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--no-quote-cache", action="store_true", help="disable the quote cache while driving load")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.test.utils import override_settings
+    from app.services.graph import get_graph
+    from benchmarks.networks import network_rows, seed_gates
+    from benchmarks.results import save_results
+
+    results = []
+    fixtures = () if args.gates else ("initial_gates",)
+    with benchmark_database(fixtures), override_settings(QUOTE_CACHE_ENABLED=not args.no_quote_cache):
+        if args.gates:
+            seed_gates(network_rows(args.gates, args.topology))
+
+        available = scenarios(list(get_graph().ids))
+        for name in args.scenarios or available:
+            stats = drive(available[name], args.requests, args.concurrency)
+            results.append({"name": name, **stats})
+            print(f"  {name}: {stats['rps']:.0f} req/s", flush=True)
+
+    print()
+    print_table(results, ["name", "requests", "concurrency", "errors", "rps", "p50_ms", "p99_ms", "max_ms"])
+    if not args.no_save:
+        print(f"\nSaved {save_results('load', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Micro-benchmarks for the route and transport hot paths.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter find_cheapest_route --sizes small medium --topologies grid
+    python -m benchmarks.micro --output baseline.json
+
+Each benchmark is calibrated to run for at least --min-time seconds. Results
+are printed and saved as JSON (see benchmarks/results.py) for comparison
+with ``python -m benchmarks.compare``.
+"""
+import argparse
+import itertools
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import benchmark_database, measure_for, print_table, setup_django
+from benchmarks.networks import SIZES, TOPOLOGIES
+
+
+BENCHMARKS = []
+
+
+def benchmark(group: str, network: bool = False):
+    """
+    Register a benchmark. The decorated function returns the callable to time.
+
+    Network benchmarks are called with the list of gate IDs once the
+    synthetic network for each size/topology has been seeded.
+    """
+    def register(setup):
+        BENCHMARKS.append({"name": setup.__name__.removeprefix("bench_"), "group": group, "network": network, "setup": setup})
+        return setup
+    return register
+
+
+@benchmark("transport")
+def bench_cheapest_transport():
+    from app.services.transport_cost import cheapest_transport
+
+    rng = random.Random(0)
+    rows = itertools.cycle([(rng.uniform(0, 5000), rng.randint(1, 5), rng.randint(0, 30)) for _ in range(1000)])
+    return lambda: cheapest_transport(*next(rows))
+
+
+@benchmark("transport")
+def bench_cheapest_transport_bulk_1000():
+    import numpy as np
+    from app.services.transport_cost import cheapest_transport_bulk
+
+    rng = np.random.default_rng(0)
+    distance_au = rng.uniform(0, 5000, 1000)
+    passengers = rng.integers(1, 6, 1000)
+    parking_days = rng.integers(0, 30, 1000)
+    return lambda: cheapest_transport_bulk(distance_au, passengers, parking_days)
+
+
+@benchmark("route", network=True)
+def bench_find_cheapest_route(gate_ids):
+    from app.services.route_finder import find_cheapest_route
+
+    pairs = _random_pairs(gate_ids)
+    return lambda: find_cheapest_route(*next(pairs))
+
+
+@benchmark("route", network=True)
+def bench_find_cheapest_route_bidirectional(gate_ids):
+    from app.services.route_finder import find_cheapest_route
+
+    pairs = _random_pairs(gate_ids)
+    return lambda: find_cheapest_route(*next(pairs), strategy="bidirectional")
+
+
+@benchmark("route", network=True)
+def bench_find_cheapest_route_astar(gate_ids):
+    from app.services.route_finder import find_cheapest_route
+
+    pairs = _random_pairs(gate_ids)
+    find_cheapest_route(*next(pairs), strategy="astar")  # select landmarks outside the timing
+    return lambda: find_cheapest_route(*next(pairs), strategy="astar")
+
+
+@benchmark("route", network=True)
+def bench_find_cheapest_route_ch(gate_ids):
+    from django.test.utils import override_settings
+    from app.services.contraction import ContractionHierarchy
+    from app.services.graph import get_graph
+    from app.services.route_finder import find_cheapest_route
+
+    # Requests only use a hierarchy built offline; it stays the
+    # ROUTE_CH_PATH of the returned function, which runs after this returns
+    path = Path(tempfile.mkdtemp()) / "contraction_hierarchy.npz"
+    ContractionHierarchy.build(get_graph()).save(path)
+    override_settings(ROUTE_CH_PATH=path).enable()
+    pairs = _random_pairs(gate_ids)
+    return lambda: find_cheapest_route(*next(pairs), strategy="ch")
+
+
+@benchmark("route", network=True)
+def bench_find_cheapest_route_cold_graph(gate_ids):
+    from app.services.graph import invalidate_graph
+    from app.services.route_finder import find_cheapest_route
+
+    pairs = _random_pairs(gate_ids)
+
+    def run():
+        invalidate_graph()
+        find_cheapest_route(*next(pairs))
+    return run
+
+
+@benchmark("route", network=True)
+def bench_find_cheapest_routes_100(gate_ids):
+    from app.services.route_finder import find_cheapest_routes
+
+    pairs = _random_pairs(gate_ids)
+    return lambda: find_cheapest_routes([next(pairs) for _ in range(100)])
+
+
+def _random_pairs(gate_ids, seed: int = 0):
+    rng = random.Random(seed)
+    return itertools.cycle([tuple(rng.sample(gate_ids, 2)) for _ in range(1000)])
+
+
+def _reset_network(rows):
+    from app.models import Gate, GateConnection
+    from benchmarks.networks import seed_gates
+
+    GateConnection.objects.all().delete()
+    Gate.objects.all().delete()
+    seed_gates(rows)
+
+
+def run(selected, sizes, topologies, min_time) -> list[dict]:
+    from benchmarks.networks import network_rows
+
+    results = []
+
+    def record(bench, fn, **labels):
+        suffix = "".join(f"[{value}]" for value in labels.values())
+        stats = measure_for(fn, min_time=min_time)
+        results.append({"name": bench["name"] + suffix, "group": bench["group"], **labels, **stats})
+        print(f"  {results[-1]['name']}: p50 {stats['p50_ms']:.3f} ms", flush=True)
+
+    for bench in (b for b in selected if not b["network"]):
+        record(bench, bench["setup"]())
+
+    network_benchmarks = [b for b in selected if b["network"]]
+    if network_benchmarks:
+        with benchmark_database():
+            for topology, size in itertools.product(topologies, sizes):
+                rows = network_rows(SIZES[size], topology)
+                _reset_network(rows)
+                gate_ids = [gate_id for gate_id, _ in rows]
+                for bench in network_benchmarks:
+                    record(bench, bench["setup"](gate_ids), topology=topology, size=size)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--topologies", nargs="+", choices=sorted(TOPOLOGIES), default=["random", "grid"])
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from benchmarks.results import save_results
+
+    selected = [b for b in BENCHMARKS if args.filter in b["name"]]
+    results = run(selected, args.sizes, args.topologies, args.min_time)
+
+    print()
+    print_table(results, ["name", "rounds", "min_ms", "p50_ms", "mean_ms", "stddev_ms", "p99_ms", "ops_per_s"])
+    if not args.no_save:
+        print(f"\nSaved {save_results('micro', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
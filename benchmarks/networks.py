@@ -0,0 +1,170 @@
+"""
+Synthetic gate networks for benchmarks.
+
+Every topology is a generator yielding one list of (target_index, hu) pairs
+per gate, so large networks can be compiled without materializing rows.
+"""
+import math
+import random
+import string
+
+
+# Digits first so fixed-width codes sort in generation order
+ID_ALPHABET = string.digits + string.ascii_uppercase
+
+# Gate.id is 3 characters, so a seeded network has at most 36**3 = 46,656 gates
+SIZES = {
+    "small": 1_000,
+    "medium": 10_000,
+    "large": 40_000,
+}
+
+
+def gate_ids(n: int, width: int = 3, max_width: int | None = None) -> list[str]:
+    """
+    Generate ``n`` distinct gate codes, ``width`` characters wide where possible.
+
+    Codes grow wider for larger ``n``; raises ValueError if that would take
+    them past ``max_width``.
+    """
+    base = len(ID_ALPHABET)
+    while base ** width < n:
+        width += 1
+    if max_width is not None and width > max_width:
+        raise ValueError(f"{n} gates need codes wider than {max_width} characters (at most {base ** max_width} gates)")
+
+    ids = []
+    for i in range(n):
+        chars = []
+        for _ in range(width):
+            i, r = divmod(i, base)
+            chars.append(ID_ALPHABET[r])
+        ids.append("".join(reversed(chars)))
+    return ids
+
+
+def random_adjacency(n: int, rng: random.Random, max_hu: int = 500, degree: int = 4):
+    """
+    Ring of ``n`` gates plus ``degree - 1`` random outgoing chords per gate.
+
+    The ring keeps every gate reachable.
+    """
+    for i in range(n):
+        edges = [((i + 1) % n, rng.randint(1, max_hu))]
+        for _ in range(degree - 1):
+            edges.append((rng.randrange(n), rng.randint(1, max_hu)))
+        yield edges
+
+
+def grid_adjacency(n: int, rng: random.Random, max_hu: int = 500):
+    """
+    Square lattice with two-way connections between horizontal and vertical
+    neighbours; long paths with many equal-hop alternatives.
+    """
+    side = math.ceil(math.sqrt(n))
+    for i in range(n):
+        row, col = divmod(i, side)
+        edges = []
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            j = r * side + c
+            if 0 <= r and 0 <= c < side and j < n:
+                edges.append((j, rng.randint(1, max_hu)))
+        yield edges
+
+
+def scale_free_adjacency(n: int, rng: random.Random, max_hu: int = 500, degree: int = 2):
+    """
+    Preferential attachment: each new gate connects both ways to ``degree``
+    existing gates picked in proportion to their connection count, giving a
+    few heavily connected hub gates.
+    """
+    adjacency = [[] for _ in range(n)]
+    endpoints = []
+    for i in range(n):
+        if i == 0:
+            continue
+        targets = {rng.choice(endpoints) if endpoints else 0 for _ in range(min(degree, i))}
+        for j in targets:
+            hu = rng.randint(1, max_hu)
+            adjacency[i].append((j, hu))
+            adjacency[j].append((i, hu))
+            endpoints.extend((i, j))
+    yield from adjacency
+
+
+def clustered_adjacency(n: int, rng: random.Random, max_hu: int = 500, cluster_size: int = 100, degree: int = 4):
+    """
+    Dense clusters of cheap internal connections, joined into a ring by a few
+    expensive bridge connections.
+    """
+    clusters = math.ceil(n / cluster_size)
+    cheap = max(max_hu // 10, 1)
+    for i in range(n):
+        start = i - i % cluster_size
+        end = min(start + cluster_size, n)
+        edges = [(i + 1 if i + 1 < end else start, rng.randint(1, cheap))]
+        edges.extend((rng.randrange(start, end), rng.randint(1, cheap)) for _ in range(degree - 1))
+        if i == start and clusters > 1:
+            edges.append((end % n, rng.randint(max_hu, max_hu * 10)))
+        yield edges
+
+
+TOPOLOGIES = {
+    "random": random_adjacency,
+    "grid": grid_adjacency,
+    "scale_free": scale_free_adjacency,
+    "clustered": clustered_adjacency,
+}
+
+
+def adjacency(topology: str, n: int, seed: int = 42, **kwargs):
+    return TOPOLOGIES[topology](n, random.Random(seed), **kwargs)
+
+
+def network_rows(n: int, topology: str = "random", seed: int = 42, **kwargs) -> list[tuple[str, list[dict]]]:
+    """
+    A synthetic network as (gate_id, connections) rows, the shape used by fixtures and the API.
+
+    The rows go into the database, so the network is limited to what fits
+    in Gate.id (see gate_ids).
+    """
+    from app.models import Gate
+
+    ids = gate_ids(n, max_width=Gate._meta.get_field("id").max_length)
+    return [
+        (gate_id, [{"id": ids[j], "hu": str(hu)} for j, hu in edges])
+        for gate_id, edges in zip(ids, adjacency(topology, n, seed, **kwargs))
+    ]
+
+
+def network_graph(n: int, topology: str = "random", seed: int = 42, **kwargs):
+    """
+    A synthetic network compiled straight into a GateGraph, without a database.
+    """
+    from app.services.graph import GateGraph
+
+    return GateGraph.from_adjacency(gate_ids(n), adjacency(topology, n, seed, **kwargs))
+
+
+def seed_gates(rows, batch_size: int = 1000) -> None:
+    """
+    Insert generated rows into the Gate and GateConnection tables and
+    invalidate the compiled graph.
+    """
+    from app.models import Gate, GateConnection
+    from app.services.graph import invalidate_graph
+
+    rows = list(rows)
+    Gate.objects.bulk_create(
+        (Gate(id=gate_id, name=gate_id) for gate_id, _ in rows),
+        batch_size=batch_size,
+    )
+    GateConnection.objects.bulk_create(
+        (
+            GateConnection(source_id=gate_id, target_id=conn["id"], hu=int(conn["hu"]))
+            for gate_id, connections in rows
+            for conn in connections
+        ),
+        batch_size=batch_size,
+    )
+    invalidate_graph()
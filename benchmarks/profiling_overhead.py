@@ -0,0 +1,60 @@
+"""
+Latency cost of ProfilingMiddleware: off, spans and metrics only, and cProfile on every request.
+
+    python -m benchmarks.profiling_overhead
+    python -m benchmarks.profiling_overhead --gates 5000 --requests 1000 --scenarios route journey
+
+Uses the load driver (benchmarks/load.py) with the quote cache disabled, so
+every request runs the route search and pricing it instruments. The
+"sampled" mode profiles every request but, with the default threshold,
+dumps none of them.
+"""
+import argparse
+
+from benchmarks.common import benchmark_database, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+MODES = {
+    "off": {"PROFILING_ENABLED": False},
+    "spans": {"PROFILING_ENABLED": True, "PROFILING_SAMPLE_RATE": 0},
+    "sampled": {"PROFILING_ENABLED": True, "PROFILING_SAMPLE_RATE": 1, "PROFILING_SLOW_REQUEST_MS": float("inf")},
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=1000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--scenarios", nargs="+", default=["route", "transport"])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario and mode")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.test.utils import override_settings
+    from app.services.graph import get_graph
+    from benchmarks.load import drive, scenarios
+    from benchmarks.networks import network_rows, seed_gates
+
+    rows = []
+    with benchmark_database(), override_settings(QUOTE_CACHE_ENABLED=False):
+        seed_gates(network_rows(args.gates, args.topology))
+        available = scenarios(list(get_graph().ids))
+        for name in args.scenarios:
+            drive(available[name], 50, concurrency=1)  # warm-up
+            baseline = None
+            for mode, overrides in MODES.items():
+                with override_settings(**overrides):
+                    stats = drive(available[name], args.requests, concurrency=1)
+                baseline = baseline or stats["mean_ms"]
+                rows.append({
+                    "scenario": name, "mode": mode, **stats,
+                    "overhead_ms": stats["mean_ms"] - baseline,
+                })
+
+    print(f"gates={args.gates} topology={args.topology}")
+    print_table(rows, ["scenario", "mode", "requests", "p50_ms", "p99_ms", "mean_ms", "overhead_ms"])
+
+
+if __name__ == "__main__":
+    main()
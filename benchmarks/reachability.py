@@ -0,0 +1,70 @@
+"""
+No-route answers from the reachability index vs a search that runs out of gates.
+
+    python -m benchmarks.reachability
+    python -m benchmarks.reachability --gates 100000 --topology grid
+
+Runs on a compiled synthetic graph (no database) of two copies of the
+network joined by a one-way bridge from the first to the second, so every
+route from the second copy back to the first is missing. Reports the index
+build time (once per graph version) and the latency of such no-route
+queries with the index and with a plain Dijkstra search.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import latency_stats, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=20000, help="gates per copy of the network")
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--max-components", type=int, nargs="+", default=[20000, 0])
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.engine import dijkstra
+    from app.services.graph import GateGraph
+    from app.services.reachability import ReachabilityIndex
+    from benchmarks.networks import adjacency, gate_ids
+
+    n = args.gates
+    first = list(adjacency(args.topology, n, seed=1))
+    second = [[(n + target, hu) for target, hu in edges] for edges in adjacency(args.topology, n, seed=2)]
+    first[0].append((n, 1))
+    graph = GateGraph.from_adjacency(gate_ids(2 * n), first + second)
+
+    rng = random.Random(0)
+    queries = [(rng.randrange(n, 2 * n), rng.randrange(n)) for _ in range(args.queries)]
+
+    rows = []
+    samples = []
+    for source, target in queries:
+        start = time.perf_counter()
+        assert dijkstra(graph, source, target).route(target) is None
+        samples.append((time.perf_counter() - start) * 1000)
+    rows.append({"answer": "dijkstra", "build_ms": None, **latency_stats(samples)})
+
+    for max_components in args.max_components:
+        start = time.perf_counter()
+        index = ReachabilityIndex(graph, max_components)
+        build_ms = (time.perf_counter() - start) * 1000
+        samples = []
+        for source, target in queries:
+            start = time.perf_counter()
+            assert not index.reachable(source, target)
+            samples.append((time.perf_counter() - start) * 1000)
+        name = "index (closure)" if index.closure is not None else "index (no closure)"
+        rows.append({"answer": name, "build_ms": build_ms, **latency_stats(samples)})
+
+    print(f"gates={len(graph)} topology={args.topology} edges={graph.edge_count} components={index.count}")
+    print_table(rows, ["answer", "build_ms", "rounds", "p50_ms", "mean_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
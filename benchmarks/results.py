@@ -0,0 +1,61 @@
+import datetime
+import json
+import os
+import platform
+import subprocess
+from pathlib import Path
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def environment() -> dict:
+    """
+    Where and on what code a benchmark ran, stored alongside its results.
+    """
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": _database_vendor(),
+    }
+
+
+def save_results(name: str, results: list[dict], path: Path | None = None) -> Path:
+    """
+    Write results as JSON, by default to benchmarks/results/<name>-<commit>-<time>.json.
+    """
+    payload = {"benchmark": name, "environment": environment(), "results": results}
+    if path is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = RESULTS_DIR / f"{name}-{payload['environment']['commit'] or 'nogit'}-{stamp}.json"
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+    return path
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def _git(*args) -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _database_vendor() -> str | None:
+    try:
+        from django.db import connection
+        return connection.vendor
+    except Exception:
+        return None
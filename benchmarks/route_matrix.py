@@ -0,0 +1,79 @@
+"""
+Route matrix export (npy and CSV) at 1 to N workers, vs one search per pair.
+
+    python -m benchmarks.route_matrix
+    python -m benchmarks.route_matrix --gates 5000 --workers 1 4 8
+
+Runs on a compiled synthetic graph (no database). The per-pair baseline is
+what the fare-table script did through the API minus HTTP and database
+time: one Dijkstra search per origin/destination pair, timed on a sample
+of pairs and extrapolated to all N² of them.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=2000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--block-size", type=int, default=64)
+    parser.add_argument("--pairs", type=int, default=200, help="sampled pairs for the per-pair baseline")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.engine import dijkstra
+    from app.services.route_matrix import write_csv, write_npy
+    from app.services.route_pool import distance_rows, shutdown_route_pool
+    from benchmarks.networks import network_graph
+
+    graph = network_graph(args.gates, args.topology)
+    origins = list(range(len(graph)))
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(args.pairs):
+        source, target = rng.sample(origins, 2)
+        dijkstra(graph, source, target)
+    per_pair_s = (time.perf_counter() - start) / args.pairs * len(graph) ** 2
+    rows = [{"export": "per pair (estimate)", "workers": 1, "seconds": per_pair_s, "origins_per_s": None, "mb": None}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            for name in ("npy", "csv"):
+                output = Path(tmp) / f"matrix-{workers}.{name}"
+                rows_iter = distance_rows(graph, origins, workers, args.block_size)
+                start = time.perf_counter()
+                if name == "npy":
+                    write_npy(graph, rows_iter, output)
+                    size = sum(path.stat().st_size for path in output.iterdir())
+                else:
+                    with open(output, "w", newline="") as out:
+                        write_csv(graph, rows_iter, out)
+                    size = output.stat().st_size
+                seconds = time.perf_counter() - start
+                rows.append({
+                    "export": name,
+                    "workers": workers,
+                    "seconds": seconds,
+                    "origins_per_s": len(graph) / seconds,
+                    "mb": size / 2 ** 20,
+                })
+                print(f"  {name} with {workers} worker(s): {seconds:.2f}s", flush=True)
+            shutdown_route_pool()
+
+    print(f"\ngates={len(graph)} topology={args.topology} edges={graph.edge_count} cpus={os.cpu_count()}")
+    print_table(rows, ["export", "workers", "seconds", "origins_per_s", "mb"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Batch route throughput on the route process pool at 1 to N workers.
+
+    python -m benchmarks.route_pool
+    python -m benchmarks.route_pool --gates 100000 --origins 64 --workers 1 2 4 8
+
+Every batch is the same set of origins with a few destinations each (one
+full shortest-path tree per origin), on a compiled synthetic graph (no
+database). 1 worker searches in-process; more use a RoutePool, whose
+start-up (forking or spawning the workers, loading the graph) is reported
+separately from the batch time.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+from benchmarks.common import measure, print_table, setup_django
+from benchmarks.networks import TOPOLOGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gates", type=int, default=20000)
+    parser.add_argument("--topology", choices=sorted(TOPOLOGIES), default="random")
+    parser.add_argument("--origins", type=int, default=32, help="origins per batch")
+    parser.add_argument("--destinations", type=int, default=4, help="destinations per origin")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--start-method", choices=multiprocessing.get_all_start_methods(), default=None)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from app.services.route_pool import RoutePool, route_groups
+    from benchmarks.networks import network_graph
+
+    graph = network_graph(args.gates, args.topology)
+    rng = random.Random(0)
+    groups = [
+        (origin, rng.sample(range(args.gates), args.destinations))
+        for origin in rng.sample(range(args.gates), args.origins)
+    ]
+    context = multiprocessing.get_context(args.start_method) if args.start_method else None
+
+    rows = []
+    baseline = None
+    for workers in args.workers:
+        startup_ms = None
+        if workers > 1:
+            start = time.perf_counter()
+            pool = RoutePool(graph, workers, context)
+            startup_ms = (time.perf_counter() - start) * 1000
+            run = lambda: pool.route_groups(groups)
+        else:
+            pool = None
+            run = lambda: route_groups(graph, groups)
+
+        try:
+            stats = measure(run, args.rounds, warmup=1)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        origins_per_s = args.origins / (stats["p50_ms"] / 1000)
+        baseline = baseline or origins_per_s
+        rows.append({
+            "workers": workers,
+            "startup_ms": startup_ms,
+            "batch_ms": stats["p50_ms"],
+            "origins_per_s": origins_per_s,
+            "speedup": origins_per_s / baseline,
+        })
+        print(f"  {workers} worker(s): {origins_per_s:.1f} origins/s", flush=True)
+
+    print(f"\ngates={args.gates} topology={args.topology} origins={args.origins} cpus={os.cpu_count()}")
+    print_table(rows, ["workers", "startup_ms", "batch_ms", "origins_per_s", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Vectorized cheapest_transport_bulk against a cheapest_transport loop.
+
+    python -m benchmarks.transport_bulk
+    python -m benchmarks.transport_bulk --sizes 1000 100000 --rounds 3
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    import numpy as np
+    from app.services.transport_cost import cheapest_transport, cheapest_transport_bulk
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in args.sizes:
+        distance_au = np.round(rng.uniform(0, 5000, n), 2)
+        passengers = rng.integers(1, 6, n)
+        parking_days = rng.integers(0, 30, n)
+        scalar_rows = list(zip(distance_au.tolist(), passengers.tolist(), parking_days.tolist()))
+
+        def scalar():
+            for row in scalar_rows:
+                cheapest_transport(*row)
+
+        def bulk():
+            cheapest_transport_bulk(distance_au, passengers, parking_days)
+
+        scalar_ms = measure(scalar, args.rounds, warmup=1)["p50_ms"]
+        bulk_ms = measure(bulk, args.rounds, warmup=1)["p50_ms"]
+        rows.append({
+            "rows": n,
+            "scalar_ms": scalar_ms,
+            "bulk_ms": bulk_ms,
+            "speedup": scalar_ms / bulk_ms,
+            "bulk_rows_per_s": n / bulk_ms * 1000,
+        })
+
+    print_table(rows, ["rows", "scalar_ms", "bulk_ms", "speedup", "bulk_rows_per_s"])
+
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,8 @@ SPECTACULAR_SETTINGS = {
 }
 
 MIDDLEWARE = [
+    'app.middleware.ProfilingMiddleware',
+    'app.middleware.ReadReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -94,17 +96,89 @@ WSGI_APPLICATION = 'interstellar.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
+# Connection reuse, for production:
+# - DB_CONN_MAX_AGE: seconds a worker keeps its connection between requests
+#   ("none" for no limit; 0, the default, connects for every request), checked
+#   with a ping before reuse;
+# - DB_POOL=True: a psycopg 3 connection pool per worker process instead, of
+#   DB_POOL_MIN_SIZE to DB_POOL_MAX_SIZE connections (Django does not allow
+#   both). Suits ASGI, where persistent connections are per thread.
+DB_CONN_MAX_AGE = os.getenv("DB_CONN_MAX_AGE", "0")
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Seconds a request waits for a pooled connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+
+def _postgres_database(host: str, port: str) -> dict:
+    options = {}
+    if DB_POOL:
+        options["pool"] = {"min_size": DB_POOL_MIN_SIZE, "max_size": DB_POOL_MAX_SIZE, "timeout": DB_POOL_TIMEOUT}
+    return {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": os.getenv("DB_NAME"),
         "USER": os.getenv("DB_USER"),
         "PASSWORD": os.getenv("DB_PASSWORD"),
-        "HOST": os.getenv("DB_HOST", "localhost"),
-        "PORT": os.getenv("DB_PORT", "5432"),
+        "HOST": host,
+        "PORT": port,
+        "CONN_MAX_AGE": 0 if DB_POOL else None if DB_CONN_MAX_AGE.lower() == "none" else int(DB_CONN_MAX_AGE),
+        "CONN_HEALTH_CHECKS": not DB_POOL,
+        "OPTIONS": options,
+    }
+
+
+DATABASES = {
+    "default": _postgres_database(os.getenv("DB_HOST", "localhost"), os.getenv("DB_PORT", "5432")),
+}
+
+# Read replica (streaming replication of "default"). When set, reads of the
+# read-only gate and route endpoints go to it (see app/db_router.py), except
+# for DB_REPLICA_LAG_SECONDS after the gates change, so that nothing cached
+# per graph version is read from a replica that is behind.
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **_postgres_database(os.getenv("DB_REPLICA_HOST"), os.getenv("DB_REPLICA_PORT", "5432")),
+        "TEST": {"MIRROR": "default"},
     }
+DB_REPLICA_LAG_SECONDS = float(os.getenv("DB_REPLICA_LAG_SECONDS", "5"))
+
+DATABASE_ROUTERS = ["app.db_router.ReadReplicaRouter"]
+
+
+# Caches
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+#
+# The default cache holds the gate graph version stamp, the published HU
+# changes and the time of the last gate change. The local-memory default is
+# per process, so it is only correct with a single worker: with more, point
+# it at a shared backend (docker-compose and terraform run Redis) or gate
+# writes in one worker never reach the others.
+# The "quotes" cache holds route and transport responses; the local-memory
+# backend evicts least recently used entries once MAX_ENTRIES is reached.
+
+QUOTE_CACHE_TTL = int(os.getenv("QUOTE_CACHE_TTL", "300"))
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "default"),
+    },
+    "quotes": {
+        "BACKEND": os.getenv("QUOTE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("QUOTE_CACHE_LOCATION", "quotes"),
+        "TIMEOUT": QUOTE_CACHE_TTL,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", "10000")),
+        },
+    },
 }
 
+QUOTE_CACHE_ENABLED = os.getenv("QUOTE_CACHE_ENABLED", "True").lower() == "true"
+QUOTE_CACHE_ALIAS = "quotes"
+# Cache-Control max-age for successful quotes, for browsers and the CDN
+QUOTE_CACHE_MAX_AGE = int(os.getenv("QUOTE_CACHE_MAX_AGE", "60"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -143,3 +217,69 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+
+# Route planning
+
+# Binary graph snapshot shared by all workers via mmap (see app/services/snapshot.py).
+# Unset: every worker compiles the graph from the database.
+GRAPH_SNAPSHOT_PATH = Path(os.environ["GRAPH_SNAPSHOT_PATH"]) if os.getenv("GRAPH_SNAPSHOT_PATH") else None
+
+# How long connection HU edits stay in the cache for workers to replay on
+# their compiled graph. A worker further behind recompiles from the database.
+GRAPH_DELTA_TIMEOUT = int(os.getenv("GRAPH_DELTA_TIMEOUT", "3600"))
+
+# Precomputed all-pairs route table (see app/services/route_table.py).
+# Networks whose table would exceed the memory budget fall back to on-demand search.
+ROUTE_TABLE_ENABLED = os.getenv("ROUTE_TABLE_ENABLED", "False").lower() == "true"
+ROUTE_TABLE_MAX_BYTES = int(os.getenv("ROUTE_TABLE_MAX_BYTES", str(256 * 1024 * 1024)))
+ROUTE_TABLE_PATH = Path(os.getenv("ROUTE_TABLE_PATH", BASE_DIR / "var" / "route_table.npz"))
+
+# Point-to-point search: "dijkstra", "bidirectional", "astar" (A* with ALT
+# landmark bounds) or "ch" (contraction hierarchy). ?strategy= overrides per request.
+ROUTE_SEARCH_STRATEGY = os.getenv("ROUTE_SEARCH_STRATEGY", "dijkstra")
+ROUTE_ALT_LANDMARKS = int(os.getenv("ROUTE_ALT_LANDMARKS", "8"))
+
+# Contraction hierarchy written by `manage.py build_contraction_hierarchy`
+ROUTE_CH_PATH = Path(os.getenv("ROUTE_CH_PATH", BASE_DIR / "var" / "contraction_hierarchy.npz"))
+
+# Route requests between gates with no route are answered from a reachability
+# index (see app/services/reachability.py) without searching. Networks with up
+# to this many strongly connected components also keep every component's
+# reachable set, which takes up to components² / 8 bytes.
+REACHABILITY_MAX_COMPONENTS = int(os.getenv("REACHABILITY_MAX_COMPONENTS", "20000"))
+
+# Serve the gate list, gate detail and route endpoints with async views
+# (app/api/v1/async_views.py). Meant for ASGI deployments, e.g. uvicorn.
+ASYNC_API_VIEWS = os.getenv("ASYNC_API_VIEWS", "False").lower() == "true"
+# Threads running route searches and graph compilation for async views
+ROUTE_SEARCH_THREADS = int(os.getenv("ROUTE_SEARCH_THREADS", "4"))
+
+# Upper bound on ?k= for GET /api/v1/gates/<a>/to/<b>/alternatives/
+ROUTE_ALTERNATIVES_MAX_K = int(os.getenv("ROUTE_ALTERNATIVES_MAX_K", "10"))
+
+# Processes sharing batch route searches (POST /api/v1/routes/batch/ and
+# `manage.py find_routes`); 0 or 1 searches in the serving process. Batches
+# with fewer distinct origins than ROUTE_POOL_MIN_ORIGINS stay in-process.
+ROUTE_POOL_WORKERS = int(os.getenv("ROUTE_POOL_WORKERS", "0"))
+ROUTE_POOL_MIN_ORIGINS = int(os.getenv("ROUTE_POOL_MIN_ORIGINS", "8"))
+
+# Upper bound on ?limit= for GET /api/v1/gates/
+GATES_PAGE_MAX_LIMIT = int(os.getenv("GATES_PAGE_MAX_LIMIT", "1000"))
+# Render gate list and detail JSON with orjson, when it is installed
+API_ORJSON = os.getenv("API_ORJSON", "True").lower() == "true"
+
+# Upper bound on origin/destination pairs per POST /api/v1/routes/batch/ request
+ROUTE_BATCH_MAX_PAIRS = int(os.getenv("ROUTE_BATCH_MAX_PAIRS", "1000"))
+
+# Upper bound on rows per POST /api/v1/transport/bulk/ request
+TRANSPORT_BULK_MAX_ROWS = int(os.getenv("TRANSPORT_BULK_MAX_ROWS", "100000"))
+
+# Request instrumentation (app/middleware.py): Server-Timing headers and
+# metrics at /metrics. A PROFILING_SAMPLE_RATE fraction of requests also runs
+# under cProfile; those slower than PROFILING_SLOW_REQUEST_MS are dumped as
+# .pstats files to PROFILING_DUMP_DIR.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_SLOW_REQUEST_MS = float(os.getenv("PROFILING_SLOW_REQUEST_MS", "250"))
+PROFILING_DUMP_DIR = Path(os.getenv("PROFILING_DUMP_DIR", BASE_DIR / "var" / "profiles"))
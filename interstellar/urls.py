@@ -3,11 +3,14 @@ from django.urls import include, path
 from django.views.generic import RedirectView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from app.views import metrics
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('app.api.v1.urls')),
     path('api-auth/', include('rest_framework.urls')),
+    path('metrics', metrics, name='metrics'),
     path('', RedirectView.as_view(url='/api/docs/', permanent=False)), 
     
     # OpenAPI schema and documentation
@@ -52,6 +52,11 @@ DB_USER=postgres
 DB_PASSWORD=${db_password}
 DB_HOST=db
 DB_PORT=5432
+DB_CONN_MAX_AGE=600
+
+# Shared by the gunicorn workers, so gate changes reach all of them
+CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+CACHE_LOCATION=redis://redis:6379/0
 EOF
 
 mkdir -p nginx
@@ -93,6 +98,15 @@ services:
       retries: 5
     restart: unless-stopped
 
+  redis:
+    image: redis:7-alpine
+    healthcheck:
+      test: ["CMD", "redis-cli", "ping"]
+      interval: 5s
+      timeout: 5s
+      retries: 5
+    restart: unless-stopped
+
   web:
     build: .
     env_file:
@@ -102,6 +116,8 @@ services:
     depends_on:
       db:
         condition: service_healthy
+      redis:
+        condition: service_healthy
     command: >
       sh -c "python manage.py migrate &&
              python manage.py loaddata initial_gates &&